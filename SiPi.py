@@ -15,19 +15,34 @@ import datetime
 import math
 import json
 import uuid
+import hashlib
 import getpass
 import stat
 import shutil
 from flask import (
-    Flask, render_template, jsonify, request,
-    flash, redirect, url_for, send_from_directory
+    Flask, Response, render_template, jsonify, request,
+    flash, redirect, url_for, send_from_directory, send_file, g
 )
 
-# Astrometric corrections removed
-# from astrometric_corrections import preprocess_catalogs_for_current_epoch
-
 # Import SiTech controller communication
 from sitech_controller import get_controller_status, set_controller_mode, SiTechController
+from sitech_gateway import SiTechGateway
+from status_history import StatusHistory
+from cal_points import CalPointsCache
+from catalog_search import NameIndex
+from catalog_aliases import designations as designations_of
+from catalog_spatial import ZoneIndex
+from catalog_binary import compile_catalog, load_catalog
+from catalog_coords import alt_az as batch_alt_az, visible_objects
+from catalog_store import CATALOG_TYPES
+from catalog_jnow import ApparentCatalogCache
+from catalog_assets import CatalogAssets
+from catalog_tiles import GRIDS, TileIndex, UNKNOWN_MAG as TILE_UNKNOWN_MAG
+from metrics import registry as metrics_registry
+from ephemeris import (
+    EphemerisCache, BODY_ORDER as EPHEMERIS_BODIES, MOON_BUCKET,
+    solar_system_positions, angular_separation
+)
 
 # OS Detection and Platform-specific Configuration
 IS_WINDOWS = platform.system() == 'Windows'
@@ -43,7 +58,7 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 app = Flask(__name__)
 app.secret_key = 'your_secret_key_here'  # Replace with a strong secret key
 
-# Static catalog paths (astrometric corrections removed)
+# Static catalog paths; /corrected_<name>.json serves them in JNow (catalog_jnow.py)
 catalog_paths = {
     'stars': os.path.join(BASE_DIR, 'static', 'stars.json'),
     'messier': os.path.join(BASE_DIR, 'static', 'messier.json'),
@@ -54,6 +69,16 @@ catalog_paths = {
     'open_clusters': os.path.join(BASE_DIR, 'static', 'open_clusters.json'),
     'planetary_nebula': os.path.join(BASE_DIR, 'static', 'planetary_nebula.json')
 }
+# Compiled from catalog_paths by catalog_binary.py; rebuilt when a source changes
+CATALOG_BIN_PATH = os.path.join(BASE_DIR, 'cache', 'catalog.bin')
+# JNow catalog bodies per JD bucket, in memory and as cache/jnow_*.json
+jnow_cache = ApparentCatalogCache(os.path.join(BASE_DIR, 'cache'))
+# Content-hashed, precompressed copies of the catalogs SkyView loads
+catalog_assets = CatalogAssets(os.path.join(BASE_DIR, 'cache', 'assets'))
+# Served as published, without the JNow transform
+STATIC_ASSET_PATHS = {
+    'constellation_centers': os.path.join(BASE_DIR, 'static', 'constellation_centers.json'),
+}
 
 
 # Paths (platform-specific)
@@ -126,6 +151,7 @@ def restore_config():
         # Optionally reload config in SiTechExe
         try:
             send_command('ReloadConfigFile\n')
+            mount_metadata.invalidate()
         except Exception:
             pass
         return jsonify(success=True, message="Restore successful.", user=user, perms=perms)
@@ -139,6 +165,13 @@ def restore_config():
 MODEL_DIR       = "/usr/share/SiTech/SiTechExe"
 MODEL_FILE      = "AutoLoad.PXP"    # Correct filename case
 
+# ReadScopeStatus poll intervals (seconds), picked from the mount state
+STATUS_POLL_DEFAULTS = {
+    "status_poll_fast": 0.1,    # Slewing, parking or settling after a slew
+    "status_poll_normal": 0.5,  # Tracking / stopped
+    "status_poll_slow": 2.0     # Parked or in Blinky (manual) mode
+}
+
 # Persisted web settings
 def load_web_config():
     try:
@@ -147,13 +180,16 @@ def load_web_config():
             # Ensure controller_com_port has a default
             if 'controller_com_port' not in config:
                 config['controller_com_port'] = '/dev/ttyUSB0'
+            for key, value in STATUS_POLL_DEFAULTS.items():
+                config.setdefault(key, value)
             return config
     except:
         return {
             "vibration_enabled": False, 
             "tilt_enabled": False, 
             "flip_skyview": False,
-            "controller_com_port": "/dev/ttyUSB0"
+            "controller_com_port": "/dev/ttyUSB0",
+            **STATUS_POLL_DEFAULTS
         }
 
 def save_web_config(cfg):
@@ -167,15 +203,8 @@ web_config = load_web_config()
 
 
 # Global state
-scope_status            = "No status yet"
-status_lock             = threading.Lock()
 site_latitude           = None
 site_longitude          = None  
-persistent_socket       = None
-move_socket             = None
-command_socket          = None
-move_socket_lock        = threading.Lock()
-command_socket_lock     = threading.Lock()
 MESSIER_FILE            = os.path.join(BASE_DIR, "messier.json")
 
 # --- Boot/session ID for first-load logic ---
@@ -232,24 +261,6 @@ def format_dms(value):
             d += 1
     return f"{sign}{d:03d}:{m:02d}:{s:02d}"
 
-def get_site_location():
-    global site_latitude, site_longitude
-    try:
-        s = socket.socket()
-        s.connect((SI_TECH_HOST, SI_TECH_PORT))
-        s.settimeout(5)
-        s.sendall(b"SiteLocations\n")
-        data = s.recv(1024).decode('ascii')
-        s.close()
-        parts = data.split(';')
-        # first element is latitude, second is longitude
-        site_latitude  = float(parts[0].strip()) if len(parts) > 0 else 0.0
-        site_longitude = float(parts[1].strip()) if len(parts) > 1 else 0.0
-    except:
-        site_latitude  = 0.0
-        site_longitude = 0.0
-
-
 def eq_to_alt_az(ra, dec, lst, lat):
     # Convert all to degrees
     ha = (lst - ra) * 15  # Hour angle in degrees
@@ -277,130 +288,41 @@ def get_sipi_version():
     print(f"[DEBUG] get_sipi_version() returning: {__version__}")
     return __version__
 
-# --- Socket connect functions ---
+# --- SiTechExe gateway ---
+# One I/O thread owns the SiTechExe connections; every command goes through
+# its priority queue (see sitech_gateway.py).
+gateway = SiTechGateway(SI_TECH_HOST, SI_TECH_PORT)
 
-def connect_persistent_socket():
-    global persistent_socket
-    try:
-        print(f"[SiPi CONNECTION] Attempting to connect persistent socket to {SI_TECH_HOST}:{SI_TECH_PORT}")
-        persistent_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        persistent_socket.settimeout(5)  # timeout applies to connect() as well
-        persistent_socket.connect((SI_TECH_HOST, SI_TECH_PORT))
-        print("[SiPi CONNECTION] Persistent socket connected successfully")
-    except Exception as e:
-        print(f"[SiPi CONNECTION] Failed to connect persistent socket: {e}")
-        persistent_socket = None
-
-def connect_move_socket():
-    global move_socket
-    try:
-        print(f"[SiPi CONNECTION] Attempting to connect move socket to {SI_TECH_HOST}:{SI_TECH_PORT}")
-        move_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        move_socket.settimeout(5)  # timeout applies to connect() as well
-        move_socket.connect((SI_TECH_HOST, SI_TECH_PORT))
-        print("[SiPi CONNECTION] Move socket connected successfully")
-    except Exception as e:
-        print(f"[SiPi CONNECTION] Failed to connect move socket: {e}")
-        move_socket = None
+# Set to cut the current status poll interval short (e.g. right after a move)
+status_wake = threading.Event()
 
-def connect_command_socket():
-    global command_socket
-    try:
-        print(f"[SiPi CONNECTION] Attempting to connect command socket to {SI_TECH_HOST}:{SI_TECH_PORT}")
-        command_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        command_socket.settimeout(5)  # timeout applies to connect() as well
-        command_socket.connect((SI_TECH_HOST, SI_TECH_PORT))
-        print("[SiPi CONNECTION] Command socket connected successfully")
-    except Exception as e:
-        print(f"[SiPi CONNECTION] Failed to connect command socket: {e}")
-        command_socket = None
-
-# Fire-and-forget for movement & tracking
+# Fire-and-forget for movement & tracking: these default to the write-only
+# urgent lane, Abort and axis stops ahead of queued moves
 def send_move_no_wait(command):
-    global move_socket
-    with move_socket_lock:
-        if move_socket is None:
-            connect_move_socket()
-        try:
-            move_socket.sendall(command.encode('ascii'))
-        except:
-            try: move_socket.close()
-            except: pass
-            connect_move_socket()
-            if move_socket:
-                move_socket.sendall(command.encode('ascii'))
+    gateway.submit(command)
+    status_wake.set()
 
-# Persistent command-socket helper
+# Blocking request/reply helper
 def send_command(command, timeout=5, retries=1, terminator=None, lock_timeout=None):
-    global command_socket
-    if lock_timeout is not None:
-        if not command_socket_lock.acquire(timeout=lock_timeout):
-            print(f"[SiPi COMMAND] Could not acquire lock within {lock_timeout}s, skipping: {command.strip()}")
-            return ""
-    else:
-        command_socket_lock.acquire()
-    lock_held = True
+    # lock_timeout bounds how long the command may wait in the queue
+    print(f"[SiPi COMMAND] Sending command: {command.strip()}")
     try:
-        if command_socket is None:
-            print("[SiPi COMMAND] No command socket, attempting to connect")
-            connect_command_socket()
-        s = command_socket
-        if s is None:
-            print("[SiPi COMMAND] Failed to establish command socket connection")
-            return ""
-        try:
-            orig_to = s.gettimeout()
-        except Exception as e:
-            print(f"[SiPi COMMAND] Error getting socket timeout: {e}")
-            orig_to = None
-        try:
-            s.settimeout(timeout)
-            print(f"[SiPi COMMAND] Sending command: {command.strip()}")
-            s.sendall(command.encode('ascii'))
-            response = ""
-            while True:
-                try:
-                    data = s.recv(1024)
-                    if not data:
-                        break
-                    decoded = data.decode('ascii')
-                    response += decoded
-                    if terminator and terminator in response:
-                        break  # Early exit
-                except socket.timeout:
-                    print("[SiPi COMMAND] Socket timeout while receiving response")
-                    break
-
-            print(f"[SiPi COMMAND] Response length: {len(response)} chars")
-            return response
-        except Exception as e:
-            print(f"[SiPi COMMAND] Exception in send_command: {e}")
-            try: s.close()
-            except: pass
-            command_socket = None
-            if retries > 0:
-                print(f"[SiPi COMMAND] Retrying command (retries left: {retries-1})")
-                # Release before recursive retry so the retry can re-acquire cleanly
-                lock_held = False
-                command_socket_lock.release()
-                return send_command(command, timeout, retries - 1, terminator, lock_timeout)
-            return ""
-        finally:
-            try:
-                if orig_to is not None:
-                    s.settimeout(orig_to)
-            except:
-                pass
-    finally:
-        if lock_held:
-            command_socket_lock.release()
+        response = gateway.call(command, timeout=timeout, queue_timeout=lock_timeout,
+                                terminator=terminator, retries=retries)
+    except Exception as e:
+        print(f"[SiPi COMMAND] {command.strip()} failed: {e!r}")
+        return ""
+    print(f"[SiPi COMMAND] Response length: {len(response)} chars")
+    return response
 
 
-# Version helper for SiTechExe
-def get_site_version():
-    # lock_timeout=0.5 means we give up quickly if another command holds the lock,
-    # rather than blocking the page load indefinitely
-    raw = send_command("GetSiTechVersion\n", timeout=0.25, lock_timeout=0.5)
+# --- Mount metadata cache ---
+# SiteLocations, ScopeInfo and GetSiTechVersion rarely change, so they are
+# fetched over the gateway in the background and served from memory.
+MOUNT_METADATA_TTL = 600  # seconds
+MOUNT_METADATA_RETRY = 15  # seconds between attempts until SiteLocations answers
+
+def _parse_sitech_version(raw):
     # strip leading semicolons/newlines/spaces
     v = raw.lstrip(";\r\n ").strip()
     prefix = "_GetSiTechVersion="
@@ -410,55 +332,334 @@ def get_site_version():
         return v.split(prefix,1)[1].strip()
     return v
 
-# Status update loop (persistent_socket)
+class MountMetadata:
+    """Cached site location, scope info and SiTechExe version."""
+
+    def __init__(self, ttl=MOUNT_METADATA_TTL, retry=MOUNT_METADATA_RETRY):
+        self.ttl = ttl
+        self.retry = retry
+        self.elevation = None
+        self.scope_info = {}
+        self.sitech_version = ""
+        self.updated = 0.0      # last complete refresh
+        self.attempted = 0.0    # last refresh attempt, successful or not
+        self._refreshing = threading.Lock()
+
+    def refresh(self):
+        """
+        Query SiTechExe for all metadata; keeps the previous values on failure.
+        The cache only counts as fresh once SiteLocations has parsed, so an
+        unanswered startup query is retried after `retry` seconds, and the
+        site stays None (unknown) rather than defaulting to 0/0.
+        """
+        global site_latitude, site_longitude
+        if not self._refreshing.acquire(blocking=False):
+            return  # Another refresh is already running
+        try:
+            self.attempted = time.time()
+            parts = send_command("SiteLocations\n", timeout=2, retries=0).split(';')
+            try:
+                # first element is latitude, second is longitude
+                latitude  = float(parts[0].strip())
+                longitude = float(parts[1].strip())
+                elevation = float(parts[2].strip()) if len(parts) > 2 else None
+            except (ValueError, IndexError):
+                print(f"[SiPi STATUS] SiteLocations not available; retrying in {self.retry}s")
+                return
+            site_latitude, site_longitude, self.elevation = latitude, longitude, elevation
+            parts = [p.strip() for p in send_command("ScopeInfo\n", timeout=2, retries=0).split(';')]
+            if len(parts) >= 4:
+                self.scope_info = {
+                    'aperture_diameter': parts[0],
+                    'aperture_area': parts[1],
+                    'focal_length': parts[2],
+                    'name': parts[3],
+                }
+            version = _parse_sitech_version(send_command("GetSiTechVersion\n", timeout=2, retries=0))
+            if version:
+                self.sitech_version = version
+            self.updated = time.time()
+        finally:
+            self._refreshing.release()
+
+    def ensure_fresh(self):
+        """Start a background refresh if the cache is older than the TTL; never blocks."""
+        now = time.time()
+        if now - self.updated > self.ttl and now - self.attempted > self.retry:
+            threading.Thread(target=self.refresh, daemon=True).start()
+
+    def invalidate(self):
+        """Force a refresh, e.g. after ReloadConfigFile."""
+        self.updated = self.attempted = 0.0
+        self.ensure_fresh()
+
+    def as_dict(self):
+        return {
+            'site_latitude': site_latitude,
+            'site_longitude': site_longitude,
+            'site_elevation': self.elevation,
+            'scope_info': self.scope_info,
+            'sitech_version': self.sitech_version,
+            'updated': self.updated,
+        }
+
+mount_metadata = MountMetadata()
+
+# Version helper for SiTechExe
+def get_site_version():
+    mount_metadata.ensure_fresh()
+    return mount_metadata.sitech_version
+
+# --- Parsed status snapshot ---
+def _status_float(fields, i):
+    try:
+        return float(fields[i].strip())
+    except (ValueError, IndexError):
+        return None
+
+class ScopeStatus:
+    """
+    Immutable snapshot of one ReadScopeStatus reply, parsed once per poll.
+
+    status_update_loop publishes a new snapshot by rebinding the global
+    `scope_snapshot`; readers just take the reference, no lock needed.
+    Each snapshot carries a version that only increases when the /status
+    body changes, plus that body and its SSE event pre-encoded as bytes.
+    `stale` marks a republished reply after a failed poll; it keeps the
+    time the reply was actually received.
+    """
+
+    __slots__ = (
+        'raw', 'received', 'valid', 'bits',
+        'initialized', 'tracking', 'slewing', 'parking', 'parked',
+        'looking_east', 'blinky', 'comm_fault', 'unsettled',
+        'ra', 'dec', 'alt', 'az', 'sec_axis', 'pri_axis',
+        'lst', 'jd', 'scope_time', 'airmass',
+        'ra_str', 'dec_str', 'alt_str', 'az_str', 'lst_str', 'state',
+        'stale', 'version', 'body', 'event',
+    )
+
+    def __init__(self, raw, version=0, received=None, stale=False):
+        fields = raw.split(';')
+        valid = len(fields) >= 8
+        bits = int(fields[0]) if fields[0].isdigit() else 0
+        if valid:
+            ra_str  = format_hms(fields[1].strip())
+            dec_str = format_hms(fields[2].strip())
+            lst_str = format_hms_no_decimals(fields[7].strip())
+            alt_str = format_dms(fields[3].strip())
+            az_str  = format_dms(fields[4].strip())
+        else:
+            ra_str = dec_str = lst_str = alt_str = az_str = "N/A"
+        # Priority-based status determination (highest to lowest priority)
+        if bits & 128:  # Bit 07
+            state = "Communication Fault"
+        elif bits & 64:  # Bit 06
+            state = "Blinky/Manual"
+        elif bits & 16:  # Bit 04
+            state = "Parked"
+        elif not (bits & 1):  # Bit 00 false
+            state = "Scope Not Initialized"
+        elif bits & 4:  # Bit 02
+            state = "Slewing"
+        elif bits & 2:  # Bit 01
+            state = "Tracking"
+        elif bits & 8:  # Bit 03
+            state = "Parking"
+        else:  # Bit 02 false
+            state = "Stopped"
+        if received is None:
+            received = time.time()
+        payload = dict(
+            time=time.strftime("%H:%M:%S", time.localtime(received)),
+            sidereal=lst_str, ra=ra_str, dec=dec_str,
+            alt=alt_str, az=az_str, tracking=state,
+            boot_id=BOOT_ID, stale=stale
+        )
+        body = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        values = {
+            'raw': raw,
+            'received': received,
+            'valid': valid,
+            'bits': bits,
+            'initialized': bool(bits & 1),
+            'tracking': bool(bits & 2),
+            'slewing': bool(bits & 4),
+            'parking': bool(bits & 8),
+            'parked': bool(bits & 16),
+            'looking_east': bool(bits & 32),
+            'blinky': bool(bits & 64),
+            'comm_fault': bool(bits & 128),
+            'unsettled': bool(bits & (1 << 17)),
+            'ra': _status_float(fields, 1),
+            'dec': _status_float(fields, 2),
+            'alt': _status_float(fields, 3),
+            'az': _status_float(fields, 4),
+            'sec_axis': _status_float(fields, 5),
+            'pri_axis': _status_float(fields, 6),
+            'lst': _status_float(fields, 7),
+            'jd': _status_float(fields, 8),
+            'scope_time': _status_float(fields, 9),
+            'airmass': _status_float(fields, 10),
+            'ra_str': ra_str,
+            'dec_str': dec_str,
+            'alt_str': alt_str,
+            'az_str': az_str,
+            'lst_str': lst_str,
+            'state': state,
+            'stale': stale,
+            'version': version,
+            'body': body,
+            'event': b"id: %d\ndata: %s\n\n" % (version, body),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ScopeStatus snapshots are immutable")
+
+    @property
+    def etag(self):
+        return f"{BOOT_ID}-{self.version}"
+
+scope_snapshot = ScopeStatus("No status yet")
+
+class StatusBroadcaster:
+    """Wakes SSE subscribers and long-polling /status requests on each new snapshot."""
+
+    def __init__(self, snapshot):
+        self._cond = threading.Condition()
+        self._latest = snapshot
+
+    def publish(self, snapshot):
+        with self._cond:
+            self._latest = snapshot
+            self._cond.notify_all()
+
+    def wait(self, seen, timeout=None):
+        """Block until a snapshot newer than version `seen` exists; returns it, or None on timeout."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._latest.version > seen, timeout)
+            return self._latest if self._latest.version > seen else None
+
+status_broadcaster = StatusBroadcaster(scope_snapshot)
+
+# Every parsed status sample, for /status/history
+status_history = StatusHistory()
+
+def publish_status(raw, received=None, stale=False):
+    """Parse a status reply and publish it if the /status body changed; returns the parsed snapshot."""
+    global scope_snapshot
+    snapshot = ScopeStatus(raw, version=scope_snapshot.version + 1, received=received, stale=stale)
+    if snapshot.body == scope_snapshot.body:
+        return snapshot
+    # Parse once, then publish with a single reference swap
+    scope_snapshot = snapshot
+    status_broadcaster.publish(snapshot)
+    return snapshot
+
+def mark_status_stale():
+    """After a failed poll: republish the last reply flagged stale, with its original time."""
+    st = scope_snapshot
+    if not st.stale:
+        publish_status(st.raw, received=st.received, stale=True)
+
+def status_poll_interval(st):
+    """Seconds until the next ReadScopeStatus, adapted to what the mount is doing."""
+    if st.slewing or st.parking or st.unsettled:
+        key = 'status_poll_fast'
+    elif st.parked or st.blinky:
+        key = 'status_poll_slow'
+    else:
+        key = 'status_poll_normal'
+    try:
+        return max(0.05, float(web_config.get(key, STATUS_POLL_DEFAULTS[key])))
+    except (TypeError, ValueError):
+        return STATUS_POLL_DEFAULTS[key]
+
+# --- Metrics ---
+SIPI_STARTED = time.time()
+STATUS_POLLS_TOTAL = metrics_registry.counter(
+    'sipi_status_polls_total', 'ReadScopeStatus polls by outcome (ok, empty, error)', ('result',))
+HTTP_REQUEST_SECONDS = metrics_registry.histogram(
+    'sipi_http_request_seconds', 'Flask handler time per route', ('route', 'method'))
+HTTP_REQUESTS_TOTAL = metrics_registry.counter(
+    'sipi_http_requests_total', 'Flask requests per route and status code', ('route', 'method', 'status'))
+metrics_registry.gauge('sipi_sitech_queue_depth', 'Commands waiting per gateway lane',
+                       lambda: {(n,): l['queued'] for n, l in gateway.lane_status().items()}, ('lane',))
+metrics_registry.gauge('sipi_sitech_lane_connected', '1 while the lane holds a SiTechExe connection',
+                       lambda: {(n,): l['connected'] for n, l in gateway.lane_status().items()}, ('lane',))
+metrics_registry.gauge('sipi_sitech_lane_busy', '1 while the lane has a command in flight',
+                       lambda: {(n,): l['busy'] for n, l in gateway.lane_status().items()}, ('lane',))
+metrics_registry.gauge('sipi_status_version', 'Version of the published /status snapshot',
+                       lambda: scope_snapshot.version)
+metrics_registry.gauge('sipi_status_age_seconds', 'Seconds since the published status was received',
+                       lambda: time.time() - scope_snapshot.received)
+metrics_registry.gauge('sipi_status_history_samples', 'Samples held in the status history ring',
+                       lambda: len(status_history))
+metrics_registry.gauge('sipi_uptime_seconds', 'Seconds since SiPi started',
+                       lambda: time.time() - SIPI_STARTED)
+
+# Status update loop (polls through the gateway)
 def status_update_loop():
-    global scope_status, persistent_socket
     print("[SiPi STATUS] Starting status update loop")
-    if persistent_socket is None:
-        connect_persistent_socket()
     while True:
         try:
-            if persistent_socket:
-                persistent_socket.sendall(b"ReadScopeStatus\n")
-                data = persistent_socket.recv(1024)
-                if data:
-                    with status_lock:
-                        scope_status = data.decode('ascii')
-                        # Log first few status updates to verify communication
-                        if hasattr(status_update_loop, 'count'):
-                            status_update_loop.count += 1
-                        else:
-                            status_update_loop.count = 1
-                        if status_update_loop.count <= 5:
-                            print(f"[SiPi STATUS] Update #{status_update_loop.count}: {scope_status.strip()}")
+            data = gateway.call("ReadScopeStatus\n", timeout=5, retries=0)
+            STATUS_POLLS_TOTAL.inc('ok' if data else 'empty')
+            if data:
+                status_history.append(publish_status(data))
+                # Log first few status updates to verify communication
+                if hasattr(status_update_loop, 'count'):
+                    status_update_loop.count += 1
                 else:
-                    print("[SiPi STATUS] No data received from ReadScopeStatus")
+                    status_update_loop.count = 1
+                if status_update_loop.count <= 5:
+                    print(f"[SiPi STATUS] Update #{status_update_loop.count}: {data.strip()}")
             else:
-                print("[SiPi STATUS] No persistent socket, attempting to connect")
-                connect_persistent_socket()
-            # Poll every 500ms (2x per second) to reduce CPU usage
-            time.sleep(0.5)
+                print("[SiPi STATUS] No data received from ReadScopeStatus")
+                mark_status_stale()
+            # Poll fast while the mount moves, slowly while it is parked
+            status_wake.wait(status_poll_interval(scope_snapshot))
+            status_wake.clear()
         except Exception as e:
-            print(f"[SiPi STATUS] Exception in status loop: {e}")
-            try: persistent_socket.close()
-            except: pass
-            persistent_socket = None
+            print(f"[SiPi STATUS] Exception in status loop: {e!r}")
+            STATUS_POLLS_TOTAL.inc('error')
+            mark_status_stale()
             # Longer reconnect delay when service is restarting to prevent browser overload
             time.sleep(2.0)  # Increased from 0.2 to 2.0 seconds
-            connect_persistent_socket()
 
 # --- Flask routes ---
 
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route, request.method)
+        HTTP_REQUESTS_TOTAL.inc(route, request.method, str(response.status_code))
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Counters and latency histograms in the Prometheus text format."""
+    return Response(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/')
 def index():
-    # Ensure site location is up to date for SkyView
-    get_site_location()
+    # Site location comes from the metadata cache (refreshed in the background)
+    mount_metadata.ensure_fresh()
     return render_template(
         'index.html',
         vibration_enabled=web_config['vibration_enabled'],
         tilt_enabled=web_config['tilt_enabled'],
-        site_latitude=site_latitude,
-        site_longitude=site_longitude,
+        # SkyView needs numbers; 0/0 only until SiteLocations first answers
+        site_latitude=site_latitude if site_latitude is not None else 0.0,
+        site_longitude=site_longitude if site_longitude is not None else 0.0,
         is_windows=IS_WINDOWS,
         is_linux=IS_LINUX
     )
@@ -540,19 +741,28 @@ def catch_all(path):
 
 @app.route('/skyview')
 def skyview():
-    # Refresh site location from the mount on every request
-    get_site_location()
+    # Site location comes from the metadata cache (refreshed in the background)
+    mount_metadata.ensure_fresh()
     return render_template(
         'skyview.html',
-        site_latitude=site_latitude,
-        site_longitude=site_longitude
+        site_latitude=site_latitude if site_latitude is not None else 0.0,
+        site_longitude=site_longitude if site_longitude is not None else 0.0
     )
 
 @app.route('/messier-data')
 def messier_data():
-    with open(MESSIER_FILE, 'r') as f:
-        data = json.load(f)
-    return jsonify(data)
+    """The Messier catalog as shipped; the file is sent as-is, not re-parsed."""
+    return send_from_directory(
+        os.path.dirname(catalog_paths['messier']),
+        os.path.basename(catalog_paths['messier']),
+        mimetype='application/json'
+    )
+
+@app.route('/mount_info')
+def mount_info():
+    """Cached site location, scope info and SiTechExe version."""
+    mount_metadata.ensure_fresh()
+    return jsonify(mount_metadata.as_dict())
 
 @app.route('/version')
 def version_info():
@@ -567,13 +777,20 @@ def version_info():
 @app.route('/stars-data')
 def stars_data():
     """
-    Serve the pre-generated star catalog for SkyView.
-    Expects static/stars.json to exist.
+    Serve the pre-generated star catalog for SkyView, as-is, or with
+    ?format=ndjson streamed brightest first (see /catalog/stream).
+    Answers 404 when static/stars.json has not been generated.
     """
-    stars_path = os.path.join(BASE_DIR, 'static', 'stars.json')
-    with open(stars_path, 'r') as f:
-        stars = json.load(f)
-    return jsonify(stars)
+    if not os.path.exists(catalog_paths['stars']):
+        return jsonify(error="stars.json has not been generated"), 404
+    if request.args.get('format') == 'ndjson':
+        return stream_catalog(['stars'], request.args.get('maglim', type=float),
+                              request.args.get('limit', type=int))
+    return send_from_directory(
+        os.path.dirname(catalog_paths['stars']),
+        os.path.basename(catalog_paths['stars']),
+        mimetype='application/json'
+    )
     
 @app.route('/constellations-data')
 def constellations_data():
@@ -630,46 +847,71 @@ def download_model():
     return send_from_directory(MODEL_DIR, MODEL_FILE, as_attachment=True)
 
 
+# Longest a ?since= request waits for a newer snapshot
+STATUS_LONG_POLL_TIMEOUT = 25
+
 @app.route('/status')
 def status():
-    with status_lock:
-        s = scope_status
-    fields = s.split(';')
-    if len(fields) >= 8:
-        ra  = format_hms(fields[1].strip())
-        dec = format_hms(fields[2].strip())
-        sid = format_hms_no_decimals(fields[7].strip())
-        try:
-            alt = format_dms(fields[3].strip())
-            az  = format_dms(fields[4].strip())
-        except:
-            alt, az = fields[3].strip(), fields[4].strip()
+    """
+    Current mount status as pre-serialized JSON.
+    Supports If-None-Match (304 while the version is unchanged) and
+    ?since=<version> long-polling until a newer snapshot is published.
+    Versions restart at 0 with the server, so a since= ahead of the current
+    version, or a ?boot_id= other than this server's, answers at once.
+    """
+    st = scope_snapshot
+    since = request.args.get('since', type=int)
+    boot_id = request.args.get('boot_id')
+    if (since is not None and since > st.version) or boot_id not in (None, BOOT_ID):
+        since = None    # From before a restart: the current snapshot is news
+    if since is not None and st.version <= since:
+        st = status_broadcaster.wait(since, timeout=STATUS_LONG_POLL_TIMEOUT) or scope_snapshot
+    if request.if_none_match.contains(st.etag):
+        resp = Response(status=304)
     else:
-        ra = dec = sid = alt = az = "N/A"
-    bp = int(fields[0]) if fields[0].isdigit() else 0
-    # Priority-based status determination (highest to lowest priority)
-    if bp & 128:  # Bit 07
-        track = "Communication Fault"
-    elif bp & 64:  # Bit 06
-        track = "Blinky/Manual"
-    elif bp & 16:  # Bit 04
-        track = "Parked"
-    elif not (bp & 1):  # Bit 00 false
-        track = "Scope Not Initialized"
-    elif bp & 4:  # Bit 02
-        track = "Slewing"
-    elif bp & 2:  # Bit 01
-        track = "Tracking"
-    elif bp & 8:  # Bit 03
-        track = "Parking"
-    else:  # Bit 02 false
-        track = "Stopped"
-    return jsonify(
-        time=time.strftime("%H:%M:%S"),
-        sidereal=sid, ra=ra, dec=dec,
-        alt=alt, az=az, tracking=track,
-        boot_id=BOOT_ID
-    )
+        resp = Response(st.body, mimetype='application/json')
+    resp.set_etag(st.etag)
+    resp.headers['X-Status-Version'] = str(st.version)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+@app.route('/status/history')
+def status_history_query():
+    """
+    Downsampled status history.
+    ?from=&to= are Unix timestamps (default: the last hour), ?points= the
+    target series length, ?method=minmax|lttb and ?y= the LTTB column.
+    """
+    now = time.time()
+    t_to = request.args.get('to', now, type=float)
+    t_from = request.args.get('from', t_to - 3600, type=float)
+    points = min(max(request.args.get('points', 500, type=int), 3), 5000)
+    method = request.args.get('method', 'minmax')
+    y = request.args.get('y', 'alt')
+    if method not in ('minmax', 'lttb'):
+        return jsonify(error="method must be minmax or lttb"), 400
+    if y not in ('bits', 'ra', 'dec', 'alt', 'az', 'sec_axis', 'pri_axis', 'airmass'):
+        return jsonify(error=f"Unknown column: {y}"), 400
+    result = status_history.query(t_from, t_to, points, method, y)
+    result.update({'from': t_from, 'to': t_to, 'stored': len(status_history),
+                   'capacity': status_history.capacity})
+    return jsonify(result)
+
+@app.route('/status/stream')
+def status_stream():
+    """Server-Sent Events feed of /status, pushed by the status update loop."""
+    def events():
+        seen = -1
+        while True:
+            st = status_broadcaster.wait(seen, timeout=15)
+            if st is None:
+                # Comment line keeps proxies and phones from dropping an idle stream
+                yield b": keepalive\n\n"
+                continue
+            seen = st.version
+            yield st.event
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/system_status')
 def system_status():
@@ -745,10 +987,8 @@ def test_connection():
             'sitech_host': SI_TECH_HOST,
             'sitech_port': SI_TECH_PORT,
             'version_response': version.strip() if version else 'No response',
-            'persistent_socket': 'Connected' if persistent_socket else 'Disconnected',
-            'command_socket': 'Connected' if command_socket else 'Disconnected',
-            'move_socket': 'Connected' if move_socket else 'Disconnected',
-            'scope_status': scope_status
+            'gateway': gateway.lane_status(),
+            'scope_status': scope_snapshot.raw
         }
         
         return jsonify(status_info)
@@ -758,10 +998,8 @@ def test_connection():
             'socket_test': f'FAILED - {str(e)}',
             'sitech_host': SI_TECH_HOST,
             'sitech_port': SI_TECH_PORT,
-            'persistent_socket': 'Disconnected' if persistent_socket is None else 'Unknown',
-            'command_socket': 'Disconnected' if command_socket is None else 'Unknown',
-            'move_socket': 'Disconnected' if move_socket is None else 'Unknown',
-            'scope_status': scope_status
+            'gateway': gateway.lane_status(),
+            'scope_status': scope_snapshot.raw
         })
 
 @app.route('/search', methods=['POST'])    
@@ -783,6 +1021,7 @@ def search():
         
         lines = raw.split('~') if '~' in raw else raw.splitlines()
         results = []    
+        coords = []     # (result, ra, dec) converted to alt/az in one batch below
         
         for ln in lines:
             ln = ln.strip()
@@ -797,34 +1036,29 @@ def search():
                     print(f"[SiPi SEARCH DEBUG] Invalid coordinates: {parts[0]}, {parts[1]}")
                     raf = dcf = 0.0
                 
-                with status_lock:
-                    st = scope_status.split(';')
-                try:
-                    lst = float(st[7].strip()) if len(st) > 7 else 0.0
-                except (ValueError, IndexError):
-                    lst = 0.0
-                
-                if site_latitude is not None:
-                    try:
-                        altf, azf = eq_to_alt_az(raf, dcf, lst, site_latitude)
-                        alts = f"{altf:.2f}"
-                        azs  = f"{azf:.2f}"
-                    except Exception as e:
-                        print(f"[SiPi SEARCH DEBUG] Alt/Az calculation error: {e}")
-                        alts = azs = "N/A"
-                else:
-                    alts = azs = "N/A"
-                
-                results.append({
+                result = {
                     'ra': format_hms(parts[0]), 'raw_ra': parts[0],
                     'dec': format_hms(parts[1]), 'raw_dec': parts[1],
-                    'alt': alts, 'az': azs,
+                    'alt': "N/A", 'az': "N/A",
                     'info': ", ".join(parts[2:]) if len(parts)>2 else "",
                     'rawResult': ln
-                })
+                }
+                results.append(result)
+                coords.append((result, raf, dcf))
             else:
                 results.append({'result': ln, 'rawResult': ln})
         
+        latitude = site_latitude
+        if coords and latitude is not None:
+            lst = scope_snapshot.lst or 0.0
+            try:
+                alts, azs = batch_alt_az([c[1] for c in coords], [c[2] for c in coords], lst, latitude)
+                for (result, _, _), altf, azf in zip(coords, alts, azs):
+                    result['alt'] = f"{altf:.2f}"
+                    result['az'] = f"{azf:.2f}"
+            except Exception as e:
+                print(f"[SiPi SEARCH DEBUG] Alt/Az calculation error: {e}")
+        
         print(f"[SiPi SEARCH DEBUG] Processed {len(results)} results")
         return jsonify(results=results)
         
@@ -836,48 +1070,65 @@ def search():
 CATALOG_INDEX = None
 
 def load_catalog_index():
-    """Load all catalogs and create search index (called once at startup)"""
+    """
+    Open the compiled catalog and create the search indexes (called once at
+    startup).  The catalog is a read-only mapping of CATALOG_BIN_PATH,
+    rebuilt from static/*.json only when a source file's hash changes; the
+    indexes refer to its row ids.
+    """
     global CATALOG_INDEX
     if CATALOG_INDEX is not None:
         return CATALOG_INDEX
     
     print("[SiPi CATALOG] Loading catalog index...")
+    try:
+        store, meta, rebuilt = load_catalog(catalog_paths, CATALOG_BIN_PATH)
+        if rebuilt:
+            print(f"[SiPi CATALOG] Rebuilt {CATALOG_BIN_PATH} from changed sources")
+    except Exception as e:
+        # Read-only install or full disk: parse the JSON into memory instead
+        print(f"[SiPi CATALOG] Compiled catalog unavailable ({e}); loading JSON")
+        store, meta = compile_catalog(catalog_paths)
+    for catalog_type, path in catalog_paths.items():
+        info = meta['sources'].get(catalog_type)
+        if info is None:
+            print(f"[SiPi CATALOG] Warning: {path} not found")
+        elif 'error' in info:
+            print(f"[SiPi CATALOG] Error loading {path}: {info['error']}")
+    print(f"[SiPi CATALOG] {meta['entries']} entries cross-matched into "
+          f"{len(store)} objects ({meta['merged']} merged)")
+
     CATALOG_INDEX = {
-        'by_name': {},
-        'all_objects': []
+        'store': store,
+        'meta': meta,
+        'by_designation': {},
+        # Declination-zone grid for cone searches
+        'sky': ZoneIndex(range(len(store)), store.position, store.mag_of),
     }
-    
-    for catalog_type, catalog_file in catalog_paths.items():
-        if not os.path.exists(catalog_file):
-            print(f"[SiPi CATALOG] Warning: {catalog_file} not found")
-            continue
-            
-        try:
-            with open(catalog_file, 'r') as f:
-                objects = json.load(f)
-            
-            for obj in objects:
-                # Add catalog type to each object
-                obj['catalog_type'] = catalog_type
-                
-                # Index by name (lowercase for case-insensitive search)
-                name = obj.get('Name', '').lower().strip()
-                if name:
-                    # Store all objects with this name (handle duplicates)
-                    if name not in CATALOG_INDEX['by_name']:
-                        CATALOG_INDEX['by_name'][name] = []
-                    CATALOG_INDEX['by_name'][name].append(obj)
-                
-                # Store in all objects list
-                CATALOG_INDEX['all_objects'].append(obj)
-            
-            print(f"[SiPi CATALOG] Loaded {len(objects)} objects from {catalog_type}")
-        except Exception as e:
-            print(f"[SiPi CATALOG] Error loading {catalog_file}: {e}")
-    
-    print(f"[SiPi CATALOG] Index complete: {len(CATALOG_INDEX['all_objects'])} total objects")
+
+    # Ranked name/alias search (exact, prefix, substring, fuzzy)
+    names = NameIndex()
+    by_designation = CATALOG_INDEX['by_designation']
+    for i in range(len(store)):
+        name, aliases = store.name(i), store.alias_list(i)
+        designations = designations_of([name] + aliases)
+        names.add(i, name=name, aliases=aliases + sorted(designations), mag=store.mag_of(i))
+        for d in designations:
+            by_designation.setdefault(d, i)
+    CATALOG_INDEX['names'] = names.build()
+    print(f"[SiPi CATALOG] Index complete: {len(store)} objects, "
+          f"{store.nbytes / 1024:.0f} KiB of columns")
     return CATALOG_INDEX
 
+def search_catalog(query, limit=50):
+    """
+    Canonical catalog objects matching a name or any of its aliases, best
+    match first, then brightest first.  Each object appears once, with
+    every designation it has across the catalogs in 'designations'.
+    """
+    index = load_catalog_index()
+    return index['store'].rows(index['names'].search(query, limit))
+
 @app.route('/search_sky')
 def search_sky():
     """Search all catalogs for matching objects"""
@@ -887,45 +1138,220 @@ def search_sky():
     if not query or len(query) < 2:
         return jsonify([])
     
-    # Load catalogs if not already loaded
+    return jsonify(search_catalog(query, limit))
+
+CONE_MAX_RADIUS = 30.0     # degrees
+CONE_DEFAULT_LIMIT = 500
+
+@app.route('/catalog/cone')
+def catalog_cone():
+    """
+    Catalog objects within r degrees of (ra hours, dec degrees), nearest
+    first, each with its separation in degrees.  maglim drops fainter
+    objects; limit caps the result count.
+    """
+    try:
+        ra = float(request.args['ra'])
+        dec = float(request.args['dec'])
+        radius = float(request.args.get('r', 1.0))
+        maglim = request.args.get('maglim', type=float)
+        limit = int(request.args.get('limit', CONE_DEFAULT_LIMIT))
+    except (KeyError, ValueError):
+        return jsonify(error="ra and dec are required; r, maglim and limit must be numbers"), 400
+    if not (0.0 <= ra < 24.0 and -90.0 <= dec <= 90.0):
+        return jsonify(error="ra must be 0-24 hours and dec -90..90 degrees"), 400
+    if not (0.0 < radius <= CONE_MAX_RADIUS):
+        return jsonify(error=f"r must be between 0 and {CONE_MAX_RADIUS} degrees"), 400
+
     index = load_catalog_index()
-    
-    results = []
-    seen_names = set()
-    
-    # Exact match first
-    if query in index['by_name']:
-        for obj in index['by_name'][query]:
-            if obj['Name'] not in seen_names:
-                results.append(obj)
-                seen_names.add(obj['Name'])
-    
-    # Partial matches (starts with)
-    for name, objs in index['by_name'].items():
-        if len(results) >= limit:
-            break
-        if name.startswith(query):
-            for obj in objs:
-                if obj['Name'] not in seen_names:
-                    results.append(obj)
-                    seen_names.add(obj['Name'])
-                    if len(results) >= limit:
-                        break
-    
-    # Contains matches (if we still have room)
-    if len(results) < limit:
-        for name, objs in index['by_name'].items():
-            if len(results) >= limit:
-                break
-            if query in name and not name.startswith(query):
-                for obj in objs:
-                    if obj['Name'] not in seen_names:
-                        results.append(obj)
-                        seen_names.add(obj['Name'])
-                        if len(results) >= limit:
-                            break
-    
-    return jsonify(results)
+    hits = index['sky'].cone(ra, dec, radius, maglim=maglim, limit=max(0, limit) + 1)
+    truncated = len(hits) > limit
+    objects = []
+    for sep, row in hits[:limit]:
+        out = index['store'].row(row)
+        out['sep'] = round(sep, 5)
+        objects.append(out)
+    return jsonify({'ra': ra, 'dec': dec, 'r': radius, 'maglim': maglim,
+                    'count': len(objects), 'truncated': truncated, 'objects': objects})
+
+VISIBLE_DEFAULT_LIMIT = 500
+
+@app.route('/catalog/visible')
+def catalog_visible():
+    """
+    Catalog objects above minalt degrees right now, converted to alt/az in
+    one pass over the catalog columns.  maglim drops fainter objects, types
+    (comma-separated catalog names) restricts the catalogs, sort is 'mag'
+    (brightest first) or 'alt' (highest first).
+    """
+    try:
+        minalt = float(request.args.get('minalt', 0.0))
+        maglim = request.args.get('maglim', type=float)
+        limit = int(request.args.get('limit', VISIBLE_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify(error="minalt, maglim and limit must be numbers"), 400
+    sort = request.args.get('sort', 'mag')
+    if sort not in ('mag', 'alt'):
+        return jsonify(error="sort must be mag or alt"), 400
+    types = [t.strip() for t in request.args.get('types', '').split(',') if t.strip()]
+    unknown = [t for t in types if t not in CATALOG_TYPES]
+    if unknown:
+        return jsonify(error=f"Unknown catalog types: {', '.join(unknown)}", allowed=list(CATALOG_TYPES)), 400
+    latitude = site_latitude
+    if latitude is None:
+        return jsonify(error="Site location not known yet"), 503
+
+    lst, lst_source = current_lst_hours()
+    store = load_catalog_index()['store']
+    t0 = time.perf_counter()
+    _, jnow_ra, jnow_dec = jnow_cache.store_places(store)
+    hits = visible_objects(store, lst, latitude, minalt=minalt, maglim=maglim,
+                           catalogs=types, sort=sort, limit=max(0, limit),
+                           places=(jnow_ra, jnow_dec))
+    elapsed_ms = round((time.perf_counter() - t0) * 1000, 3)
+    objects = []
+    for row, alt, az in hits:
+        obj = store.row(row)
+        obj['RtAsc'] = round(float(jnow_ra[row]), 7)
+        obj['Declin'] = round(float(jnow_dec[row]), 6)
+        obj['alt'] = round(alt, 3)
+        obj['az'] = round(az, 3)
+        objects.append(obj)
+    return jsonify({'lst': lst, 'lst_source': lst_source, 'latitude': latitude,
+                    'minalt': minalt, 'maglim': maglim, 'types': types, 'sort': sort,
+                    'count': len(objects), 'elapsed_ms': elapsed_ms,
+                    'objects': objects})
+
+# --- Sky tiles ---
+# Progressive SkyView loading: objects per sky tile, brightest first, over
+# the JNow positions of the current JD bucket
+TILE_DEFAULT_LIMIT = 2000
+catalog_tiles = None
+
+def current_tile_index():
+    """(TileIndex, store, ra, dec) for the current JNow bucket, rebuilt when it changes."""
+    global catalog_tiles
+    store = load_catalog_index()['store']
+    bucket, ra, dec = jnow_cache.store_places(store)
+    index = catalog_tiles
+    if index is None or index.version != bucket:
+        t0 = time.perf_counter()
+        index = catalog_tiles = TileIndex(ra, dec, store.mag, version=bucket)
+        print(f"[SiPi TILES] Indexed {len(store)} objects into {len(GRIDS)} levels "
+              f"in {time.perf_counter() - t0:.3f}s")
+    return index, store, ra, dec
+
+@app.route('/catalog/tiles')
+def catalog_tile_grid():
+    """The tile layout of every level, so clients can work out which tiles are in view."""
+    index, _, _, _ = current_tile_index()
+    return jsonify({'version': index.version, 'unknown_mag': TILE_UNKNOWN_MAG,
+                    'levels': [grid.describe() for grid in GRIDS]})
+
+@app.route('/catalog/tiles/<int:level>/<int:tile>')
+def catalog_tile(level, tile):
+    """
+    Objects in one sky tile, brightest first (unknown magnitudes count as
+    20).  maglim stops at a magnitude, minmag skips what a client already
+    has from a shallower fetch, types restricts the catalogs.
+    """
+    if not (0 <= level < len(GRIDS)) or not (0 <= tile < GRIDS[level].count):
+        return jsonify(error=f"No tile {level}/{tile}"), 404
+    try:
+        minmag = request.args.get('minmag', type=float)
+        maglim = request.args.get('maglim', type=float)
+        limit = int(request.args.get('limit', TILE_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify(error="limit must be a number"), 400
+    types = [t.strip() for t in request.args.get('types', '').split(',') if t.strip()]
+    unknown = [t for t in types if t not in CATALOG_TYPES]
+    if unknown:
+        return jsonify(error=f"Unknown catalog types: {', '.join(unknown)}", allowed=list(CATALOG_TYPES)), 400
+
+    index, store, ra, dec = current_tile_index()
+    key = (level, tile, minmag, maglim, tuple(sorted(types)), limit)
+
+    def render():
+        bits = 0
+        for t in types:
+            bits |= 1 << CATALOG_TYPES.index(t)
+        rows = index.tile(level, tile, minmag, maglim)
+        if bits:
+            rows = [i for i in rows if store.catalogs[i] & bits]
+        truncated = len(rows) > max(0, limit)
+        objects = []
+        for i in rows[:max(0, limit)]:
+            obj = store.row(i)
+            obj['RtAsc'] = round(float(ra[i]), 7)
+            obj['Declin'] = round(float(dec[i]), 6)
+            objects.append(obj)
+        ra_lo, ra_hi, dec_lo, dec_hi = GRIDS[level].bounds(tile)
+        return json.dumps({
+            'level': level, 'tile': tile, 'version': index.version,
+            'bounds': {'ra': [ra_lo, ra_hi], 'dec': [dec_lo, dec_hi]},
+            'minmag': minmag, 'maglim': maglim, 'types': types,
+            'count': len(objects), 'truncated': truncated, 'objects': objects,
+        }, separators=(',', ':')).encode('utf-8')
+
+    body = index.cached(key, render)
+    etag = f"{BOOT_ID}-tile-{index.version}-{hashlib.sha256(repr(key).encode()).hexdigest()[:16]}"
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(body, mimetype='application/json')
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'max-age=3600'
+    return resp
+
+# --- Streaming catalogs ---
+# Newline-delimited JSON, brightest first, materialized row by row while it
+# is sent, so the client can draw the first rows before the rest arrive
+STREAM_FIRST_ROWS = 16      # first chunk is a few KB; chunks double from there
+STREAM_BATCH_ROWS = 256
+
+def stream_catalog(types, maglim=None, limit=None):
+    """NDJSON response of store rows from `types` (all when empty) at JNow positions."""
+    store = load_catalog_index()['store']
+    _, ra, dec = jnow_cache.store_places(store)
+    rows = store.brightest_first(maglim=maglim, catalogs=types)
+    if limit is not None:
+        rows = rows[:max(0, limit)]
+
+    def generate():
+        start, size = 0, STREAM_FIRST_ROWS
+        while start < len(rows):
+            lines = []
+            for i in rows[start:start + size]:
+                obj = store.row(i)
+                obj['RtAsc'] = round(float(ra[i]), 7)
+                obj['Declin'] = round(float(dec[i]), 6)
+                lines.append(json.dumps(obj, separators=(',', ':')))
+            yield '\n'.join(lines) + '\n'
+            start += size
+            size = min(size * 2, STREAM_BATCH_ROWS)
+
+    resp = Response(generate(), mimetype='application/x-ndjson')
+    resp.headers['X-Catalog-Rows'] = str(len(rows))
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+@app.route('/catalog/stream')
+def catalog_stream():
+    """
+    Catalog objects as newline-delimited JSON, one object per line,
+    brightest first (unknown magnitudes last).  types (comma-separated
+    catalog names), maglim and limit narrow the stream.
+    """
+    try:
+        maglim = request.args.get('maglim', type=float)
+        limit = request.args.get('limit', type=int)
+    except ValueError:
+        return jsonify(error="maglim and limit must be numbers"), 400
+    types = [t.strip() for t in request.args.get('types', '').split(',') if t.strip()]
+    unknown = [t for t in types if t not in CATALOG_TYPES]
+    if unknown:
+        return jsonify(error=f"Unknown catalog types: {', '.join(unknown)}", allowed=list(CATALOG_TYPES)), 400
+    return stream_catalog(types, maglim, limit)
 
 @app.route('/sync', methods=['POST'])
 def sync():
@@ -940,7 +1366,9 @@ def goto():
     ra = request.form.get('ra',''); dec = request.form.get('dec','')
     if not ra or not dec:
         return jsonify(response="Invalid RA or Dec")
-    return jsonify(response=send_command(f"GoTo {ra} {dec}\n"))
+    result = send_command(f"GoTo {ra} {dec}\n")
+    status_wake.set()
+    return jsonify(response=result)
 
 @app.route('/goto-altaz', methods=['POST'])
 def goto_altaz():
@@ -958,70 +1386,141 @@ def goto_altaz():
     # Command format: GoToAltAz Az Alt\n
     cmd = f"GoToAltAz {az:.6f} {alt:.6f}\n"
     result = send_command(cmd)
+    status_wake.set()
     return jsonify(response=result)
 # --- Calibration Points API ---
 import re
 
 POINTERR_PATH = "/usr/share/SiTech/SiTechExe/PointErr.txt"
 
+cal_points_cache = CalPointsCache(POINTERR_PATH)
+
 @app.route('/cal_points')
 def cal_points():
-    points = []
+    """
+    Calibration points from PointErr.txt, re-parsed only when the file changes.
+    Answers 304 while the version is unchanged (If-None-Match or ?since=);
+    ?since=<version> returns only the points added, removed or changed.
+    """
     try:
-        with open(POINTERR_PATH, 'r') as f:
-            for line in f:
-                parts = line.strip().split(';')
-                if len(parts) < 5:
-                    continue
-                idx = int(parts[0])
-                ra = float(parts[1])
-                dec = float(parts[2])
-                error = float(parts[3])
-                enabled = parts[4].strip().lower() == 'true'
-                points.append({
-                    'index': idx,
-                    'ra': ra,
-                    'dec': dec,
-                    'error': error,
-                    'enabled': enabled
-                })
+        current = cal_points_cache.get()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    return jsonify(points=points)
+    etag = f"{BOOT_ID}-cal-{current.version}"
+    since = request.args.get('since', type=int)
+    delta = None
+    if since is not None and since != current.version:
+        delta = cal_points_cache.delta(since)
+    if since == current.version or request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    elif delta is not None:
+        delta['delta'] = True
+        resp = jsonify(delta)
+    else:
+        resp = Response(current.body, mimetype='application/json')
+    resp.set_etag(etag)
+    resp.headers['X-Cal-Points-Version'] = str(current.version)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+# --- Solar system ---
+# Positions are computed locally (ephemeris.py) and cached per time bucket;
+# SiTechExe's GetSunMoonPlanets is only used for periodic cross-checks and
+# for ?source=sitech.
+SOLAR_SYSTEM_CROSSCHECK_INTERVAL = 1800  # seconds
+SOLAR_SYSTEM_CROSSCHECK_WARN = 0.25      # degrees
+
+solar_system_cache = EphemerisCache()
+solar_system_crosscheck = {'time': None, 'max_separation': None, 'separations': {}, 'error': None}
+_crosscheck_running = threading.Lock()
+
+def fetch_sitech_solar_system():
+    """GetSunMoonPlanets parsed to {body: {'ra', 'dec'}}; raises ValueError on a bad reply."""
+    response = send_command("GetSunMoonPlanets\n", timeout=10, terminator="\n")
+    if not response or response.strip() == "":
+        raise ValueError('No response from SiTech')
+    # Format: "ra;dec;ra;dec;..." for Mercury, Venus, Mars, Jupiter, Saturn,
+    # Uranus, Neptune, Pluto, Sun, Moon
+    coords = response.strip().split(';')
+    if len(coords) < 20:
+        raise ValueError(f'Invalid response format, expected 20 values, got {len(coords)}')
+    objects = {}
+    for i, name in enumerate(EPHEMERIS_BODIES):
+        try:
+            objects[name] = {'ra': float(coords[i * 2]), 'dec': float(coords[i * 2 + 1])}
+        except ValueError:
+            continue
+    return objects
+
+def _solar_system_site():
+    """Site for the topocentric Moon, once SiteLocations has really been read."""
+    if mount_metadata.elevation is None or site_latitude is None:
+        return None, None, 0.0
+    return site_latitude, site_longitude, mount_metadata.elevation
+
+def crosscheck_solar_system():
+    """Compare the local ephemeris with GetSunMoonPlanets and log the worst separation."""
+    if not _crosscheck_running.acquire(blocking=False):
+        return
+    try:
+        checked = time.time()
+        try:
+            remote = fetch_sitech_solar_system()
+        except Exception as e:
+            solar_system_crosscheck.update(time=checked, error=str(e))
+            print(f"[SiPi EPHEMERIS] Cross-check skipped: {e}")
+            return
+        local = solar_system_positions(checked, *_solar_system_site())
+        separations = {
+            name: round(angular_separation(pos['ra'], pos['dec'], local[name]['ra'], local[name]['dec']), 4)
+            for name, pos in remote.items() if name in local
+        }
+        worst = max(separations.values()) if separations else None
+        solar_system_crosscheck.update(time=checked, max_separation=worst,
+                                       separations=separations, error=None)
+        if worst is not None and worst > SOLAR_SYSTEM_CROSSCHECK_WARN:
+            print(f"[SiPi EPHEMERIS] Local ephemeris differs from SiTechExe by up to {worst:.3f} deg: {separations}")
+        else:
+            print(f"[SiPi EPHEMERIS] Cross-check OK, max separation {worst} deg")
+    finally:
+        _crosscheck_running.release()
+
+def _schedule_solar_system_crosscheck():
+    last = solar_system_crosscheck['time']
+    if last is None or time.time() - last > SOLAR_SYSTEM_CROSSCHECK_INTERVAL:
+        solar_system_crosscheck['time'] = time.time()  # Don't start a second one meanwhile
+        threading.Thread(target=crosscheck_solar_system, daemon=True).start()
 
 @app.route('/solar_system')
 def solar_system():
+    """
+    Apparent RA (hours)/Dec (degrees) of the Sun, Moon and planets.
+    ?source=sitech asks SiTechExe instead of the local ephemeris.
+    """
+    if request.args.get('source') == 'sitech':
+        try:
+            return jsonify(fetch_sitech_solar_system())
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
     try:
-        # Send GetSunMoonPlanets command to SiTech
-        response = send_command("GetSunMoonPlanets\n", timeout=10, terminator="\n")
-        if not response or response.strip() == "":
-            return jsonify({'error': 'No response from SiTech'}), 500
-        
-        # Parse the semicolon-delimited response
-        # Format: "ra;dec;ra;dec;ra;dec;ra;dec;ra;dec;ra;dec;ra;dec;ra;dec;ra;dec;ra;dec"
-        # Order: Mercury, Venus, Mars, Jupiter, Saturn, Uranus, Neptune, Pluto, Sun, Moon
-        coords = response.strip().split(';')
-        if len(coords) < 20:
-            return jsonify({'error': f'Invalid response format, expected 20 values, got {len(coords)}'}), 500
-        
-        # Parse coordinates into objects
-        objects = {}
-        names = ['Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto', 'Sun', 'Moon']
-        
-        for i in range(10):
-            ra_idx = i * 2
-            dec_idx = i * 2 + 1
-            if ra_idx < len(coords) and dec_idx < len(coords):
-                try:
-                    ra = float(coords[ra_idx])
-                    dec = float(coords[dec_idx])
-                    objects[names[i].lower()] = {'ra': ra, 'dec': dec}
-                except ValueError:
-                    continue
-        
-        return jsonify(objects)
+        _, _, body = solar_system_cache.lookup(None, *_solar_system_site())
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        print(f"[SiPi EPHEMERIS] Local ephemeris failed, asking SiTechExe: {e!r}")
+        try:
+            return jsonify(fetch_sitech_solar_system())
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    _schedule_solar_system_crosscheck()
+    resp = Response(body, mimetype='application/json')
+    resp.headers['Cache-Control'] = f'max-age={int(MOON_BUCKET)}'
+    return resp
+
+@app.route('/solar_system/crosscheck')
+def solar_system_crosscheck_route():
+    """Last local-vs-SiTechExe comparison; ?run=1 runs a new one first."""
+    if request.args.get('run'):
+        crosscheck_solar_system()
+    return jsonify(solar_system_crosscheck)
 
 @app.route('/enable_cal_point', methods=['POST'])
 def enable_cal_point():
@@ -1059,6 +1558,8 @@ def moveaxis():
     axis = request.form.get('axis',''); arg = request.form.get('arg','')
     if not axis:
         return jsonify(response="Missing axis")
+    if axis not in ('Pri', 'Sec'):
+        return jsonify(error="Invalid axis, must be Pri or Sec"), 400
     cmd = f"MoveAxisSPG{axis}" + (f" {arg}" if arg else "") + "\n"
     send_move_no_wait(cmd)
     return jsonify(response="Command sent")
@@ -1223,15 +1724,7 @@ def start():
 
 @app.route('/toggle_mode', methods=['POST'])
 def toggle_mode():
-    with status_lock:
-        try:
-            # Try to parse scope_status, handle cases where SiTechExe isn't connected
-            if scope_status and ';' in scope_status and scope_status != "No status yet":
-                fb = int(scope_status.split(';')[0] or 0)
-            else:
-                fb = 0  # Default value when no valid status available
-        except (ValueError, IndexError):
-            fb = 0  # Fallback to default if parsing fails
+    fb = scope_snapshot.bits  # 0 when SiTechExe isn't connected
     if fb & 64:
         cmd  = "MotorsToAuto\n"
         mode = "Auto"
@@ -1241,15 +1734,103 @@ def toggle_mode():
     send_move_no_wait(cmd)
     return jsonify(mode=mode)
 
-@app.route('/getModelInfo', methods=['POST'])
-def get_model_info():
-    raw = send_command("GetPointXPStatus\n", timeout=1)
+def parse_model_info(raw):
+    """Calibration point count and RMS from a GetPointXPStatus reply."""
     parts = [p.strip() for p in raw.split(';')]
     cal_pts = parts[0] if parts else "0"
     rms = parts[1] if len(parts) > 1 else ""
     if rms.startswith("RMS="):
         rms = rms[4:]
-    return jsonify(cal_pts=cal_pts, rms=rms)
+    return {'cal_pts': cal_pts, 'rms': rms}
+
+@app.route('/getModelInfo', methods=['POST'])
+def get_model_info():
+    raw = send_command("GetPointXPStatus\n", timeout=1)
+    return jsonify(**parse_model_info(raw))
+
+# --- Batched model commands ---
+# op -> (argument names and their type, SiTechExe command template, terminator)
+# Only commands that already have their own route are allowed in a batch.
+BATCH_OPERATIONS = {
+    'sync':                  ((('ra', float), ('dec', float)), "Sync {ra} {dec} 1\n", "\n"),
+    'calpt':                 ((('ra', float), ('dec', float)), "Sync {ra} {dec} 2\n", "\n"),
+    'clear':                 ((), "ClearAllCalPoints\n", "\n"),
+    'save_model':            ((), "SaveModel\n", "\n"),
+    'enable_cal_point':      ((('index', int),), "EnablePoint {index}\n", "\n"),
+    'disable_cal_point':     ((('index', int),), "DisablePoint {index}\n", "\n"),
+    'remove_last_cal_point': ((), "RemoveLastCalPoint\n", "\n"),
+    'getModelInfo':          ((), "GetPointXPStatus\n", None),
+}
+BATCH_MAX_STEPS = 50
+BATCH_MAX_STEP_TIMEOUT = 30
+
+def sitech_reply_failed(raw):
+    """True for an empty reply or one whose '_' message reports an error."""
+    if not raw or not raw.strip():
+        return True
+    marker = raw.find('_')
+    return marker >= 0 and 'error' in raw[marker + 1:].lower()
+
+@app.route('/batch', methods=['POST'])
+def batch():
+    """
+    Run several model commands back-to-back as one gateway job.
+    Body: {"steps": [{"op": "sync", "ra": 5.59, "dec": -5.39}, {"op": "save_model"}, ...],
+           "stop_on_error": true, "step_timeout": 5}
+    A step may carry its own "timeout".  Returns one result per step.
+    """
+    data = request.get_json(silent=True) or {}
+    steps = data.get('steps')
+    if not isinstance(steps, list) or not steps:
+        return jsonify(error="steps must be a non-empty list"), 400
+    if len(steps) > BATCH_MAX_STEPS:
+        return jsonify(error=f"At most {BATCH_MAX_STEPS} steps per batch"), 400
+    stop_on_error = bool(data.get('stop_on_error', True))
+    try:
+        default_timeout = float(data.get('step_timeout', 5))
+    except (TypeError, ValueError):
+        return jsonify(error="step_timeout must be a number"), 400
+
+    commands, ops = [], []
+    for n, step in enumerate(steps):
+        op = step.get('op') if isinstance(step, dict) else None
+        if op not in BATCH_OPERATIONS:
+            return jsonify(error=f"Step {n}: unknown op {op!r}", allowed=sorted(BATCH_OPERATIONS)), 400
+        params, template, terminator = BATCH_OPERATIONS[op]
+        args = {}
+        for name, kind in params:
+            try:
+                args[name] = kind(step[name])
+            except (KeyError, TypeError, ValueError):
+                return jsonify(error=f"Step {n} ({op}): missing or invalid {name}"), 400
+        try:
+            timeout = min(max(float(step.get('timeout', default_timeout)), 0.1), BATCH_MAX_STEP_TIMEOUT)
+        except (TypeError, ValueError):
+            return jsonify(error=f"Step {n} ({op}): invalid timeout"), 400
+        commands.append((template.format(**args), timeout, terminator))
+        ops.append(op)
+
+    def stop_when(result):
+        return stop_on_error and (result['error'] is not None or sitech_reply_failed(result['response']))
+
+    started = time.perf_counter()
+    print(f"[SiPi BATCH] Running {len(commands)} steps: {', '.join(ops)}")
+    future = gateway.submit_batch(commands, stop_when=stop_when)
+    try:
+        results = future.result(timeout=max(0.0, future.deadline - time.monotonic()) + 0.5)
+    except Exception as e:
+        print(f"[SiPi BATCH] Batch failed: {e!r}")
+        return jsonify(error=str(e) or type(e).__name__), 504
+
+    for op, result in zip(ops, results):
+        result['op'] = op
+        if op == 'getModelInfo' and result.get('response'):
+            result.update(parse_model_info(result['response']))
+    completed = sum(1 for r in results if not r.get('skipped'))
+    failed = any(r.get('error') or (not r.get('skipped') and sitech_reply_failed(r['response']))
+                 for r in results)
+    return jsonify(results=results, completed=completed, stopped=completed < len(results),
+                   ok=not failed, elapsed=round(time.perf_counter() - started, 6))
 
 
 # --- New: Set system time from ISO string (for popup) ---
@@ -1966,6 +2547,7 @@ def edit_config():
         # Send ReloadConfigFile command to SiTechExe after saving config
         try:
             send_command('ReloadConfigFile\n')
+            mount_metadata.invalidate()
             msg = "Configuration updated and reload command sent"
             status = "success"
         except Exception as e:
@@ -2014,15 +2596,7 @@ def edit_config():
             if ln.startswith('ssid='):           wssid = ln.split('=',1)[1]
             if ln.startswith('wpa_passphrase='): wpass = ln.split('=',1)[1]
 
-    with status_lock:
-        try:
-            # Try to parse scope_status, handle cases where SiTechExe isn't connected
-            if scope_status and ';' in scope_status and scope_status != "No status yet":
-                fb = int(scope_status.split(';')[0] or 0)
-            else:
-                fb = 0  # Default value when no valid status available
-        except (ValueError, IndexError):
-            fb = 0  # Fallback to default if parsing fails
+    fb = scope_snapshot.bits  # 0 when SiTechExe isn't connected
     mode = "Auto" if (fb & 64) else "Manual"
 
     sipi_version = get_sipi_version()
@@ -2076,27 +2650,13 @@ def remove_last_cal_point():
     resp = send_command("RemoveLastCalPoint\n", timeout=5, terminator="\n")
     return jsonify(response=resp)
 
-# --- Astrometric Corrections Removed ---
-# Functions for astrometric corrections have been removed
+# --- Catalogs in JNow ---
 
-@app.route('/current_lst')
-def current_lst():
-    """Get current LST from SiTech hardware for SkyView synchronization."""
-    with status_lock:
-        s = scope_status
-    fields = s.split(';')
-    if len(fields) >= 8:
-        try:
-            # Return LST in decimal hours for JavaScript use
-            lst_hours = float(fields[7].strip())
-            return jsonify({
-                'lst_hours': lst_hours,
-                'lst_formatted': format_hms_no_decimals(fields[7].strip()),
-                'source': 'sitech_hardware',
-                'timestamp': time.time()
-            })
-        except (ValueError, IndexError):
-            pass
+def current_lst_hours():
+    """(LST in decimal hours, source): the mount's LST, else computed from the clock."""
+    st = scope_snapshot
+    if st.valid and st.lst is not None:
+        return st.lst, 'sitech_hardware'
     
     # Fallback to calculated LST if SiTech not available
     import datetime
@@ -2110,98 +2670,187 @@ def current_lst():
     lst = lst % 24
     if lst < 0:
         lst += 24
-    
+    return lst, 'calculated_fallback'
+
+@app.route('/current_lst')
+def current_lst():
+    """Get current LST from SiTech hardware for SkyView synchronization."""
+    lst, source = current_lst_hours()
+    st = scope_snapshot
     return jsonify({
+        # Return LST in decimal hours for JavaScript use
         'lst_hours': lst,
-        'lst_formatted': format_hms_no_decimals(str(lst)),
-        'source': 'calculated_fallback',
+        'lst_formatted': st.lst_str if source == 'sitech_hardware' else format_hms_no_decimals(str(lst)),
+        'source': source,
         'timestamp': time.time()
     })
 
+def serve_jnow_catalog(name):
+    """
+    A static catalog with its positions carried to JNow for the current
+    JD bucket, so SkyView plots what SiTechExe slews to.  Falls back to the
+    static file if the transform fails.
+    """
+    path = catalog_paths[name]
+    if not os.path.exists(path):
+        return jsonify(error=f"{name} catalog not found"), 404
+    try:
+        bucket, body = jnow_cache.body(name, path)
+    except (OSError, ValueError) as e:
+        print(f"[SiPi JNOW] {name}: {e}; serving the static catalog")
+        return send_from_directory(os.path.join(BASE_DIR, 'static'), os.path.basename(path))
+    etag = f"{BOOT_ID}-jnow-{name}-{bucket:.1f}"
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(body, mimetype='application/json')
+    resp.set_etag(etag)
+    resp.headers['X-Correction-JD'] = f"{bucket:.1f}"
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
 @app.route('/corrected_stars.json')
 def corrected_stars():
-    """Serve the star catalog (astrometric corrections removed)."""
-    return send_from_directory(os.path.join(BASE_DIR, 'static'), 'stars.json')
+    return serve_jnow_catalog('stars')
 
 @app.route('/corrected_messier.json')
 def corrected_messier():
-    """Serve the Messier catalog (astrometric corrections removed)."""
-    return send_from_directory(os.path.join(BASE_DIR, 'static'), 'messier.json')
+    return serve_jnow_catalog('messier')
 
 @app.route('/corrected_constellations.json')
 def corrected_constellations():
-    """Serve the constellation catalog (astrometric corrections removed)."""
-    return send_from_directory(os.path.join(BASE_DIR, 'static'), 'constellations.json')
+    return serve_jnow_catalog('constellations')
 
 @app.route('/corrected_galaxies.json')
 def corrected_galaxies():
-    """Serve the galaxy catalog (astrometric corrections removed)."""
-    return send_from_directory(os.path.join(BASE_DIR, 'static'), 'galaxies.json')
+    return serve_jnow_catalog('galaxies')
 
 @app.route('/corrected_globular_clusters.json')
 def corrected_globular_clusters():
-    """Serve the globular cluster catalog (astrometric corrections removed)."""
-    return send_from_directory(os.path.join(BASE_DIR, 'static'), 'globular_clusters.json')
+    return serve_jnow_catalog('globular_clusters')
 
 @app.route('/corrected_nebula.json')
 def corrected_nebula():
-    """Serve the nebula catalog (astrometric corrections removed)."""
-    return send_from_directory(os.path.join(BASE_DIR, 'static'), 'nebula.json')
+    return serve_jnow_catalog('nebula')
 
 @app.route('/corrected_open_clusters.json')
 def corrected_open_clusters():
-    """Serve the open cluster catalog (astrometric corrections removed)."""
-    return send_from_directory(os.path.join(BASE_DIR, 'static'), 'open_clusters.json')
+    return serve_jnow_catalog('open_clusters')
 
 @app.route('/corrected_planetary_nebula.json')
 def corrected_planetary_nebula():
-    """Serve the planetary nebula catalog (astrometric corrections removed)."""
-    return send_from_directory(os.path.join(BASE_DIR, 'static'), 'planetary_nebula.json')
+    return serve_jnow_catalog('planetary_nebula')
+
+ASSET_FILE = re.compile(r'^([a-z_]+)\.([0-9a-f]{16})\.json$')
+ASSET_MAX_AGE = 31536000    # one year; hashed URLs never change content
+
+def publish_catalog_assets():
+    """{name: Asset} for every catalog, republished when its JNow bucket or file changes."""
+    assets = {}
+    for name, path in catalog_paths.items():
+        if not os.path.exists(path):
+            continue
+        try:
+            bucket, body = jnow_cache.body(name, path)
+            assets[name] = catalog_assets.publish(name, bucket, lambda body=body: body)
+        except (OSError, ValueError) as e:
+            print(f"[SiPi ASSETS] {name}: {e}")
+    for name, path in STATIC_ASSET_PATHS.items():
+        try:
+            assets[name] = catalog_assets.publish(name, os.path.getmtime(path),
+                                                  lambda path=path: open(path, 'rb').read())
+        except OSError as e:
+            print(f"[SiPi ASSETS] {name}: {e}")
+    return assets
+
+@app.route('/catalog/manifest.json')
+def catalog_manifest():
+    """
+    Current content-hashed catalog URLs.  Small and revalidated on every
+    load; the catalogs it points to are cached by the browser for good.
+    """
+    assets = publish_catalog_assets()
+    etag = f"manifest-{hashlib.sha256(''.join(a.digest for a in assets.values()).encode()).hexdigest()[:16]}"
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = jsonify({
+            'assets': {name: f"/catalog/assets/{a.filename}" for name, a in assets.items()},
+            'files': {name: a.info() for name, a in assets.items()},
+        })
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+@app.route('/catalog/assets/<filename>')
+def catalog_asset(filename):
+    """
+    A hashed catalog file, precompressed as the client accepts (brotli, then
+    gzip), with a strong ETag per encoding and byte-range support.
+    """
+    match = ASSET_FILE.match(filename)
+    asset = catalog_assets.find(match.group(1), match.group(2)) if match else None
+    if asset is None:
+        return jsonify(error=f"No catalog asset {filename}"), 404
+    encoding, path = asset.variant(request.headers.get('Accept-Encoding'))
+    resp = send_file(path, mimetype='application/json', conditional=True,
+                     etag=f"{asset.digest}-{encoding or 'identity'}", max_age=ASSET_MAX_AGE)
+    if encoding:
+        resp.headers['Content-Encoding'] = encoding
+    resp.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    resp.headers['Vary'] = 'Accept-Encoding'
+    return resp
 
 @app.route('/reprocess_catalogs', methods=['POST'])
 def reprocess_catalogs():
-    """Catalog reprocessing removed (astrometric corrections disabled)."""
-    return jsonify({
-        'status': 'disabled',
-        'message': 'Astrometric corrections have been removed from this system'
-    })
+    """Warm the JNow cache for the current JD bucket; cached catalogs are not recomputed."""
+    results = {}
+    for name, path in catalog_paths.items():
+        if not os.path.exists(path):
+            results[name] = {'error': 'not found'}
+            continue
+        try:
+            jnow_cache.body(name, path)
+            results[name] = jnow_cache.last.get(name, {'source': 'memory'})
+        except (OSError, ValueError) as e:
+            results[name] = {'error': str(e)}
+    return jsonify({'status': 'ok', 'catalogs': results})
 
 @app.route('/catalog_status')
 def catalog_status():
-    """Get status of current catalogs (astrometric corrections removed)."""
+    """
+    Get status of current catalogs.  correction_jd is the JD bucket of the
+    JNow positions last served for the catalog.  Object counts come from
+    the compiled catalog's metadata, recorded when it was built, so no
+    catalog file is parsed here.
+    """
+    meta = load_catalog_index()['meta']
     status = {}
     for name, path in catalog_paths.items():
-        if path and os.path.exists(path):
-            try:
-                with open(path, 'r') as f:
-                    data = json.load(f)
-                
-                # Handle different catalog formats
-                if name == 'constellations':
-                    sample_size = len(data.get('features', []))
-                else:
-                    sample_size = len(data) if isinstance(data, list) else 0
-                
-                status[name] = {
-                    'path': path,
-                    'exists': True,
-                    'corrected': False,  # No corrections applied
-                    'correction_jd': None,
-                    'file_size': os.path.getsize(path),
-                    'modified': os.path.getmtime(path),
-                    'object_count': sample_size
-                }
-            except Exception as e:
-                status[name] = {
-                    'path': path,
-                    'exists': True,
-                    'error': str(e)
-                }
-        else:
+        info = meta['sources'].get(name)
+        if not os.path.exists(path):
             status[name] = {
                 'path': path,
                 'exists': False
             }
+        elif info is None or 'error' in info:
+            status[name] = {
+                'path': path,
+                'exists': True,
+                'error': info['error'] if info else 'Not in the compiled catalog'
+            }
+        else:
+            status[name] = {
+                'path': path,
+                'exists': True,
+                'corrected': name in jnow_cache.last,
+                'correction_jd': jnow_cache.last.get(name, {}).get('jd'),
+                'file_size': os.path.getsize(path),
+                'modified': os.path.getmtime(path),
+                'object_count': info['entries'],
+                # The file changed after the server compiled it; restart to pick it up
+                'stale': os.path.getsize(path) != info['size'] or os.path.getmtime(path) != info['mtime']
+            }
     
     return jsonify(status)
 
@@ -2455,9 +3104,8 @@ if __name__ == '__main__':
         print("[SiPi STARTUP] Linux mode: Full functionality including WiFi hotspot and time setting")
     print(f"[SiPi STARTUP] Attempting to connect to SiTechExe at {SI_TECH_HOST}:{SI_TECH_PORT}")
     
-    get_site_location()
-    connect_command_socket()
-    connect_persistent_socket()
+    gateway.start()
+    mount_metadata.refresh()
     
     # Load catalog index at startup
     print("[SiPi STARTUP] Loading catalog index...")
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+SiPi Route Benchmark
+End-to-end latency and throughput of the hot Flask routes, measured over
+real HTTP against SiPi.py's app backed by the SiTechExe simulator.  Results
+are written as JSON with stable key order so runs can be diffed between
+versions.
+
+Usage:
+    python3 benchmark_routes.py [--concurrency 1,4,16] [--duration 5] [--output bench.json]
+    python3 benchmark_routes.py --baseline before.json --output after.json
+    python3 benchmark_routes.py --url http://192.168.11.1:5000   # benchmark a running SiPi
+
+Against a running SiPi (--url) only the read-only routes run by default;
+the routes that move the mount need --allow-motion.  Every run ends with
+an Abort.
+"""
+
+import argparse
+import datetime
+import http.client
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (method, path, request bodies cycled through by each client)
+# Bodies are (content type, payload) pairs; None sends no body.
+FORM = 'application/x-www-form-urlencoded'
+JSON = 'application/json'
+ROUTES = {
+    'status':        ('GET',  '/status', [None]),
+    'joystick_move': ('POST', '/joystick_move', [
+        (JSON, {'axis': 'Pri', 'direction': 'up'}),
+        (JSON, {'axis': 'Pri', 'direction': 'stop'}),
+        (JSON, {'axis': 'Sec', 'direction': 'left'}),
+        (JSON, {'axis': 'Sec', 'direction': 'stop'}),
+    ]),
+    'goto':          ('POST', '/goto', [
+        (FORM, {'ra': '5.5881', 'dec': '-5.3911'}),
+        (FORM, {'ra': '0.7123', 'dec': '41.2692'}),
+    ]),
+    'search_sky':    ('GET',  '/search_sky', [
+        (None, {'q': 'm4'}), (None, {'q': 'ngc 7'}), (None, {'q': 'orion'}), (None, {'q': 'vega'}),
+    ]),
+    'search':        ('POST', '/search', [
+        (FORM, {'query': 'M42'}), (FORM, {'query': 'NGC 7000'}), (FORM, {'query': 'M13'}),
+    ]),
+    'cal_points':    ('GET',  '/cal_points', [None]),
+    'solar_system':  ('GET',  '/solar_system', [None]),
+}
+# Routes that slew or move a real mount
+MOTION_ROUTES = ('joystick_move', 'goto')
+READ_ONLY_ROUTES = tuple(name for name in ROUTES if name not in MOTION_ROUTES)
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = max(0, math.ceil(p / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+def latency_summary(seconds):
+    """min/mean/p50/p95/p99/max in milliseconds, rounded for readable diffs."""
+    values = sorted(s * 1000.0 for s in seconds)
+    if not values:
+        return {}
+    out = {
+        'min': values[0],
+        'mean': sum(values) / len(values),
+        'max': values[-1],
+    }
+    for p in PERCENTILES:
+        out[f'p{p}'] = percentile(values, p)
+    return {k: round(v, 3) for k, v in out.items()}
+
+
+class RouteClient:
+    """One keep-alive HTTP connection issuing a route's requests in turn."""
+
+    def __init__(self, host, port, method, path, bodies, offset=0):
+        self.host, self.port = host, port
+        self.method, self.path = method, path
+        self.bodies = bodies
+        self.n = offset
+        self.conn = None
+
+    def request(self):
+        body = self.bodies[self.n % len(self.bodies)]
+        self.n += 1
+        path, payload, headers = self.path, None, {}
+        if body is not None:
+            ctype, data = body
+            if ctype is None:
+                path += '?' + urllib.parse.urlencode(data)
+            elif ctype == JSON:
+                payload, headers['Content-Type'] = json.dumps(data), ctype
+            else:
+                payload, headers['Content-Type'] = urllib.parse.urlencode(data), ctype
+        for attempt in (0, 1):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.conn.request(self.method, path, body=payload, headers=headers)
+                resp = self.conn.getresponse()
+                resp.read()
+                if resp.will_close:
+                    self.close()
+                return resp.status
+            except (http.client.HTTPException, OSError):
+                self.close()
+                if attempt:
+                    raise
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def stop_mount(host, port):
+    """POST /abort so a run never leaves the mount slewing or moving."""
+    client = RouteClient(host, port, 'POST', '/abort', [None])
+    try:
+        return client.request()
+    except (http.client.HTTPException, OSError) as e:
+        print(f"[BENCH] Abort failed: {e}", file=sys.stderr)
+        return None
+    finally:
+        client.close()
+
+def run_route(host, port, name, concurrency, duration, warmup):
+    """Hammer one route with `concurrency` clients for `duration` seconds."""
+    method, path, bodies = ROUTES[name]
+    latencies = [[] for _ in range(concurrency)]
+    statuses = [{} for _ in range(concurrency)]
+    errors = [0] * concurrency
+    start_gate = threading.Barrier(concurrency + 1)
+    stop_at = [0.0]
+
+    def worker(i):
+        client = RouteClient(host, port, method, path, bodies, offset=i)
+        warm_until = time.monotonic() + warmup
+        while time.monotonic() < warm_until:
+            try: client.request()
+            except Exception: pass
+        start_gate.wait()
+        while True:
+            t0 = time.perf_counter()
+            if time.monotonic() >= stop_at[0]:
+                break
+            try:
+                code = client.request()
+            except Exception:
+                errors[i] += 1
+                continue
+            latencies[i].append(time.perf_counter() - t0)
+            statuses[i][code] = statuses[i].get(code, 0) + 1
+        client.close()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    stop_at[0] = time.monotonic() + warmup + duration + 60   # Provisional, until the gate opens
+    start_gate.wait()
+    began = time.monotonic()
+    stop_at[0] = began + duration
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - began
+
+    all_latencies = [s for per in latencies for s in per]
+    status_counts = {}
+    for per in statuses:
+        for code, n in per.items():
+            status_counts[str(code)] = status_counts.get(str(code), 0) + n
+    non_2xx = sum(n for code, n in status_counts.items() if not code.startswith(('2', '3')))
+    return {
+        'requests': len(all_latencies),
+        'errors': sum(errors) + non_2xx,
+        'status_codes': status_counts,
+        'throughput_rps': round(len(all_latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        'latency_ms': latency_summary(all_latencies),
+    }
+
+
+class StatusPublishMonitor:
+    """
+    Samples SiPi.scope_snapshot while the benchmark runs and reports the gaps
+    between published snapshots; a stalled or slowly reconnecting status loop
+    shows up here long before it shows in /status latency.
+    """
+
+    def __init__(self, sipi, period=0.01):
+        self.sipi = sipi
+        self.period = period
+        self.gaps = []
+        self.versions = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return {
+            'published': self.versions,
+            'gap_ms': latency_summary(self.gaps),
+        }
+
+    def _run(self):
+        last_version = self.sipi.scope_snapshot.version
+        last_time = time.monotonic()
+        while not self._stop.wait(self.period):
+            version = self.sipi.scope_snapshot.version
+            if version != last_version:
+                now = time.monotonic()
+                self.gaps.append(now - last_time)
+                self.versions += version - last_version
+                last_version, last_time = version, now
+
+
+def write_pointerr(path, count=60):
+    """Synthetic PointErr.txt with `count` calibration points for /cal_points."""
+    with open(path, 'w') as f:
+        for i in range(count):
+            f.write(f"{i};{(i * 0.4) % 24:.6f};{(i * 7) % 150 - 60:.6f};{(i * 13) % 90 / 3:.3f};"
+                    f"{'False' if i % 7 == 0 else 'True'}\n")
+
+
+def start_local_stack(args):
+    """Simulator + SiPi app served by werkzeug on free ports; returns (host, port, SiPi module, cleanup)."""
+    import sitech_simulator
+    from werkzeug.serving import make_server
+
+    per_verb = {}
+    if args.search_latency is not None:
+        per_verb = {'SearchDatabase': args.search_latency, 'GetSunMoonPlanets': args.search_latency}
+    sim = sitech_simulator.start_simulator('127.0.0.1', 0, args.sim_latency, args.sim_jitter, per_verb)
+    sim_port = sim.server_address[1]
+
+    import SiPi
+    SiPi.SI_TECH_HOST, SiPi.SI_TECH_PORT = '127.0.0.1', sim_port
+    SiPi.gateway.host, SiPi.gateway.port = '127.0.0.1', sim_port
+    workdir = tempfile.mkdtemp(prefix='sipi-bench-')
+    SiPi.POINTERR_PATH = os.path.join(workdir, 'PointErr.txt')
+    write_pointerr(SiPi.POINTERR_PATH, args.cal_points)
+    SiPi.cal_points_cache.path = SiPi.POINTERR_PATH
+
+    SiPi.gateway.start()
+    SiPi.mount_metadata.refresh()
+    SiPi.load_catalog_index()
+    threading.Thread(target=SiPi.status_update_loop, daemon=True).start()
+
+    server = make_server('127.0.0.1', 0, SiPi.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def cleanup():
+        server.shutdown()
+        sim.shutdown()
+        try:
+            os.remove(SiPi.POINTERR_PATH)
+            os.rmdir(workdir)
+        except OSError:
+            pass
+
+    return '127.0.0.1', server.server_port, SiPi, cleanup
+
+
+def git_revision():
+    try:
+        out = subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=BASE_DIR,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(baseline, current, out=sys.stdout):
+    """Print per-route percentage changes of p50/p95/p99 and throughput against a baseline run."""
+    print(f"\n{'route':<14}{'conc':>5}  {'p50':>9}{'p95':>9}{'p99':>9}{'rps':>9}", file=out)
+    for name, by_conc in current['routes'].items():
+        for conc, cur in by_conc.items():
+            old = baseline.get('routes', {}).get(name, {}).get(conc)
+            if not old:
+                continue
+            cells = []
+            for key in ('p50', 'p95', 'p99'):
+                a, b = old['latency_ms'].get(key), cur['latency_ms'].get(key)
+                cells.append(f"{(b - a) / a * 100:+8.1f}%" if a and b is not None else f"{'n/a':>9}")
+            a, b = old['throughput_rps'], cur['throughput_rps']
+            cells.append(f"{(b - a) / a * 100:+8.1f}%" if a else f"{'n/a':>9}")
+            print(f"{name:<14}{conc:>5}  " + "".join(cells), file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SiPi's hot Flask routes")
+    parser.add_argument('--routes', default=None,
+                        help="comma-separated subset of: " + ", ".join(ROUTES)
+                        + " (default: all, or only the read-only ones with --url)")
+    parser.add_argument('--concurrency', default='1,4,16',
+                        help="comma-separated client counts to run each route at")
+    parser.add_argument('--duration', type=float, default=5.0, help="measured seconds per route and concurrency")
+    parser.add_argument('--warmup', type=float, default=0.5, help="unmeasured seconds before each run")
+    parser.add_argument('--output', default=None, help="write JSON results here")
+    parser.add_argument('--baseline', default=None, help="earlier JSON results to compare against")
+    parser.add_argument('--url', default=None,
+                        help="benchmark an already running SiPi instead of starting the simulator")
+    parser.add_argument('--allow-motion', action='store_true',
+                        help="with --url, allow routes that move the mount: " + ", ".join(MOTION_ROUTES))
+    parser.add_argument('--sim-latency', type=float, default=0.002, help="simulator reply latency in seconds")
+    parser.add_argument('--sim-jitter', type=float, default=0.001, help="simulator latency jitter in seconds")
+    parser.add_argument('--search-latency', type=float, default=None,
+                        help="simulator latency for SearchDatabase/GetSunMoonPlanets")
+    parser.add_argument('--cal-points', type=int, default=60, help="points in the synthetic PointErr.txt")
+    parser.add_argument('--verbose', action='store_true',
+                        help="keep SiPi's console output and the request log (slows every route)")
+    args = parser.parse_args()
+
+    if args.routes is None:
+        names = list(READ_ONLY_ROUTES if args.url else ROUTES)
+    else:
+        names = [n.strip() for n in args.routes.split(',') if n.strip()]
+    unknown = [n for n in names if n not in ROUTES]
+    if unknown:
+        parser.error(f"unknown route(s): {', '.join(unknown)}")
+    motion = [n for n in names if n in MOTION_ROUTES]
+    if args.url and motion and not args.allow_motion:
+        parser.error(f"{', '.join(motion)} would move the mount at {args.url}; pass --allow-motion")
+    levels = [int(c) for c in args.concurrency.split(',') if c.strip()]
+
+    report = sys.stdout
+    if not args.verbose and not args.url:
+        # SiPi prints per command; on a terminal that costs more than the routes themselves
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        sys.stdout = open(os.devnull, 'w')
+
+    sipi = None
+    if args.url:
+        parsed = urllib.parse.urlparse(args.url)
+        host, port, cleanup = parsed.hostname, parsed.port or 80, (lambda: None)
+    else:
+        host, port, sipi, cleanup = start_local_stack(args)
+        time.sleep(0.5)   # Let the status loop publish its first snapshots
+
+    results = {
+        'meta': {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'target': args.url or 'simulator',
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'sim_latency': None if args.url else args.sim_latency,
+            'sim_jitter': None if args.url else args.sim_jitter,
+            'search_latency': None if args.url else args.search_latency,
+        },
+        'routes': {},
+    }
+    monitor = StatusPublishMonitor(sipi) if sipi else None
+    if monitor:
+        monitor.start()
+    try:
+        for name in names:
+            results['routes'][name] = {}
+            for conc in levels:
+                r = run_route(host, port, name, conc, args.duration, args.warmup)
+                results['routes'][name][str(conc)] = r
+                lat = r['latency_ms']
+                print(f"[BENCH] {name:<14} c={conc:<3} {r['requests']:>7} req  {r['throughput_rps']:>9.1f} req/s  "
+                      f"p50={lat.get('p50', 0):.2f}ms p95={lat.get('p95', 0):.2f}ms p99={lat.get('p99', 0):.2f}ms  "
+                      f"errors={r['errors']}", file=report)
+    finally:
+        stop_mount(host, port)
+        if monitor:
+            results['status_publish'] = monitor.stop()
+        cleanup()
+
+    if monitor:
+        gaps = results['status_publish']['gap_ms']
+        print(f"[BENCH] status loop: {results['status_publish']['published']} snapshots published, "
+              f"gap p50={gaps.get('p50', 0):.0f}ms max={gaps.get('max', 0):.0f}ms", file=report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"[BENCH] Results written to {args.output}", file=report)
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(json.load(f), results, report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
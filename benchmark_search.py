@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+SiPi Catalog Search Benchmark
+Keystroke latency of /search_sky across the full catalog set: every name in
+a random sample is "typed" one character at a time and each prefix is timed,
+along with typo, substring and misspelled common-name queries that find few
+or no prefix matches.
+
+Usage:
+    python3 benchmark_search.py [--samples 200] [--limit 50] [--output search.json] [--linear]
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+
+from benchmark_routes import latency_summary, git_revision
+
+
+def linear_search(by_name, query, limit):
+    """The pre-index /search_sky algorithm (two full scans of by_name), kept as a baseline."""
+    results, seen = [], set()
+    for obj in by_name.get(query, []):
+        if obj['Name'] not in seen:
+            results.append(obj)
+            seen.add(obj['Name'])
+    for name, objs in by_name.items():
+        if len(results) >= limit:
+            break
+        if name.startswith(query):
+            for obj in objs:
+                if obj['Name'] not in seen and len(results) < limit:
+                    results.append(obj)
+                    seen.add(obj['Name'])
+    if len(results) < limit:
+        for name, objs in by_name.items():
+            if len(results) >= limit:
+                break
+            if query in name and not name.startswith(query):
+                for obj in objs:
+                    if obj['Name'] not in seen and len(results) < limit:
+                        results.append(obj)
+                        seen.add(obj['Name'])
+    return results
+
+
+def keystroke_queries(names, samples, rng):
+    """{kind: [query, ...]}: typed prefixes, typos, mid-name substrings and misspelled words."""
+    picked = rng.sample(names, min(samples, len(names)))
+    queries = {'prefix': [], 'typo': [], 'substring': [], 'common_name_typo': []}
+    for name in picked:
+        for n in range(2, min(len(name), 16) + 1):
+            queries['prefix'].append(name[:n])
+        if len(name) > 3:
+            i = rng.randrange(1, len(name))
+            queries['typo'].append(name[:i] + 'q' + name[i + 1:])
+            queries['substring'].append(name[len(name) // 3:])
+    # Misspelled common names ("andromda"): drop one letter of a word
+    words = sorted({w for name in names for w in name.split() if w.isalpha() and len(w) >= 5})
+    for word in rng.sample(words, min(samples, len(words))):
+        i = rng.randrange(1, len(word) - 1)
+        queries['common_name_typo'].append(word[:i] + word[i + 1:])
+    return queries
+
+
+def time_queries(fn, queries, repeat):
+    out = []
+    for q in queries:
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn(q)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        out.append(best)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /search_sky keystroke latency")
+    parser.add_argument('--samples', type=int, default=200, help="catalog names to type out")
+    parser.add_argument('--limit', type=int, default=50, help="result limit per query, as sent by the UI")
+    parser.add_argument('--repeat', type=int, default=3, help="timings per query (the best is kept)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--linear', action='store_true', help="also time the old linear-scan search")
+    parser.add_argument('--output', default=None, help="write JSON results here")
+    parser.add_argument('--verbose', action='store_true', help="keep SiPi's console output")
+    args = parser.parse_args()
+
+    report = sys.stdout
+    if not args.verbose:
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        sys.stdout = open(os.devnull, 'w')
+    import SiPi
+    t0 = time.perf_counter()
+    index = SiPi.load_catalog_index()
+    load_seconds = time.perf_counter() - t0
+    store = index['store']
+    # {lowercase name: [object]}, the dict the linear scan used to walk
+    by_name = {}
+    for i in range(len(store)):
+        by_name.setdefault(store.name(i).lower(), []).append(store.row(i))
+
+    rng = random.Random(args.seed)
+    queries = keystroke_queries(sorted(by_name), args.samples, rng)
+    client = SiPi.app.test_client()
+
+    engines = {
+        'search_catalog': lambda q: SiPi.search_catalog(q, args.limit),
+        'route': lambda q: client.get('/search_sky', query_string={'q': q, 'limit': args.limit}),
+    }
+    if args.linear:
+        engines['linear'] = lambda q: linear_search(by_name, q, args.limit)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'names_indexed': len(by_name),
+            'objects': len(store),
+            'index_load_seconds': round(load_seconds, 4),
+            'samples': args.samples,
+            'limit': args.limit,
+            'seed': args.seed,
+        },
+        'keystrokes': {},
+    }
+    for engine, fn in engines.items():
+        results['keystrokes'][engine] = {}
+        for kind, qs in queries.items():
+            summary = latency_summary(time_queries(fn, qs, args.repeat))
+            summary['queries'] = len(qs)
+            results['keystrokes'][engine][kind] = summary
+            print(f"[BENCH] {engine:<15} {kind:<16} {len(qs):>6} queries  p50={summary['p50']:.3f}ms "
+                  f"p95={summary['p95']:.3f}ms p99={summary['p99']:.3f}ms max={summary['max']:.3f}ms",
+                  file=report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"[BENCH] Results written to {args.output}", file=report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
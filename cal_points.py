@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Calibration Point Cache
+Parsed PointErr.txt kept in memory and re-read only when the file's
+mtime, size or inode change, with versioned snapshots for deltas
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+
+# Snapshots kept for ?since= deltas; older clients get the full list
+DELTA_HISTORY = 32
+
+
+class CalPointSet:
+    """One parsed PointErr.txt as parallel arrays (index, ra, dec, error, enabled)."""
+
+    __slots__ = ('version', 'index', 'ra', 'dec', 'error', 'enabled', 'body')
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.index = array('i', (r[0] for r in rows))
+        self.ra = array('d', (r[1] for r in rows))
+        self.dec = array('d', (r[2] for r in rows))
+        self.error = array('d', (r[3] for r in rows))
+        self.enabled = array('b', (r[4] for r in rows))
+        self.body = json.dumps({'points': self.points(), 'version': version},
+                               separators=(',', ':')).encode('utf-8')
+
+    def __len__(self):
+        return len(self.index)
+
+    def same_points(self, other):
+        return (self.index == other.index and self.ra == other.ra and self.dec == other.dec
+                and self.error == other.error and self.enabled == other.enabled)
+
+    def point(self, i):
+        return {
+            'index': self.index[i],
+            'ra': self.ra[i],
+            'dec': self.dec[i],
+            'error': self.error[i],
+            'enabled': bool(self.enabled[i]),
+        }
+
+    def points(self):
+        return [self.point(i) for i in range(len(self.index))]
+
+    def by_index(self):
+        return {idx: i for i, idx in enumerate(self.index)}
+
+
+def parse_pointerr(path):
+    """(index, ra, dec, error, enabled) rows of a PointErr.txt; malformed lines are skipped."""
+    rows = []
+    with open(path, 'r') as f:
+        for line in f:
+            parts = line.strip().split(';')
+            if len(parts) < 5:
+                continue
+            try:
+                rows.append((int(parts[0]), float(parts[1]), float(parts[2]), float(parts[3]),
+                             parts[4].strip().lower() == 'true'))
+            except ValueError:
+                continue
+    return rows
+
+
+class CalPointsCache:
+    """
+    PointErr.txt parsed on demand.  Every lookup costs one os.stat(); the
+    file is only re-read when (mtime, size, inode) differ from the last
+    read, and the version only advances when the parsed points differ.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stat_key = None
+        self._current = None
+        self._history = {}      # version -> CalPointSet
+        # Start from the clock so versions from before a restart never match
+        self._next_version = int(time.time() * 1000)
+
+    def get(self):
+        """Current CalPointSet; raises OSError if PointErr.txt cannot be read."""
+        st = os.stat(self.path)
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self._lock:
+            if key == self._stat_key and self._current is not None:
+                return self._current
+            rows = parse_pointerr(self.path)
+            candidate = CalPointSet(self._next_version, rows)
+            if self._current is None or not candidate.same_points(self._current):
+                self._next_version += 1
+                self._current = candidate
+                self._history[candidate.version] = candidate
+                for old in sorted(self._history)[:-DELTA_HISTORY]:
+                    del self._history[old]
+            self._stat_key = key
+            return self._current
+
+    def delta(self, since):
+        """
+        Changes between version `since` and now: {'version', 'added',
+        'removed', 'changed'}, or None if `since` is no longer known.
+        """
+        current = self.get()
+        with self._lock:
+            old = self._history.get(since)
+        if old is None:
+            return None
+        old_pos, new_pos = old.by_index(), current.by_index()
+        added = [current.point(i) for idx, i in new_pos.items() if idx not in old_pos]
+        removed = [idx for idx in old_pos if idx not in new_pos]
+        changed = []
+        for idx, i in new_pos.items():
+            j = old_pos.get(idx)
+            if j is not None and (current.enabled[i] != old.enabled[j] or current.ra[i] != old.ra[j]
+                                  or current.dec[i] != old.dec[j] or current.error[i] != old.error[j]):
+                changed.append(current.point(i))
+        return {'version': current.version, 'since': since,
+                'added': added, 'removed': removed, 'changed': changed}
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Catalog Cross-Match
+Groups catalog entries that describe the same sky object (M31, NGC224 and
+"Andromeda" from different catalog files) into one canonical object with
+all of its designations, using a spatial hash instead of a pairwise scan
+"""
+
+import math
+
+from catalog_search import DESIGNATION, normalize
+
+# Entries this close, with similar magnitudes, are the same object
+MATCH_RADIUS_ARCMIN = 1.0
+MAX_MAG_DIFFERENCE = 1.0
+# Entries sharing a designation (M16 in both files) may sit further apart,
+# since catalogs disagree on where a large nebula's center is
+SHARED_DESIGNATION_RADIUS_ARCMIN = 10.0
+# The nebula and open cluster files use 20 for "magnitude unknown"
+PLACEHOLDER_MAG = 20.0
+
+
+def entry_position(obj):
+    """(ra_hours, dec_deg) of a catalog entry in either key style, or None."""
+    ra = obj.get('RtAsc', obj.get('ra'))
+    dec = obj.get('Declin', obj.get('dec'))
+    try:
+        return float(ra), float(dec)
+    except (TypeError, ValueError):
+        return None
+
+def entry_mag(obj):
+    """Magnitude as a float, or None when missing or a placeholder."""
+    try:
+        mag = float(obj.get('Mag', obj.get('mag')))
+    except (TypeError, ValueError):
+        return None
+    return mag if mag < PLACEHOLDER_MAG else None
+
+def entry_names(obj, catalog_type=None):
+    """
+    Display names of an entry.  Messier entries only carry their number in
+    'id' when 'name' is a common name ('Andromeda 4'), so M<id> is added.
+    """
+    name = (obj.get('Name') or obj.get('name') or '').strip()
+    names = [name] if name else []
+    if catalog_type == 'messier' and obj.get('id'):
+        designation = f"M{obj['id']}"
+        if designation not in name.split():
+            names.append(designation)
+    return names
+
+def designations(names):
+    """Normalized catalog designations ('ngc224', 'm31') found in a list of names."""
+    out = set()
+    for name in names:
+        for token in name.split():
+            if DESIGNATION.match(token):
+                out.add(normalize(token))
+    return out
+
+def _prefixes(desigs):
+    return {d.rstrip('0123456789') for d in desigs}
+
+def designations_conflict(a, b):
+    """True if both sets number the same catalog (NGC...) but share no entry in it."""
+    if a & b:
+        return False
+    return bool(_prefixes(a) & _prefixes(b))
+
+
+def _unit_vector(ra_hours, dec_deg):
+    ra = math.radians(ra_hours * 15.0)
+    dec = math.radians(dec_deg)
+    return (math.cos(dec) * math.cos(ra), math.cos(dec) * math.sin(ra), math.sin(dec))
+
+
+class SkyHash:
+    """
+    Points bucketed on a 3-D grid over unit vectors, so neighbours within
+    `radius_arcmin` are found by checking the 27 surrounding cells; unlike an
+    RA/Dec grid this has no seams at RA 0h or crowding at the poles.
+    """
+
+    def __init__(self, radius_arcmin):
+        # Chord length of the search radius is the cell edge
+        self.cell = 2.0 * math.sin(math.radians(radius_arcmin / 60.0) / 2.0)
+        self.min_cos = math.cos(math.radians(radius_arcmin / 60.0))
+        self.cells = {}
+        self.vectors = []
+
+    def _key(self, v):
+        c = self.cell
+        return (math.floor(v[0] / c), math.floor(v[1] / c), math.floor(v[2] / c))
+
+    def add(self, ra_hours, dec_deg):
+        v = _unit_vector(ra_hours, dec_deg)
+        i = len(self.vectors)
+        self.vectors.append(v)
+        self.cells.setdefault(self._key(v), []).append(i)
+        return i
+
+    def pairs(self):
+        """(i, j, separation_arcmin) for every pair within the radius, i < j."""
+        cells = self.cells
+        vectors = self.vectors
+        for (cx, cy, cz), members in cells.items():
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for dz in (-1, 0, 1):
+                        others = cells.get((cx + dx, cy + dy, cz + dz))
+                        if not others:
+                            continue
+                        for i in members:
+                            vi = vectors[i]
+                            for j in others:
+                                if j <= i:
+                                    continue
+                                vj = vectors[j]
+                                dot = vi[0] * vj[0] + vi[1] * vj[1] + vi[2] * vj[2]
+                                if dot >= self.min_cos:
+                                    sep = math.degrees(math.acos(min(1.0, dot))) * 60.0
+                                    yield i, j, sep
+
+
+class AliasTable:
+    """
+    Cross-matched catalog entries.  Build with add() for every entry, then
+    build(); `canonical` holds one merged object per real sky object and
+    `by_designation` maps each normalized designation to its position there.
+    """
+
+    def __init__(self):
+        self.entries = []       # (obj, catalog_type, names, position, mag)
+        self.canonical = []
+        self.by_designation = {}
+        self.merged = 0
+
+    def add(self, obj, catalog_type):
+        """Queue one catalog entry; entries without a name or position are ignored."""
+        names = entry_names(obj, catalog_type)
+        position = entry_position(obj)
+        if not names or position is None:
+            return
+        self.entries.append((obj, catalog_type, names, position, entry_mag(obj)))
+
+    def build(self):
+        entries = self.entries
+        parent = list(range(len(entries)))
+        group_desigs = [designations(e[2]) for e in entries]
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        sky = SkyHash(SHARED_DESIGNATION_RADIUS_ARCMIN)
+        for e in entries:
+            sky.add(*e[3])
+        # Closest pairs first, so a chain of near neighbours merges around the
+        # best match before a weaker one can claim an entry
+        for i, j, sep in sorted(sky.pairs(), key=lambda p: p[2]):
+            ri, rj = find(i), find(j)
+            if ri == rj:
+                continue
+            di, dj = group_desigs[ri], group_desigs[rj]
+            if di & dj:
+                pass    # A shared designation within the wide radius
+            elif sep > MATCH_RADIUS_ARCMIN or designations_conflict(di, dj):
+                continue
+            else:
+                mi, mj = entries[i][4], entries[j][4]
+                if mi is not None and mj is not None and abs(mi - mj) > MAX_MAG_DIFFERENCE:
+                    continue
+            parent[rj] = ri
+            group_desigs[ri] = di | dj
+            self.merged += 1
+
+        groups = {}
+        for i in range(len(entries)):
+            groups.setdefault(find(i), []).append(i)
+        self.canonical = [self._merge([entries[i] for i in members]) for members in groups.values()]
+        for i, obj in enumerate(self.canonical):
+            for d in designations(obj['designations']):
+                self.by_designation.setdefault(d, i)
+        return self
+
+    @staticmethod
+    def _merge(members):
+        """One object for a group: the best-described entry plus every other name."""
+        # Prefer entries already in the RtAsc/Declin/Name layout, then the
+        # one with the most designations, then a known magnitude
+        def score(e):
+            obj, _, names, _, mag = e
+            return ('Name' in obj, len(designations(names)), mag is not None)
+
+        primary = max(members, key=score)
+        obj, catalog_type, names, (ra, dec), mag = primary
+        merged = dict(obj)
+        merged.setdefault('Name', ' '.join(names))
+        merged.setdefault('RtAsc', ra)
+        merged.setdefault('Declin', dec)
+        if 'Mag' not in merged and mag is not None:
+            merged['Mag'] = mag
+        merged['catalog_type'] = catalog_type
+
+        aliases = []
+        for e in members:
+            for name in e[2]:
+                if name != merged['Name'] and name not in aliases:
+                    aliases.append(name)
+        tokens = ' '.join(name for e in members for name in e[2]).split()
+        merged['aliases'] = aliases
+        merged['designations'] = sorted({t for t in tokens if DESIGNATION.match(t)})
+        merged['catalogs'] = sorted({e[1] for e in members})
+        return merged
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Catalog Assets
+Catalog bodies published under content-hash file names with gzip (and
+brotli, when the module is installed) variants precompressed next to them
+in cache/assets/.  A hashed URL never changes content, so clients may
+cache it forever; the manifest maps catalog names to the current URLs.
+"""
+
+import glob
+import gzip
+import hashlib
+import os
+import threading
+
+try:
+    import brotli
+except ImportError:     # gzip alone still cuts the JSON to about a fifth
+    brotli = None
+
+ASSET_VERSIONS = 3      # hashed bodies kept on disk per catalog
+# (Content-Encoding, file suffix) in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class Asset:
+    """One published body: `name`.`digest`.json plus its compressed variants."""
+
+    __slots__ = ('name', 'digest', 'version', 'path', 'size', 'encodings')
+
+    def __init__(self, name, digest, version, path, size, encodings):
+        self.name = name
+        self.digest = digest
+        self.version = version
+        self.path = path            # identity file; variants add ENCODINGS suffixes
+        self.size = size
+        self.encodings = encodings  # {Content-Encoding: size}
+
+    @property
+    def filename(self):
+        return f"{self.name}.{self.digest}.json"
+
+    def variant(self, accept_encoding):
+        """(Content-Encoding or None, path) of the best variant the client accepts."""
+        accepted = _accepted(accept_encoding)
+        for encoding, suffix in ENCODINGS:
+            if encoding in self.encodings and encoding in accepted:
+                return encoding, self.path + suffix
+        return None, self.path
+
+    def info(self):
+        return {'file': self.filename, 'digest': self.digest, 'version': self.version,
+                'size': self.size, 'encodings': dict(self.encodings)}
+
+
+def _accepted(header):
+    """Codings in an Accept-Encoding header not refused with q=0."""
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class CatalogAssets:
+    """
+    Publishes catalog bodies to `asset_dir`.  publish() is cheap while the
+    caller's version (a JD bucket, a file mtime) is unchanged; otherwise the
+    body is hashed and, if new, written with its compressed variants.
+    """
+
+    def __init__(self, asset_dir, keep=ASSET_VERSIONS):
+        self.asset_dir = asset_dir
+        self.keep = keep
+        self._current = {}      # name -> Asset
+        self._lock = threading.Lock()
+
+    def publish(self, name, version, body_fn):
+        """The Asset for `name` at `version`; body_fn() gives the JSON bytes when needed."""
+        with self._lock:
+            asset = self._current.get(name)
+            if asset is not None and asset.version == version:
+                return asset
+            body = body_fn()
+            digest = hashlib.sha256(body).hexdigest()[:16]
+            asset = self._write(name, digest, version, body)
+            self._current[name] = asset
+            return asset
+
+    def current(self):
+        return dict(self._current)
+
+    def find(self, name, digest):
+        """The Asset for a hashed file name, current or still on disk; None if gone."""
+        asset = self._current.get(name)
+        if asset is not None and asset.digest == digest:
+            return asset
+        path = os.path.join(self.asset_dir, f"{name}.{digest}.json")
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        return Asset(name, digest, None, path, size, self._variants(path))
+
+    def _variants(self, path):
+        found = {}
+        for encoding, suffix in ENCODINGS:
+            try:
+                found[encoding] = os.path.getsize(path + suffix)
+            except OSError:
+                pass
+        return found
+
+    def _write(self, name, digest, version, body):
+        path = os.path.join(self.asset_dir, f"{name}.{digest}.json")
+        if os.path.exists(path):
+            os.utime(path)      # Most recently published, for eviction
+            return Asset(name, digest, version, path, len(body), self._variants(path))
+        os.makedirs(self.asset_dir, exist_ok=True)
+        variants = [('', body), ('.gz', gzip.compress(body, 9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(body, quality=11)))
+        # Compressed variants first: the identity file marks a complete asset
+        for suffix, data in reversed(variants):
+            tmp = f"{path}{suffix}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path + suffix)
+        self._evict(name)
+        print(f"[SiPi ASSETS] Published {name}.{digest}.json: {len(body)} bytes, "
+              + ", ".join(f"{s[1:]} {len(d)}" for s, d in variants[1:]))
+        return Asset(name, digest, version, path, len(body), self._variants(path))
+
+    def _evict(self, name):
+        files = glob.glob(os.path.join(self.asset_dir, f"{name}.*.json"))
+        files.sort(key=os.path.getmtime, reverse=True)
+        for path in files[self.keep:]:
+            for suffix in ('',) + tuple(s for _, s in ENCODINGS):
+                try:
+                    os.remove(path + suffix)
+                except OSError:
+                    pass
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Compiled Catalog File
+static/*.json cross-matched once and written as a binary file: a fixed
+header, a JSON layout/metadata block, 8-byte aligned numeric columns and
+the packed name strings.  The server maps it read-only with mmap, so
+startup skips JSON parsing and the pages are shared between processes.
+
+Usage:
+    python3 catalog_binary.py [--force] [--output cache/catalog.bin]
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+from catalog_aliases import AliasTable
+from catalog_store import CatalogStore, StringTable, np
+
+MAGIC = b'SIPICAT\0'
+# Bump when the layout or the cross-match rules change; old files are rebuilt
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<8sIII')     # magic, format version, metadata offset, metadata length
+ALIGN = 8
+
+
+class StaleCatalogError(ValueError):
+    """The compiled file is missing, unreadable, or built from other sources."""
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def source_digests(paths):
+    """{catalog: sha256} for every source file that exists."""
+    return {name: file_digest(path) for name, path in paths.items() if os.path.exists(path)}
+
+def _count_entries(data):
+    if isinstance(data, dict):
+        return len(data.get('features', []))
+    return len(data) if isinstance(data, list) else 0
+
+
+def compile_catalog(paths):
+    """
+    Parse every source and cross-match it into an in-memory CatalogStore.
+    Returns (store, metadata); sources that fail to parse are recorded with
+    an 'error' and left out of the rows.
+    """
+    aliases = AliasTable()
+    sources = {}
+    for catalog_type, path in paths.items():
+        if not os.path.exists(path):
+            continue
+        info = {'file': os.path.basename(path), 'sha256': file_digest(path),
+                'size': os.path.getsize(path), 'mtime': os.path.getmtime(path)}
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            info['entries'] = _count_entries(data)
+            for obj in data if isinstance(data, list) else ():
+                obj['catalog_type'] = catalog_type
+                aliases.add(obj, catalog_type)
+        except Exception as e:
+            info['error'] = str(e)
+        sources[catalog_type] = info
+    aliases.build()
+    meta = {
+        'format': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'built': time.time(),
+        'rows': len(aliases.canonical),
+        'entries': len(aliases.entries),
+        'merged': aliases.merged,
+        'sources': sources,
+    }
+    return CatalogStore.from_objects(aliases.canonical), meta
+
+def build_catalog(paths, output):
+    """Compile the sources and write the binary file atomically; returns its metadata."""
+    started = time.perf_counter()
+    store, meta = compile_catalog(paths)
+    blobs = []
+    for attr, code in CatalogStore.COLUMNS:
+        blobs.append((attr, code, getattr(store, attr).tobytes()))
+    for attr in CatalogStore.TABLES:
+        table = getattr(store, attr)
+        blobs.append((attr + '_offsets', 'I', table.offsets.tobytes()))
+        blobs.append((attr + '_data', 'B', bytes(table.data)))
+
+    # Column offsets are stored in the metadata, so the columns start after
+    # a fixed reservation for it
+    meta_room = 4096 + 256 * len(meta['sources'])
+    layout = {}
+    offset = _aligned(HEADER.size + meta_room)
+    for attr, code, raw in blobs:
+        layout[attr] = [offset, code, len(raw)]
+        offset = _aligned(offset + len(raw))
+    meta['columns'] = layout
+    meta_bytes = json.dumps(meta, sort_keys=True).encode('utf-8')
+    if len(meta_bytes) > meta_room:
+        raise ValueError(f"catalog metadata too large ({len(meta_bytes)} bytes)")
+
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    tmp = f"{output}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, HEADER.size, len(meta_bytes)))
+        f.write(meta_bytes)
+        for attr, code, raw in blobs:
+            f.seek(layout[attr][0])
+            f.write(raw)
+        f.truncate(offset)
+    os.replace(tmp, output)
+    meta['build_seconds'] = round(time.perf_counter() - started, 3)
+    return meta
+
+def _aligned(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def open_catalog(path, digests=None):
+    """
+    (CatalogStore, metadata) backed by a read-only mapping of `path`.  With
+    `digests` ({catalog: sha256}) the file must have been built from exactly
+    those sources.  Raises StaleCatalogError otherwise.
+    """
+    try:
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise StaleCatalogError(f"cannot map {path}: {e}")
+    try:
+        magic, version, meta_offset, meta_len = HEADER.unpack_from(mm, 0)
+        meta = json.loads(mm[meta_offset:meta_offset + meta_len].decode('utf-8'))
+    except (struct.error, ValueError) as e:
+        mm.close()
+        raise StaleCatalogError(f"{path}: bad header: {e}")
+    if magic != MAGIC or version != FORMAT_VERSION:
+        mm.close()
+        raise StaleCatalogError(f"{path}: not a format {FORMAT_VERSION} catalog")
+    if meta.get('byteorder') != sys.byteorder:
+        mm.close()
+        raise StaleCatalogError(f"{path}: built on a {meta.get('byteorder')}-endian host")
+    if digests is not None:
+        built_from = {name: info['sha256'] for name, info in meta['sources'].items()}
+        if built_from != digests:
+            mm.close()
+            raise StaleCatalogError(f"{path}: sources changed since it was built")
+
+    view = memoryview(mm)
+    columns = {}
+    for attr, (offset, code, length) in meta['columns'].items():
+        raw = view[offset:offset + length]
+        if attr.endswith('_data'):
+            columns[attr] = raw
+        elif np is not None and not attr.endswith('_offsets'):
+            columns[attr] = np.frombuffer(raw, dtype=np.dtype(code))
+        else:
+            columns[attr] = raw.cast(code)
+    store = CatalogStore(columns, *(StringTable(columns[t + '_offsets'], columns[t + '_data'])
+                                    for t in CatalogStore.TABLES))
+    store.mapping = mm      # Keeps the mapping open for the store's lifetime
+    return store, meta
+
+def load_catalog(paths, path):
+    """
+    Open the compiled catalog, rebuilding it first when the sources' hashes
+    changed.  Returns (store, metadata, rebuilt).
+    """
+    digests = source_digests(paths)
+    try:
+        store, meta = open_catalog(path, digests)
+        return store, meta, False
+    except StaleCatalogError:
+        pass
+    build_catalog(paths, path)
+    store, meta = open_catalog(path, digests)
+    return store, meta, True
+
+
+def main():
+    import argparse
+    from SiPi import catalog_paths, CATALOG_BIN_PATH
+    parser = argparse.ArgumentParser(description="Compile static/*.json into the binary catalog")
+    parser.add_argument('--output', default=CATALOG_BIN_PATH)
+    parser.add_argument('--force', action='store_true', help="rebuild even if the sources are unchanged")
+    args = parser.parse_args()
+    if not args.force:
+        try:
+            open_catalog(args.output, source_digests(catalog_paths))
+            print(f"[CATALOG] {args.output} is up to date")
+            return 0
+        except StaleCatalogError as e:
+            print(f"[CATALOG] Rebuilding: {e}")
+    meta = build_catalog(catalog_paths, args.output)
+    print(f"[CATALOG] Wrote {args.output}: {meta['rows']} objects from {meta['entries']} entries "
+          f"({meta['merged']} merged) in {meta['build_seconds']}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Catalog Coordinate Transforms
+Whole-column equatorial to horizontal conversion for the catalog store:
+one pass over the RA/Dec columns with NumPy, or a plain loop without it
+"""
+
+import math
+
+from catalog_store import CATALOG_TYPES, np
+
+
+def alt_az(ra_hours, dec_deg, lst_hours, lat_deg):
+    """
+    (alt, az) in degrees for sequences of RA (hours) and Dec (degrees);
+    azimuth is measured from North, increasing eastward, as in
+    SiPi.eq_to_alt_az.  NumPy arrays in, NumPy arrays out when available.
+    """
+    lat = math.radians(lat_deg)
+    sin_lat, cos_lat = math.sin(lat), math.cos(lat)
+    if np is not None:
+        ha = np.radians((lst_hours - np.asarray(ra_hours, dtype=np.float64)) * 15.0)
+        dec = np.radians(np.asarray(dec_deg, dtype=np.float64))
+        sin_dec, cos_dec = np.sin(dec), np.cos(dec)
+        sin_alt = np.clip(sin_dec * sin_lat + cos_dec * cos_lat * np.cos(ha), -1.0, 1.0)
+        alt = np.arcsin(sin_alt)
+        # atan2 of the unnormalized components; cos(alt) cancels
+        az = np.degrees(np.arctan2(-np.sin(ha) * cos_dec, sin_dec * cos_lat - cos_dec * sin_lat * np.cos(ha)))
+        return np.degrees(alt), np.mod(az, 360.0)
+    alts, azs = [], []
+    for ra, dec in zip(ra_hours, dec_deg):
+        ha = math.radians((lst_hours - ra) * 15.0)
+        dec = math.radians(dec)
+        sin_dec, cos_dec = math.sin(dec), math.cos(dec)
+        sin_alt = max(-1.0, min(1.0, sin_dec * sin_lat + cos_dec * cos_lat * math.cos(ha)))
+        az = math.degrees(math.atan2(-math.sin(ha) * cos_dec,
+                                     sin_dec * cos_lat - cos_dec * sin_lat * math.cos(ha)))
+        alts.append(math.degrees(math.asin(sin_alt)))
+        azs.append(az % 360.0)
+    return alts, azs
+
+
+def visible_objects(store, lst_hours, lat_deg, minalt=0.0, maglim=None, catalogs=None,
+                    sort='mag', limit=None, places=None):
+    """
+    [(row, alt, az)] for store rows at or above `minalt` degrees, optionally
+    no fainter than `maglim` and present in any of `catalogs`.  Sorted by
+    magnitude (brightest first, unknown last) or by altitude (highest first).
+    `places` replaces the store's RA/Dec columns, e.g. with JNow ones.
+    """
+    bits = 0
+    for c in catalogs or ():
+        bits |= 1 << CATALOG_TYPES.index(c)
+    ra, dec = places if places is not None else (store.ra, store.dec)
+    alt, az = alt_az(ra, dec, lst_hours, lat_deg)
+    if np is not None:
+        keep = alt >= minalt
+        if maglim is not None:
+            keep &= store.mag <= maglim     # NaN compares False
+        if bits:
+            keep &= (store.catalogs & bits) != 0
+        rows = np.flatnonzero(keep)
+        if sort == 'alt':
+            rows = rows[np.argsort(-alt[rows], kind='stable')]
+        else:
+            rows = rows[np.argsort(store.mag[rows], kind='stable')]     # NaN sorts last
+        if limit is not None:
+            rows = rows[:limit]
+        return list(zip(rows.tolist(), alt[rows].tolist(), az[rows].tolist()))
+    mags = store.mag
+    rows = [i for i in range(len(store))
+            if alt[i] >= minalt
+            and (maglim is None or mags[i] <= maglim)
+            and (not bits or store.catalogs[i] & bits)]
+    if sort == 'alt':
+        rows.sort(key=lambda i: -alt[i])
+    else:
+        rows.sort(key=lambda i: (math.isnan(mags[i]), mags[i]))
+    if limit is not None:
+        rows = rows[:limit]
+    return [(i, alt[i], az[i]) for i in rows]
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Catalog Apparent Places
+Catalog coordinates carried to JNow (true equator and equinox of date, with
+annual aberration), the frame SiTechExe slews in.  Whole catalogs are
+transformed at once as unit vectors through combined rotations, and the
+results are cached per Julian-day bucket, in memory and as JSON files
+under cache/ with the oldest buckets evicted.
+
+The static/*.json catalogs are not J2000: they hold apparent places of
+about JD 2460955 (October 2025), so positions are first taken back to
+mean J2000 at that epoch and then forward to the requested date.
+"""
+
+import glob
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from catalog_store import np
+from ephemeris import (DELTA_T, C_AU_PER_DAY, _centuries, _earth_velocity,
+                       mean_obliquity, nutation)
+
+# Positions drift ~0.5 arcsec/day (aberration dominates), far below what
+# SkyView can show, so one computation serves a whole day
+JNOW_BUCKET_DAYS = 1.0
+DISK_BUCKETS = 2            # cache/ files kept per catalog
+MEMORY_ENTRIES = 16         # transformed bodies kept in memory
+J2000_OBLIQUITY = 23.4392911
+# Epoch of the apparent places in static/*.json; fitted against the J2000
+# positions the old corrections pipeline recorded (median residual 1-4")
+CATALOG_EPOCH_JD = 2460955.5
+
+# Coordinate key pairs of the catalog formats: (ra hours, dec degrees)
+COORDINATE_KEYS = (('RtAsc', 'Declin'), ('ra', 'dec'), ('RtAsc1', 'Declin1'), ('RtAsc2', 'Declin2'))
+
+
+def _rx(a):
+    c, s = math.cos(a), math.sin(a)
+    return ((1.0, 0.0, 0.0), (0.0, c, s), (0.0, -s, c))
+
+def _rz(a):
+    c, s = math.cos(a), math.sin(a)
+    return ((c, s, 0.0), (-s, c, 0.0), (0.0, 0.0, 1.0))
+
+def _ry(a):
+    c, s = math.cos(a), math.sin(a)
+    return ((c, 0.0, -s), (0.0, 1.0, 0.0), (s, 0.0, c))
+
+def _matmul(a, b):
+    return tuple(tuple(sum(a[i][k] * b[k][j] for k in range(3)) for j in range(3)) for i in range(3))
+
+
+def jnow_transform(jd_ut):
+    """
+    (matrix, beta) for one epoch: `beta` is Earth's velocity over c in the
+    J2000 equatorial frame (added to a J2000 unit vector for aberration) and
+    `matrix` the IAU 1976 precession followed by nutation, as in
+    ephemeris.precess_from_j2000 and apply_nutation.
+    """
+    t = _centuries(jd_ut + DELTA_T / 86400.0)
+    zeta = math.radians((2306.2181 * t + 0.30188 * t * t + 0.017998 * t ** 3) / 3600.0)
+    z = math.radians((2306.2181 * t + 1.09468 * t * t + 0.018203 * t ** 3) / 3600.0)
+    theta = math.radians((2004.3109 * t - 0.42665 * t * t - 0.041833 * t ** 3) / 3600.0)
+    precession = _matmul(_rz(-z), _matmul(_ry(theta), _rz(-zeta)))
+    eps0 = mean_obliquity(t)
+    dpsi, deps = nutation(t)
+    nutate = _matmul(_rx(-math.radians(eps0 + deps)),
+                     _matmul(_rz(-math.radians(dpsi)), _rx(math.radians(eps0))))
+    # Earth's velocity from the ecliptic to the equatorial J2000 frame
+    vx, vy, vz = _earth_velocity(t)
+    e = math.radians(J2000_OBLIQUITY)
+    beta = (vx / C_AU_PER_DAY,
+            (vy * math.cos(e) - vz * math.sin(e)) / C_AU_PER_DAY,
+            (vy * math.sin(e) + vz * math.cos(e)) / C_AU_PER_DAY)
+    return _matmul(nutate, precession), beta
+
+
+def apparent_places(ra_hours, dec_deg, jd_ut, from_jd=None):
+    """
+    JNow (ra_hours, dec_deg) at `jd_ut` for sequences of mean J2000
+    positions, or of apparent places of `from_jd` when it is given.
+    NumPy arrays out when available.
+    """
+    m, beta = jnow_transform(jd_ut)
+    if from_jd is not None:
+        m0, beta0 = jnow_transform(from_jd)
+    if np is not None:
+        ra = np.radians(np.asarray(ra_hours, dtype=np.float64) * 15.0)
+        dec = np.radians(np.asarray(dec_deg, dtype=np.float64))
+        cos_dec = np.cos(dec)
+        v = np.stack((cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)), axis=1)
+        if from_jd is not None:
+            # Undo nutation and precession (the matrix is orthogonal), then aberration
+            v = v @ np.array(m0)
+            v -= beta0
+            v /= np.linalg.norm(v, axis=1)[:, None]
+        v += beta
+        v = v @ np.array(m).T
+        v /= np.linalg.norm(v, axis=1)[:, None]
+        ra_out = np.mod(np.degrees(np.arctan2(v[:, 1], v[:, 0])) / 15.0, 24.0)
+        dec_out = np.degrees(np.arcsin(np.clip(v[:, 2], -1.0, 1.0)))
+        return ra_out, dec_out
+    ra_out, dec_out = [], []
+    for ra, dec in zip(ra_hours, dec_deg):
+        ra, dec = math.radians(ra * 15.0), math.radians(dec)
+        v = (math.cos(dec) * math.cos(ra), math.cos(dec) * math.sin(ra), math.sin(dec))
+        if from_jd is not None:
+            v = _unit(tuple(m0[0][i] * v[0] + m0[1][i] * v[1] + m0[2][i] * v[2] - beta0[i]
+                            for i in range(3)))
+        v = tuple(v[i] + beta[i] for i in range(3))
+        x, y, z = _unit(tuple(m[i][0] * v[0] + m[i][1] * v[1] + m[i][2] * v[2] for i in range(3)))
+        ra_out.append(math.degrees(math.atan2(y, x)) / 15.0 % 24.0)
+        dec_out.append(math.degrees(math.asin(max(-1.0, min(1.0, z)))))
+    return ra_out, dec_out
+
+def _unit(v):
+    r = math.sqrt(v[0] * v[0] + v[1] * v[1] + v[2] * v[2])
+    return (v[0] / r, v[1] / r, v[2] / r)
+
+
+def bucket_jd(jd_ut, days=JNOW_BUCKET_DAYS):
+    """Start of the bucket holding `jd_ut`; the transform is computed at its middle."""
+    return math.floor(jd_ut / days) * days
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def transform_entries(entries, jd_ut, from_jd=CATALOG_EPOCH_JD):
+    """
+    Rewrite catalog entries in place to JNow at `jd_ut`, keeping their own
+    format: RtAsc/Declin (and constellation line ends) are replaced, with the
+    catalog values kept in _original_ra/_original_dec; Messier-style entries
+    (sexagesimal or numeric 'ra'/'dec') gain ra_corrected_hours and
+    dec_corrected_degrees.  Returns the number of positions transformed.
+    """
+    slots = []      # (entry, ra_key, dec_key, ra, dec)
+    for obj in entries:
+        for ra_key, dec_key in COORDINATE_KEYS:
+            if ra_key in obj and dec_key in obj:
+                if ra_key == 'ra':
+                    ra, dec = _hours(obj['ra']), _degrees(obj['dec'])
+                else:
+                    ra, dec = _number(obj[ra_key]), _number(obj[dec_key])
+                if ra is not None and dec is not None:
+                    slots.append((obj, ra_key, dec_key, ra, dec))
+    if not slots:
+        return 0
+    ra_now, dec_now = apparent_places([s[3] for s in slots], [s[4] for s in slots], jd_ut, from_jd)
+    if np is not None:
+        ra_now, dec_now = ra_now.tolist(), dec_now.tolist()
+    for (obj, ra_key, dec_key, ra, dec), ra_j, dec_j in zip(slots, ra_now, dec_now):
+        if ra_key == 'ra':
+            obj['ra_corrected_hours'] = ra_j
+            obj['dec_corrected_degrees'] = dec_j
+        else:
+            if ra_key == 'RtAsc':
+                obj['_original_ra'] = obj[ra_key]
+                obj['_original_dec'] = obj[dec_key]
+            obj[ra_key] = round(ra_j, 7)
+            obj[dec_key] = round(dec_j, 6)
+        obj['_correction_jd'] = jd_ut
+    return len(slots)
+
+def _hours(value):
+    """Decimal hours from a number or an 'HH:MM:SS' string."""
+    if isinstance(value, str) and ':' in value:
+        return _sexagesimal(value)
+    return _number(value)
+
+def _degrees(value):
+    if isinstance(value, str) and ':' in value:
+        return _sexagesimal(value)
+    return _number(value)
+
+def _sexagesimal(text):
+    try:
+        parts = [float(p) for p in text.strip().split(':')]
+    except ValueError:
+        return None
+    sign = -1.0 if text.strip().startswith('-') else 1.0
+    value = abs(parts[0])
+    for n, p in enumerate(parts[1:], 1):
+        value += p / (60.0 ** n)
+    return sign * value
+
+
+class ApparentCatalogCache:
+    """
+    JNow catalog bodies per (catalog, JD bucket).  Lookups go memory LRU,
+    then cache/jnow_<catalog>_JD<bucket>.json (valid while newer than its
+    source), then a fresh transform.  Each catalog keeps DISK_BUCKETS files;
+    older ones, and files from the removed corrections pipeline, are deleted.
+    """
+
+    def __init__(self, cache_dir, bucket_days=JNOW_BUCKET_DAYS, disk_buckets=DISK_BUCKETS,
+                 memory_entries=MEMORY_ENTRIES):
+        self.cache_dir = cache_dir
+        self.bucket_days = bucket_days
+        self.disk_buckets = disk_buckets
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()    # (catalog, bucket) -> body bytes
+        self._columns = None            # ((id(store), bucket), ra, dec) for the current bucket
+        self._lock = threading.Lock()
+        self.computed = 0
+        self.last = {}                  # catalog -> {'jd', 'seconds', 'positions', 'source'}
+
+    def _file(self, catalog, bucket):
+        return os.path.join(self.cache_dir, f"jnow_{catalog}_JD{bucket:.1f}.json")
+
+    def body(self, catalog, source_path, jd_ut=None):
+        """(bucket JD, JSON bytes) of a catalog in JNow; raises OSError/ValueError on a bad source."""
+        if jd_ut is None:
+            jd_ut = time.time() / 86400.0 + 2440587.5
+        bucket = bucket_jd(jd_ut, self.bucket_days)
+        key = (catalog, bucket)
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                return bucket, cached
+            body = self._read_disk(catalog, bucket, source_path)
+            if body is None:
+                body = self._compute(catalog, bucket, source_path)
+            self._memory[key] = body
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+            return bucket, body
+
+    def store_places(self, store, jd_ut=None):
+        """(bucket JD, ra, dec) JNow columns for a CatalogStore; only the latest bucket is kept."""
+        if jd_ut is None:
+            jd_ut = time.time() / 86400.0 + 2440587.5
+        bucket = bucket_jd(jd_ut, self.bucket_days)
+        key = (id(store), bucket)
+        with self._lock:
+            if self._columns is None or self._columns[0] != key:
+                ra, dec = apparent_places(store.ra, store.dec, bucket + self.bucket_days / 2.0,
+                                          CATALOG_EPOCH_JD)
+                self._columns = (key, ra, dec)
+            return bucket, self._columns[1], self._columns[2]
+
+    def _read_disk(self, catalog, bucket, source_path):
+        path = self._file(catalog, bucket)
+        try:
+            if os.path.getmtime(path) < os.path.getmtime(source_path):
+                return None
+            with open(path, 'rb') as f:
+                body = f.read()
+            os.utime(path)      # Most recently used, for eviction
+            self.last[catalog] = {'jd': bucket, 'seconds': 0.0, 'source': 'disk'}
+            return body
+        except OSError:
+            return None
+
+    def _compute(self, catalog, bucket, source_path):
+        started = time.perf_counter()
+        with open(source_path, 'r') as f:
+            entries = json.load(f)
+        # Middle of the bucket, so the error is at most half a bucket's drift
+        count = transform_entries(entries if isinstance(entries, list) else [],
+                                  bucket + self.bucket_days / 2.0)
+        body = json.dumps(entries, separators=(',', ':')).encode('utf-8')
+        self.computed += 1
+        self.last[catalog] = {'jd': bucket, 'positions': count, 'source': 'computed',
+                              'seconds': round(time.perf_counter() - started, 4)}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{self._file(catalog, bucket)}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(body)
+            os.replace(tmp, self._file(catalog, bucket))
+            self._evict(catalog)
+        except OSError:
+            pass    # Read-only cache/: keep serving from memory
+        return body
+
+    def _evict(self, catalog):
+        files = glob.glob(os.path.join(self.cache_dir, f"jnow_{catalog}_JD*.json"))
+        files.sort(key=os.path.getmtime, reverse=True)
+        # Output of the old astrometric-corrections pipeline goes too
+        stale = files[self.disk_buckets:] + glob.glob(os.path.join(self.cache_dir, f"{catalog}_JD*.json"))
+        for path in stale:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
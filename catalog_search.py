@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Catalog Name Search
+Ranked name lookup for /search_sky: exact, prefix, substring and
+typo-tolerant matches over normalized object names and their aliases,
+backed by a sorted term array and a trigram inverted index
+"""
+
+import bisect
+import heapq
+import re
+from array import array
+from collections import Counter
+
+# Match tiers, best first
+TIER_EXACT, TIER_PREFIX, TIER_SUBSTRING, TIER_FUZZY = range(4)
+
+FUZZY_MIN_QUERY = 4       # shorter queries only get exact/prefix/substring matches
+FUZZY_MIN_SIMILARITY = 0.5    # Dice coefficient over padded trigrams
+FUZZY_MIN_SHARED = 2      # trigrams a term must share to get the edit-distance check
+UNKNOWN_MAG = 99.0
+
+DESIGNATION_PREFIXES = ('ngc', 'ic', 'm', 'c', 'ugc', 'pgc', 'mcg', 'eso', 'abell', 'sh2', 'cr',
+                        'mel', 'tr', 'st', 'stock', 'lbn', 'ldn', 'vdb', 'pk', 'arp', 'hcg', 'b')
+# Tokens that start a catalog designation ("NGC224", "M31", "C106", "IC2602", ...)
+DESIGNATION = re.compile(r'^(' + '|'.join(DESIGNATION_PREFIXES) + r')-?\d', re.IGNORECASE)
+_NOT_ALNUM = re.compile(r'[^a-z0-9]+')
+_LETTERS_NUMBER = re.compile(r'^([a-z]+)(\d.*)$')
+
+
+def normalize(text):
+    """Lowercase with spaces and punctuation removed: 'NGC 224' and 'ngc224' match."""
+    return _NOT_ALNUM.sub('', text.lower())
+
+def name_aliases(name):
+    """
+    Normalized search terms for one catalog Name.  'Andromeda 4 M31 NGC224'
+    yields the full name, each designation (m31, ngc224), the common name
+    (andromeda4) and its words (andromeda).
+    """
+    tokens = name.split()
+    designations = [t for t in tokens if DESIGNATION.match(t)]
+    words = [t for t in tokens if not DESIGNATION.match(t)]
+    terms = [name] + designations
+    if words and designations:
+        terms.append(' '.join(words))
+    if len(words) > 1:
+        terms += [w for w in words if len(w) >= 3 and not w.isdigit()]
+    out = []
+    for term in terms:
+        norm = normalize(term)
+        if norm and norm not in out:
+            out.append(norm)
+    return out
+
+def trigrams(term, padded=True):
+    """Trigrams of a normalized term; padding marks the start and end of the word."""
+    if padded:
+        term = '$$' + term + '$'
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+def edit_distance(a, b, limit):
+    """
+    Levenshtein distance counting an adjacent transposition as one edit
+    ('plaeides' is one from 'pleiades'); anything over `limit` returns limit + 1.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], before[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        before, prev = prev, cur
+    return prev[-1] if prev[-1] <= limit else limit + 1
+
+def max_edits(term):
+    """Typos tolerated in a fuzzy query of this length."""
+    return 1 if len(term) <= 5 else 2
+
+def _mag(obj):
+    try:
+        return float(obj.get('Mag', obj.get('mag')))
+    except (TypeError, ValueError):
+        return UNKNOWN_MAG
+
+
+class NameIndex:
+    """
+    Search terms of every named catalog object.  Prefix queries bisect the
+    sorted term array; substring and fuzzy queries use trigram posting lists,
+    scanning the rarest trigrams first.  Fuzzy matching only runs for
+    queries that match nothing as typed.  Common names ('andromda',
+    'plaeides') match on trigram similarity or edit distance; designations
+    ('ncg7000') tolerate a typo in the catalog prefix but keep the number
+    exact, since a mistyped number is as likely to hit a real but different
+    object.  Results rank by tier, then by similarity for fuzzy matches,
+    then by magnitude (brightest first).
+    """
+
+    def __init__(self):
+        self.objects = []
+        self.terms = []         # term id -> normalized term
+        self.term_obj = []      # term id -> object id
+        self.term_mag = []      # term id -> magnitude of its object
+        self.term_grams = []    # term id -> number of distinct padded trigrams
+        self.exact = {}         # term -> [term id]
+        self.postings = {}      # padded trigram -> [term id]
+        self.sorted_terms = []
+        self.sorted_ids = []
+        self.sorted_mags = []
+
+    def __len__(self):
+        return len(self.objects)
+
+    def add(self, obj, name=None, aliases=(), mag=None):
+        """
+        Index an object under its Name (plus any extra alias strings).  `obj`
+        may be any key, such as a row id, when `name` and `mag` are given.
+        """
+        if name is None:
+            name = obj.get('Name', '')
+        terms = name_aliases(name)
+        for alias in aliases:
+            for term in name_aliases(alias):
+                if term not in terms:
+                    terms.append(term)
+        if not terms:
+            return
+        oid = len(self.objects)
+        self.objects.append(obj)
+        if mag is None:
+            mag = _mag(obj) if isinstance(obj, dict) else UNKNOWN_MAG
+        for term in terms:
+            tid = len(self.terms)
+            self.terms.append(term)
+            self.term_obj.append(oid)
+            self.term_mag.append(mag)
+            self.exact.setdefault(term, []).append(tid)
+            grams = trigrams(term)
+            self.term_grams.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(tid)
+
+    def build(self):
+        """
+        Sort the prefix array and pack the per-term lists into typed arrays;
+        call once after the last add().
+        """
+        order = sorted(range(len(self.terms)), key=self.terms.__getitem__)
+        self.sorted_terms = [self.terms[i] for i in order]
+        self.sorted_ids = array('I', order)
+        self.sorted_mags = array('f', (self.term_mag[i] for i in order))
+        self.term_obj = array('I', self.term_obj)
+        self.term_mag = array('f', self.term_mag)
+        self.term_grams = array('H', self.term_grams)
+        self.postings = {gram: array('I', tids) for gram, tids in self.postings.items()}
+        return self
+
+    # --- Queries ---
+
+    def search(self, query, limit=50):
+        """Up to `limit` objects for a free-text query, best match first."""
+        q = normalize(query)
+        if not q:
+            return []
+        ranked = []         # (tier, -similarity, mag, tid)
+        taken = set()
+
+        def take(candidates):
+            for key in sorted(candidates):
+                oid = self.term_obj[key[-1]]
+                if oid not in taken:
+                    taken.add(oid)
+                    ranked.append(key)
+
+        # Over-fetch: several terms of one object can match the same query
+        want = 2 * limit
+        take((TIER_EXACT, 0.0, self.term_mag[t], t) for t in self.exact.get(q, ()))
+        if len(ranked) < limit:
+            take(self._prefix(q, want))
+        if len(ranked) < limit and len(q) >= 3:
+            take(self._substring(q, want))
+        if not ranked and len(q) >= FUZZY_MIN_QUERY:
+            # Only for names that match nothing as typed
+            take(self._fuzzy_designation(q) if any(c.isdigit() for c in q) else self._fuzzy(q))
+        return [self.objects[self.term_obj[key[-1]]] for key in ranked[:limit]]
+
+    def _prefix(self, q, want):
+        lo = bisect.bisect_left(self.sorted_terms, q)
+        hi = bisect.bisect_left(self.sorted_terms, q + '{', lo)   # '{' sorts after 'z'
+        best = heapq.nsmallest(want, range(lo, hi), key=self.sorted_mags.__getitem__)
+        return [(TIER_PREFIX, 0.0, self.sorted_mags[i], self.sorted_ids[i])
+                for i in best if self.sorted_terms[i] != q]
+
+    def _substring(self, q, want):
+        grams = sorted(trigrams(q, padded=False), key=lambda g: len(self.postings.get(g, ())))
+        if not grams or grams[0] not in self.postings:
+            return []
+        candidates = set(self.postings[grams[0]])
+        for gram in grams[1:4]:     # A few rare trigrams prune enough; the check below is exact
+            candidates.intersection_update(self.postings.get(gram, ()))
+            if not candidates:
+                return []
+        terms = self.terms
+        hits = [t for t in candidates if q in terms[t] and not terms[t].startswith(q)]
+        best = heapq.nsmallest(want, hits, key=self.term_mag.__getitem__)
+        return [(TIER_SUBSTRING, 0.0, self.term_mag[t], t) for t in best]
+
+    def _fuzzy(self, q):
+        grams = trigrams(q)
+        n = len(grams)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        # Dice >= s needs at least s*n/(2-s) shared trigrams
+        need = max(1, int(FUZZY_MIN_SIMILARITY * n / (2 - FUZZY_MIN_SIMILARITY)))
+        limit = max_edits(q)
+        out = []
+        for t, count in shared.items():
+            if count < min(need, FUZZY_MIN_SHARED):
+                continue
+            similarity = 2.0 * count / (n + self.term_grams[t])
+            if similarity < FUZZY_MIN_SIMILARITY:
+                # Transposed or doubled letters break up to four trigrams each
+                term = self.terms[t]
+                edits = edit_distance(q, term, limit)
+                if edits > limit:
+                    continue
+                similarity = 1.0 - edits / max(len(q), len(term))
+            out.append((TIER_FUZZY, -round(similarity, 2), self.term_mag[t], t))
+        return out
+
+    def _fuzzy_designation(self, q):
+        """Designations whose catalog prefix is one typo from the query's ('ncg7000' -> ngc7000)."""
+        match = _LETTERS_NUMBER.match(q)
+        if not match:
+            return []
+        letters, number = match.groups()
+        out = []
+        for prefix in DESIGNATION_PREFIXES:
+            head = prefix.rstrip('0123456789')
+            tail = prefix[len(head):]       # 'sh2' keeps its '2' before the number
+            if len(head) < 2 or head == letters or not number.startswith(tail):
+                continue
+            if edit_distance(letters, head, 1) <= 1:
+                for t in self.exact.get(head + number, ()):
+                    out.append((TIER_FUZZY, -round(1.0 - 1.0 / len(q), 2), self.term_mag[t], t))
+        return out
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Catalog Spatial Index
+Declination zones with RA-sorted members for cone searches over the
+catalog objects: a query bisects the RA window of each zone it overlaps
+and checks only those candidates exactly
+"""
+
+import bisect
+import math
+from array import array
+
+ZONE_HEIGHT = 1.0       # degrees of declination per zone
+UNKNOWN_MAG = 99.0
+
+
+def unit_vector(ra_hours, dec_deg):
+    ra = math.radians(ra_hours * 15.0)
+    dec = math.radians(dec_deg)
+    cos_dec = math.cos(dec)
+    return (cos_dec * math.cos(ra), cos_dec * math.sin(ra), math.sin(dec))
+
+
+class Zone:
+    """Objects in one declination band as parallel arrays, sorted by RA (degrees)."""
+
+    __slots__ = ('ra', 'x', 'y', 'z', 'mag', 'ids')
+
+    def __init__(self, rows):
+        rows.sort()
+        self.ra = array('d', (r[0] for r in rows))
+        self.x = array('d', (r[1] for r in rows))
+        self.y = array('d', (r[2] for r in rows))
+        self.z = array('d', (r[3] for r in rows))
+        self.mag = array('d', (r[4] for r in rows))
+        self.ids = array('i', (r[5] for r in rows))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class ZoneIndex:
+    """
+    Cone search over (ra_hours, dec_deg, mag) points.  Build once from a
+    list of objects; cone() returns (separation_deg, object) pairs.
+    """
+
+    def __init__(self, objects, position, mag, zone_height=ZONE_HEIGHT):
+        """
+        `objects` is a sequence (a list, or a range of row ids); `position(obj)`
+        gives (ra_hours, dec_deg) or None and `mag(obj)` a float or None.
+        """
+        self.zone_height = zone_height
+        self.zone_count = int(math.ceil(180.0 / zone_height))
+        self.objects = objects
+        self.count = 0
+        rows = [[] for _ in range(self.zone_count)]
+        for oid, obj in enumerate(objects):
+            pos = position(obj)
+            if pos is None:
+                continue
+            ra_hours, dec = pos
+            m = mag(obj)
+            self.count += 1
+            x, y, z = unit_vector(ra_hours, dec)
+            rows[self.zone_of(dec)].append(((ra_hours * 15.0) % 360.0, x, y, z,
+                                            UNKNOWN_MAG if m is None else m, oid))
+        self.zones = [Zone(r) for r in rows]
+
+    def __len__(self):
+        return self.count
+
+    def zone_of(self, dec):
+        return min(self.zone_count - 1, max(0, int((dec + 90.0) // self.zone_height)))
+
+    def cone(self, ra_hours, dec, radius, maglim=None, limit=None):
+        """
+        Objects within `radius` degrees of (ra_hours, dec), nearest first, as
+        (separation_deg, object).  `maglim` drops fainter objects; objects
+        without a magnitude only pass when no limit is given.
+        """
+        radius = min(max(radius, 0.0), 180.0)
+        cx, cy, cz = unit_vector(ra_hours, dec)
+        min_cos = math.cos(math.radians(radius))
+        center_ra = (ra_hours * 15.0) % 360.0
+        mag_cut = UNKNOWN_MAG if maglim is None else maglim
+        hits = []
+        for zi in range(self.zone_of(dec - radius), self.zone_of(dec + radius) + 1):
+            zone = self.zones[zi]
+            if not len(zone):
+                continue
+            for lo, hi in self._ra_windows(zi, center_ra, dec, radius):
+                i = bisect.bisect_left(zone.ra, lo)
+                j = bisect.bisect_right(zone.ra, hi, i)
+                xs, ys, zs, mags, ids = zone.x, zone.y, zone.z, zone.mag, zone.ids
+                for k in range(i, j):
+                    if mags[k] > mag_cut:
+                        continue
+                    dot = cx * xs[k] + cy * ys[k] + cz * zs[k]
+                    if dot >= min_cos:
+                        hits.append((dot, ids[k]))
+        hits.sort(reverse=True)
+        if limit is not None:
+            hits = hits[:limit]
+        return [(math.degrees(math.acos(min(1.0, dot))), self.objects[oid]) for dot, oid in hits]
+
+    def _ra_windows(self, zi, center_ra, dec, radius):
+        """RA ranges (degrees) of zone `zi` that can hold points within the cone."""
+        zone_lo = -90.0 + zi * self.zone_height
+        zone_hi = zone_lo + self.zone_height
+        # The cone is widest in RA at the zone edge nearest a pole
+        worst = max(abs(zone_lo), abs(zone_hi))
+        if abs(dec) + radius >= 90.0 or worst >= 90.0 - 1e-9:
+            return [(0.0, 360.0)]
+        cos_worst = math.cos(math.radians(worst))
+        sin_r = math.sin(math.radians(radius))
+        if sin_r >= cos_worst:
+            return [(0.0, 360.0)]
+        half = math.degrees(math.asin(sin_r / cos_worst))
+        lo, hi = center_ra - half, center_ra + half
+        if lo < 0.0:
+            return [(0.0, hi), (lo + 360.0, 360.0)]
+        if hi > 360.0:
+            return [(lo, 360.0), (0.0, hi - 360.0)]
+        return [(lo, hi)]
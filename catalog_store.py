@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Columnar Catalog Store
+Catalog objects held as typed columns (RA, Dec, Mag, Size, catalog code)
+plus packed string tables for names and aliases.  Dicts are built only for
+the rows a route returns.  Uses NumPy when installed, else the array module
+"""
+
+import json
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:     # The stdlib columns are enough for lookups; filters loop in Python
+    np = None
+
+from catalog_aliases import entry_mag, entry_position
+from catalog_search import DESIGNATION
+
+# Catalog type codes; the order is part of the column format
+CATALOG_TYPES = ('stars', 'messier', 'galaxies', 'globular_clusters', 'nebula',
+                 'open_clusters', 'planetary_nebula', 'constellations')
+ALIAS_SEPARATOR = '\x1f'
+# Catalogs whose source fields beyond the common row layout (a star's
+# SpecType, ColorIDX, Distance...) are kept and returned by row()
+EXTRA_FIELD_CATALOGS = ('stars',)
+ROW_KEYS = frozenset(('Name', 'RtAsc', 'Declin', 'Mag', 'Size', 'catalog_type',
+                      'catalogs', 'aliases', 'designations'))
+
+
+def _extras(obj):
+    """JSON of the source fields row() would otherwise drop, for EXTRA_FIELD_CATALOGS."""
+    if obj.get('catalog_type') not in EXTRA_FIELD_CATALOGS:
+        return ''
+    extras = {k: v for k, v in obj.items() if k not in ROW_KEYS and not k.startswith('_')}
+    return json.dumps(extras, separators=(',', ':')) if extras else ''
+
+def _size(obj):
+    try:
+        return float(obj.get('Size', obj.get('size')))
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class StringTable:
+    """Strings packed into one UTF-8 buffer with an offsets column."""
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets      # n + 1 uint32 offsets into data
+        self.data = data            # bytes, or a memoryview over a mapped file
+
+    @classmethod
+    def pack(cls, strings):
+        offsets = array('I', [0])
+        chunks = []
+        total = 0
+        for s in strings:
+            data = s.encode('utf-8')
+            chunks.append(data)
+            total += len(data)
+            offsets.append(total)
+        return cls(offsets, b''.join(chunks))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+
+def make_column(typecode, values):
+    """A typed column from an iterable: a NumPy array when available, else an array.array."""
+    if np is not None:
+        return np.array(list(values), dtype=np.dtype(typecode))
+    return array(typecode, values)
+
+
+class CatalogStore:
+    """
+    One row per canonical catalog object.  Columns: ra (hours), dec (deg),
+    mag (NaN when unknown), size (arcmin, NaN when unknown), type (index
+    into CATALOG_TYPES) and catalogs (bitmask of every catalog the object
+    appears in).  row(i) materializes the dict the routes return, with the
+    source's own fields for EXTRA_FIELD_CATALOGS rows.
+    """
+
+    # (attribute, typecode) of every numeric column, in file order
+    COLUMNS = (('ra', 'd'), ('dec', 'd'), ('mag', 'f'), ('size', 'f'),
+               ('type', 'B'), ('catalogs', 'H'))
+
+    # String tables, in file order
+    TABLES = ('names', 'aliases', 'extras')
+
+    def __init__(self, columns, names, aliases, extras):
+        """`columns` maps each COLUMNS attribute to an indexable typed column."""
+        for attr, _ in self.COLUMNS:
+            setattr(self, attr, columns[attr])
+        self.names = names
+        self.aliases = aliases
+        self.extras = extras        # JSON objects, '' for most rows
+
+    @classmethod
+    def from_objects(cls, objects):
+        """A store from canonical dicts (catalog_aliases.AliasTable.canonical)."""
+        rows = []
+        for obj in objects:
+            pos = entry_position(obj)
+            if pos is None:
+                continue
+            mag = entry_mag(obj)
+            catalogs = obj.get('catalogs') or [obj.get('catalog_type')]
+            mask = 0
+            for c in catalogs:
+                if c in CATALOG_TYPES:
+                    mask |= 1 << CATALOG_TYPES.index(c)
+            rows.append((pos[0], pos[1], math.nan if mag is None else mag, _size(obj),
+                         CATALOG_TYPES.index(obj['catalog_type']), mask,
+                         obj.get('Name', ''), ALIAS_SEPARATOR.join(obj.get('aliases', ())),
+                         _extras(obj)))
+        columns = {attr: make_column(code, (r[n] for r in rows))
+                   for n, (attr, code) in enumerate(cls.COLUMNS)}
+        return cls(columns, StringTable.pack(r[6] for r in rows),
+                   StringTable.pack(r[7] for r in rows), StringTable.pack(r[8] for r in rows))
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the columns and string tables."""
+        total = sum(getattr(self, attr).itemsize * len(self) for attr, _ in self.COLUMNS)
+        for table in (self.names, self.aliases, self.extras):
+            total += len(table.data) + table.offsets.itemsize * len(table.offsets)
+        return total
+
+    # --- Scalar access (used by the name and spatial indexes) ---
+
+    def name(self, i):
+        return self.names[i]
+
+    def alias_list(self, i):
+        raw = self.aliases[i]
+        return raw.split(ALIAS_SEPARATOR) if raw else []
+
+    def position(self, i):
+        return float(self.ra[i]), float(self.dec[i])
+
+    def mag_of(self, i):
+        mag = float(self.mag[i])
+        return None if math.isnan(mag) else mag
+
+    def catalog_type(self, i):
+        return CATALOG_TYPES[int(self.type[i])]
+
+    # --- Materialization ---
+
+    def row(self, i):
+        """The dict for one object, in the RtAsc/Declin/Name layout the UI expects."""
+        name = self.names[i]
+        aliases = self.alias_list(i)
+        mag = self.mag_of(i)
+        size = float(self.size[i])
+        mask = int(self.catalogs[i])
+        tokens = ' '.join([name] + aliases).split()
+        extras = self.extras[i]
+        obj = json.loads(extras) if extras else {}
+        obj.update({
+            'Name': name,
+            'RtAsc': float(self.ra[i]),
+            'Declin': float(self.dec[i]),
+            'Mag': None if mag is None else round(mag, 2),
+            'Size': None if math.isnan(size) else round(size, 4),
+            'catalog_type': self.catalog_type(i),
+            'catalogs': [c for bit, c in enumerate(CATALOG_TYPES) if mask & (1 << bit)],
+            'aliases': aliases,
+            'designations': sorted({t for t in tokens if DESIGNATION.match(t)}),
+        })
+        return obj
+
+    def rows(self, ids):
+        return [self.row(i) for i in ids]
+
+    # --- Vectorized filters ---
+
+    def select(self, maglim=None, catalog=None):
+        """Row ids with mag <= maglim (unknown magnitudes excluded) and/or from `catalog`."""
+        bit = None
+        if catalog is not None:
+            bit = 1 << CATALOG_TYPES.index(catalog)
+        if np is not None:
+            keep = np.ones(len(self), dtype=bool)
+            if maglim is not None:
+                keep &= self.mag <= maglim     # NaN compares False
+            if bit is not None:
+                keep &= (self.catalogs & bit) != 0
+            return np.flatnonzero(keep).tolist()
+        return [i for i in range(len(self))
+                if (maglim is None or self.mag[i] <= maglim)
+                and (bit is None or self.catalogs[i] & bit)]
+
+    def brightest_first(self, maglim=None, catalogs=None):
+        """Row ids by magnitude, unknown last, optionally mag <= maglim and in any of `catalogs`."""
+        bits = 0
+        for c in catalogs or ():
+            bits |= 1 << CATALOG_TYPES.index(c)
+        if np is not None:
+            keep = np.ones(len(self), dtype=bool)
+            if maglim is not None:
+                keep &= self.mag <= maglim
+            if bits:
+                keep &= (self.catalogs & bits) != 0
+            rows = np.flatnonzero(keep)
+            return rows[np.argsort(self.mag[rows], kind='stable')].tolist()     # NaN sorts last
+        mags = self.mag
+        rows = [i for i in range(len(self))
+                if (maglim is None or mags[i] <= maglim)
+                and (not bits or self.catalogs[i] & bits)]
+        rows.sort(key=lambda i: (math.isnan(mags[i]), mags[i]))
+        return rows
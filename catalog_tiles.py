@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Catalog Sky Tiles
+The sky cut into tiles at several levels, each a declination band split
+into RA cells of roughly equal area (the zone layout of catalog_spatial,
+made hierarchical).  Every tile lists its objects brightest first, so a
+client can fetch the tiles in view only down to the magnitude it needs.
+"""
+
+import bisect
+import math
+from collections import OrderedDict
+
+from catalog_store import np
+
+TILE_LEVELS = 4             # level L has bands of 30 / 2**L degrees (30, 15, 7.5, 3.75)
+EQUATOR_CELLS = 12          # RA cells in an equatorial band at level 0
+UNKNOWN_MAG = 20.0          # magnitude the catalogs use for "unknown"; sorts last
+BODY_CACHE_ENTRIES = 512    # rendered tile responses kept per index
+
+
+class TileGrid:
+    """The tiles of one level, numbered band by band from the south pole."""
+
+    def __init__(self, level):
+        self.level = level
+        self.band_height = 30.0 / (1 << level)
+        self.band_count = int(round(180.0 / self.band_height))
+        self.cells = []         # RA cells per band
+        self.first = []         # id of each band's first tile
+        equator = EQUATOR_CELLS << level
+        count = 0
+        for band in range(self.band_count):
+            lo = -90.0 + band * self.band_height
+            # Widest edge decides, so cells never get wider than the band is tall
+            widest = max(math.cos(math.radians(lo)), math.cos(math.radians(lo + self.band_height)))
+            cells = max(1, int(math.ceil(equator * widest - 1e-9)))
+            self.cells.append(cells)
+            self.first.append(count)
+            count += cells
+        self.count = count
+
+    def band_of(self, dec):
+        return min(self.band_count - 1, max(0, int((dec + 90.0) // self.band_height)))
+
+    def tile_of(self, ra_hours, dec):
+        band = self.band_of(dec)
+        cells = self.cells[band]
+        return self.first[band] + min(cells - 1, int((ra_hours % 24.0) / 24.0 * cells))
+
+    def tile_ids(self, ra_hours, dec_deg):
+        """tile_of() for whole columns; a NumPy array when available."""
+        if np is None:
+            return [self.tile_of(r, d) for r, d in zip(ra_hours, dec_deg)]
+        band = np.clip(((np.asarray(dec_deg) + 90.0) // self.band_height).astype(np.int64),
+                       0, self.band_count - 1)
+        cells = np.asarray(self.cells)[band]
+        cell = np.minimum(cells - 1, (np.mod(ra_hours, 24.0) / 24.0 * cells).astype(np.int64))
+        return np.asarray(self.first)[band] + cell
+
+    def bounds(self, tile):
+        """(ra_lo_hours, ra_hi_hours, dec_lo, dec_hi) of a tile."""
+        band = bisect.bisect_right(self.first, tile) - 1
+        cells = self.cells[band]
+        cell = tile - self.first[band]
+        dec_lo = -90.0 + band * self.band_height
+        return (24.0 * cell / cells, 24.0 * (cell + 1) / cells, dec_lo, dec_lo + self.band_height)
+
+    def describe(self):
+        """The layout a client needs to compute tile ids itself."""
+        return {'level': self.level, 'band_height': self.band_height, 'tiles': self.count,
+                'bands': [[-90.0 + b * self.band_height, self.cells[b], self.first[b]]
+                          for b in range(self.band_count)]}
+
+
+GRIDS = [TileGrid(level) for level in range(TILE_LEVELS)]
+
+
+class TileIndex:
+    """
+    Row ids of every level's tiles, sorted by tile then magnitude, built once
+    from RA/Dec/Mag columns.  tile() slices one tile between two magnitudes.
+    """
+
+    def __init__(self, ra_hours, dec_deg, mags, version=None):
+        self.version = version
+        self.bodies = OrderedDict()     # rendered responses, see cached()
+        if np is not None:
+            mags = np.nan_to_num(np.asarray(mags, dtype=np.float64), nan=UNKNOWN_MAG)
+        else:
+            mags = [UNKNOWN_MAG if math.isnan(m) else m for m in mags]
+        self.levels = []
+        for grid in GRIDS:
+            tiles = grid.tile_ids(ra_hours, dec_deg)
+            if np is not None:
+                order = np.lexsort((mags, tiles))
+                starts = np.searchsorted(tiles[order], np.arange(grid.count + 1)).tolist()
+                self.levels.append((order.tolist(), mags[order].tolist(), starts))
+            else:
+                order = sorted(range(len(tiles)), key=lambda i: (tiles[i], mags[i]))
+                sorted_tiles = [tiles[i] for i in order]
+                starts = [bisect.bisect_left(sorted_tiles, t) for t in range(grid.count + 1)]
+                self.levels.append((order, [mags[i] for i in order], starts))
+
+    def tile(self, level, tile, minmag=None, maglim=None):
+        """Row ids in a tile, brightest first, with minmag < mag <= maglim."""
+        order, mags, starts = self.levels[level]
+        lo, hi = starts[tile], starts[tile + 1]
+        if minmag is not None:
+            lo = bisect.bisect_right(mags, minmag, lo, hi)
+        if maglim is not None:
+            hi = bisect.bisect_right(mags, maglim, lo, hi)
+        return order[lo:hi]
+
+    def cached(self, key, render):
+        """The body for `key`, rendering it with render() on a miss."""
+        body = self.bodies.get(key)
+        if body is None:
+            body = render()
+            self.bodies[key] = body
+            while len(self.bodies) > BODY_CACHE_ENTRIES:
+                self.bodies.popitem(last=False)
+        else:
+            self.bodies.move_to_end(key)
+        return body
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Solar System Ephemeris
+Apparent RA/Dec of the Sun, Moon and planets computed locally so SkyView's
+solar-system layer does not need a GetSunMoonPlanets round trip.
+
+Planets use the JPL Keplerian elements for 1800-2050 (Standish, "Approximate
+Positions of the Planets") with light-time and annual aberration; the Moon
+uses the main terms of the Meeus (ch. 47) lunar series.  Both are precessed
+and nutated to the true equator and equinox of date.  Accuracy is about an
+arcminute for the planets and a few arcminutes for the Moon, well inside
+the SkyView symbol size.
+"""
+
+import json
+import math
+import threading
+import time
+
+# Same order as the 20 values of SiTechExe's GetSunMoonPlanets reply
+BODY_ORDER = ('mercury', 'venus', 'mars', 'jupiter', 'saturn', 'uranus',
+              'neptune', 'pluto', 'sun', 'moon')
+
+PLANET_BUCKET = 60.0    # seconds a cached planet/Sun position is reused
+MOON_BUCKET = 10.0      # the Moon moves ~0.5 arcmin per minute
+
+DELTA_T = 69.2          # TT - UT in seconds, close enough for 2020-2030
+LIGHT_TIME = 0.0057755183   # days per AU
+C_AU_PER_DAY = 173.1446327
+EARTH_RADIUS_KM = 6378.14
+
+# Element, rate per Julian century: a (AU), e, I, L, long. perihelion, long. node (degrees)
+PLANET_ELEMENTS = {
+    'mercury': ((0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593),
+                (0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081)),
+    'venus':   ((0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255),
+                (0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418)),
+    'earth':   ((1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0),
+                (0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0)),
+    'mars':    ((1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891),
+                (0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343)),
+    'jupiter': ((5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909),
+                (-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106)),
+    'saturn':  ((9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448),
+                (-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794)),
+    'uranus':  ((19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503),
+                (-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589)),
+    'neptune': ((30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574),
+                (0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.00508664)),
+    'pluto':   ((39.48211675, 0.24882730, 17.14001206, 238.92903833, 224.06891629, 110.30393684),
+                (-0.00031596, 0.00005170, 0.00004818, 145.20780515, -0.04062942, -0.01183482)),
+}
+
+# Meeus table 47.A: multiples of D, M, M', F; longitude (1e-6 deg); distance (1e-3 km)
+MOON_LR_TERMS = (
+    (0, 0, 1, 0, 6288774, -20905355), (2, 0, -1, 0, 1274027, -3699111),
+    (2, 0, 0, 0, 658314, -2955968), (0, 0, 2, 0, 213618, -569925),
+    (0, 1, 0, 0, -185116, 48888), (0, 0, 0, 2, -114332, -3149),
+    (2, 0, -2, 0, 58793, 246158), (2, -1, -1, 0, 57066, -152138),
+    (2, 0, 1, 0, 53322, -170733), (2, -1, 0, 0, 45758, -204586),
+    (0, 1, -1, 0, -40923, -129620), (1, 0, 0, 0, -34720, 108743),
+    (0, 1, 1, 0, -30383, 104755), (2, 0, 0, -2, 15327, 10321),
+    (0, 0, 1, 2, -12528, 0), (0, 0, 1, -2, 10980, 79661),
+    (4, 0, -1, 0, 10675, -34782), (0, 0, 3, 0, 10034, -23210),
+    (4, 0, -2, 0, 8548, -21636), (2, 1, -1, 0, -7888, 24208),
+    (2, 1, 0, 0, -6766, 30824), (1, 0, -1, 0, -5163, -8379),
+    (1, 1, 0, 0, 4987, -16675), (2, -1, 1, 0, 4036, -12831),
+    (2, 0, 2, 0, 3994, -10445), (4, 0, 0, 0, 3861, -11650),
+    (2, 0, -3, 0, 3665, 14403), (0, 1, -2, 0, -2689, -7003),
+    (2, 0, -1, 2, -2602, 0), (2, -1, -2, 0, 2390, 10056),
+    (1, 0, 1, 0, -2348, 6322), (2, -2, 0, 0, 2236, -9884),
+)
+# Meeus table 47.B: multiples of D, M, M', F; latitude (1e-6 deg)
+MOON_B_TERMS = (
+    (0, 0, 0, 1, 5128122), (0, 0, 1, 1, 280602), (0, 0, 1, -1, 277693),
+    (2, 0, 0, -1, 173237), (2, 0, -1, 1, 55413), (2, 0, -1, -1, 46271),
+    (2, 0, 0, 1, 32573), (0, 0, 2, 1, 17198), (2, 0, 1, -1, 9266),
+    (0, 0, 2, -1, 8822), (2, -1, 0, -1, 8216), (2, 0, -2, -1, 4324),
+    (2, 0, 1, 1, 4200), (2, 1, 0, -1, -3359), (2, -1, -1, 1, 2463),
+    (2, -1, 0, 1, 2211), (2, -1, -1, -1, 2065), (0, 1, -1, -1, -1870),
+    (4, 0, -1, -1, 1828), (0, 1, 0, 1, -1794),
+)
+
+
+def julian_day(ts):
+    """Julian Day (UT) of a Unix timestamp."""
+    return ts / 86400.0 + 2440587.5
+
+def _centuries(jd_tt):
+    return (jd_tt - 2451545.0) / 36525.0
+
+def _sin(deg):
+    return math.sin(math.radians(deg))
+
+def _cos(deg):
+    return math.cos(math.radians(deg))
+
+
+# --- Reference frames ---
+
+def mean_obliquity(t):
+    """Mean obliquity of the ecliptic in degrees (Meeus 22.2)."""
+    return 23.439291111 - (46.8150 * t + 0.00059 * t * t - 0.001813 * t ** 3) / 3600.0
+
+def nutation(t):
+    """(delta psi, delta epsilon) in degrees from the four largest IAU 1980 terms."""
+    omega = 125.04452 - 1934.136261 * t
+    ls = 280.4665 + 36000.7698 * t
+    lm = 218.3165 + 481267.8813 * t
+    dpsi = -17.20 * _sin(omega) - 1.32 * _sin(2 * ls) - 0.23 * _sin(2 * lm) + 0.21 * _sin(2 * omega)
+    deps = 9.20 * _cos(omega) + 0.57 * _cos(2 * ls) + 0.10 * _cos(2 * lm) - 0.09 * _cos(2 * omega)
+    return dpsi / 3600.0, deps / 3600.0
+
+def _ecliptic_to_equatorial(lon, lat, eps):
+    """Ecliptic longitude/latitude to RA (hours) and Dec (degrees), obliquity eps."""
+    ra = math.degrees(math.atan2(_sin(lon) * _cos(eps) - math.tan(math.radians(lat)) * _sin(eps), _cos(lon)))
+    dec = math.degrees(math.asin(_sin(lat) * _cos(eps) + _cos(lat) * _sin(eps) * _sin(lon)))
+    return (ra / 15.0) % 24.0, dec
+
+def _equatorial_to_ecliptic(ra, dec, eps):
+    a = ra * 15.0
+    lon = math.degrees(math.atan2(_sin(a) * _cos(eps) + math.tan(math.radians(dec)) * _sin(eps), _cos(a)))
+    lat = math.degrees(math.asin(_sin(dec) * _cos(eps) - _cos(dec) * _sin(eps) * _sin(a)))
+    return lon % 360.0, lat
+
+def precess_from_j2000(ra, dec, t):
+    """Rigorous IAU 1976 precession of J2000 RA (hours)/Dec (degrees) to the mean equinox of date."""
+    zeta = (2306.2181 * t + 0.30188 * t * t + 0.017998 * t ** 3) / 3600.0
+    z = (2306.2181 * t + 1.09468 * t * t + 0.018203 * t ** 3) / 3600.0
+    theta = (2004.3109 * t - 0.42665 * t * t - 0.041833 * t ** 3) / 3600.0
+    a0 = ra * 15.0 + zeta
+    A = _cos(dec) * _sin(a0)
+    B = _cos(theta) * _cos(dec) * _cos(a0) - _sin(theta) * _sin(dec)
+    C = _sin(theta) * _cos(dec) * _cos(a0) + _cos(theta) * _sin(dec)
+    ra_out = (math.degrees(math.atan2(A, B)) + z) / 15.0 % 24.0
+    dec_out = math.degrees(math.asin(max(-1.0, min(1.0, C))))
+    return ra_out, dec_out
+
+def apply_nutation(ra, dec, t):
+    """Mean equator/equinox of date to true equator/equinox of date."""
+    eps0 = mean_obliquity(t)
+    dpsi, deps = nutation(t)
+    lon, lat = _equatorial_to_ecliptic(ra, dec, eps0)
+    return _ecliptic_to_equatorial(lon + dpsi, lat, eps0 + deps)
+
+def apparent_sidereal_time(jd_ut, longitude):
+    """Local apparent sidereal time in hours (Meeus 12.4 plus the equation of the equinoxes)."""
+    t = (jd_ut - 2451545.0) / 36525.0
+    gmst = (280.46061837 + 360.98564736629 * (jd_ut - 2451545.0)
+            + 0.000387933 * t * t - t ** 3 / 38710000.0)
+    dpsi, deps = nutation(t)
+    gast = gmst + dpsi * _cos(mean_obliquity(t) + deps)
+    return ((gast + longitude) / 15.0) % 24.0
+
+
+# --- Planets ---
+
+def heliocentric_ecliptic(name, t):
+    """Heliocentric J2000 ecliptic x, y, z (AU) of a planet ('earth' is the Earth-Moon barycenter)."""
+    base, rate = PLANET_ELEMENTS[name]
+    a, e, inc, mean_lon, peri, node = (b + r * t for b, r in zip(base, rate))
+    w = peri - node
+    m = math.radians((mean_lon - peri + 180.0) % 360.0 - 180.0)
+    # Kepler's equation by Newton iteration
+    ecc = m + e * math.sin(m)
+    for _ in range(8):
+        delta = (ecc - e * math.sin(ecc) - m) / (1.0 - e * math.cos(ecc))
+        ecc -= delta
+        if abs(delta) < 1e-12:
+            break
+    xp = a * (math.cos(ecc) - e)
+    yp = a * math.sqrt(1.0 - e * e) * math.sin(ecc)
+    cw, sw, cn, sn, ci, si = _cos(w), _sin(w), _cos(node), _sin(node), _cos(inc), _sin(inc)
+    x = (cw * cn - sw * sn * ci) * xp + (-sw * cn - cw * sn * ci) * yp
+    y = (cw * sn + sw * cn * ci) * xp + (-sw * sn + cw * cn * ci) * yp
+    z = (sw * si) * xp + (cw * si) * yp
+    return x, y, z
+
+def _earth_velocity(t):
+    """Earth's heliocentric velocity in AU/day by central difference."""
+    h = 0.5 / 36525.0
+    x1, y1, z1 = heliocentric_ecliptic('earth', t - h)
+    x2, y2, z2 = heliocentric_ecliptic('earth', t + h)
+    return (x2 - x1), (y2 - y1), (z2 - z1)
+
+def planet_radec(name, jd_ut):
+    """Apparent geocentric RA (hours) and Dec (degrees) of a planet or 'sun'."""
+    t = _centuries(jd_ut + DELTA_T / 86400.0)
+    ex, ey, ez = heliocentric_ecliptic('earth', t)
+    if name == 'sun':
+        dx, dy, dz = -ex, -ey, -ez
+        dist = math.sqrt(dx * dx + dy * dy + dz * dz)
+        tau = LIGHT_TIME * dist / 36525.0
+        sx, sy, sz = heliocentric_ecliptic('earth', t - tau)
+        dx, dy, dz = -sx, -sy, -sz
+    else:
+        tau = 0.0
+        for _ in range(2):
+            px, py, pz = heliocentric_ecliptic(name, t - tau)
+            dx, dy, dz = px - ex, py - ey, pz - ez
+            tau = LIGHT_TIME * math.sqrt(dx * dx + dy * dy + dz * dz) / 36525.0
+    # Annual aberration (first order in v/c)
+    dist = math.sqrt(dx * dx + dy * dy + dz * dz)
+    vx, vy, vz = _earth_velocity(t)
+    ux = dx / dist + vx / C_AU_PER_DAY
+    uy = dy / dist + vy / C_AU_PER_DAY
+    uz = dz / dist + vz / C_AU_PER_DAY
+    lon = math.degrees(math.atan2(uy, ux)) % 360.0
+    lat = math.degrees(math.atan2(uz, math.hypot(ux, uy)))
+    ra, dec = _ecliptic_to_equatorial(lon, lat, 23.4392911)
+    ra, dec = precess_from_j2000(ra, dec, t)
+    return apply_nutation(ra, dec, t)
+
+
+# --- Moon ---
+
+def moon_ecliptic(t):
+    """Geocentric ecliptic longitude, latitude (degrees, mean equinox of date) and distance (km)."""
+    lp = 218.3164477 + 481267.88123421 * t - 0.0015786 * t * t + t ** 3 / 538841.0 - t ** 4 / 65194000.0
+    d = 297.8501921 + 445267.1114034 * t - 0.0018819 * t * t + t ** 3 / 545868.0 - t ** 4 / 113065000.0
+    m = 357.5291092 + 35999.0502909 * t - 0.0001536 * t * t + t ** 3 / 24490000.0
+    mp = 134.9633964 + 477198.8675055 * t + 0.0087414 * t * t + t ** 3 / 69699.0 - t ** 4 / 14712000.0
+    f = 93.2720950 + 483202.0175233 * t - 0.0036539 * t * t - t ** 3 / 3526000.0 + t ** 4 / 863310000.0
+    e = 1.0 - 0.002516 * t - 0.0000074 * t * t
+    a1 = 119.75 + 131.849 * t
+    a2 = 53.09 + 479264.290 * t
+    a3 = 313.45 + 481266.484 * t
+
+    sl = sr = sb = 0.0
+    for cd, cm, cmp_, cf, l_coef, r_coef in MOON_LR_TERMS:
+        arg = cd * d + cm * m + cmp_ * mp + cf * f
+        scale = e ** abs(cm)
+        sl += l_coef * scale * _sin(arg)
+        sr += r_coef * scale * _cos(arg)
+    for cd, cm, cmp_, cf, b_coef in MOON_B_TERMS:
+        arg = cd * d + cm * m + cmp_ * mp + cf * f
+        sb += b_coef * e ** abs(cm) * _sin(arg)
+    sl += 3958 * _sin(a1) + 1962 * _sin(lp - f) + 318 * _sin(a2)
+    sb += (-2235 * _sin(lp) + 382 * _sin(a3) + 175 * _sin(a1 - f) + 175 * _sin(a1 + f)
+           + 127 * _sin(lp - mp) - 115 * _sin(lp + mp))
+    return (lp + sl / 1e6) % 360.0, sb / 1e6, 385000.56 + sr / 1000.0
+
+def moon_radec(jd_ut, latitude=None, longitude=None, elevation=0.0):
+    """
+    Apparent RA (hours) and Dec (degrees) of the Moon; topocentric when the
+    site is given (parallax reaches a full degree), geocentric otherwise.
+    """
+    t = _centuries(jd_ut + DELTA_T / 86400.0)
+    lon, lat, dist = moon_ecliptic(t)
+    dpsi, deps = nutation(t)
+    ra, dec = _ecliptic_to_equatorial(lon + dpsi, lat, mean_obliquity(t) + deps)
+    if latitude is None or longitude is None:
+        return ra, dec
+    # Topocentric correction (Meeus ch. 40)
+    u = math.atan(0.99664719 * math.tan(math.radians(latitude)))
+    h_ratio = (elevation or 0.0) / 6378140.0
+    rho_sin = 0.99664719 * math.sin(u) + h_ratio * _sin(latitude)
+    rho_cos = math.cos(u) + h_ratio * _cos(latitude)
+    sin_par = EARTH_RADIUS_KM / dist
+    ha = (apparent_sidereal_time(jd_ut, longitude) - ra) * 15.0
+    denom = _cos(dec) - rho_cos * sin_par * _cos(ha)
+    dra = math.atan2(-rho_cos * sin_par * _sin(ha), denom)
+    dec_topo = math.degrees(math.atan2((_sin(dec) - rho_sin * sin_par) * math.cos(dra), denom))
+    return (ra + math.degrees(dra) / 15.0) % 24.0, dec_topo
+
+
+def angular_separation(ra1, dec1, ra2, dec2):
+    """Great-circle separation in degrees of two RA (hours)/Dec (degrees) positions."""
+    a1, a2 = math.radians(ra1 * 15.0), math.radians(ra2 * 15.0)
+    d1, d2 = math.radians(dec1), math.radians(dec2)
+    h = (math.sin((d2 - d1) / 2) ** 2
+         + math.cos(d1) * math.cos(d2) * math.sin((a2 - a1) / 2) ** 2)
+    return math.degrees(2 * math.asin(min(1.0, math.sqrt(h))))
+
+
+def solar_system_positions(ts=None, latitude=None, longitude=None, elevation=0.0):
+    """{body: {'ra': hours, 'dec': degrees}} for every body in BODY_ORDER, uncached."""
+    jd = julian_day(time.time() if ts is None else ts)
+    out = {}
+    for name in BODY_ORDER:
+        if name == 'moon':
+            ra, dec = moon_radec(jd, latitude, longitude, elevation)
+        else:
+            ra, dec = planet_radec(name, jd)
+        out[name] = {'ra': ra, 'dec': dec}
+    return out
+
+
+class EphemerisCache:
+    """
+    solar_system_positions() memoized per time bucket: planets and the Sun
+    are recomputed once per PLANET_BUCKET, the Moon once per MOON_BUCKET.
+    Each bucket is evaluated at its midpoint.  The serialized JSON body is
+    kept with the positions so the route can return it without re-encoding.
+    """
+
+    def __init__(self, planet_bucket=PLANET_BUCKET, moon_bucket=MOON_BUCKET):
+        self.planet_bucket = planet_bucket
+        self.moon_bucket = moon_bucket
+        self._lock = threading.Lock()
+        self._planets = (None, None)    # (bucket, {body: {...}}) without the Moon
+        self._moon = (None, None)       # ((bucket, site), {...})
+        self._combined = (None, None, None)    # (key, positions, body)
+
+    def _bucket_time(self, ts, size):
+        bucket = int(ts // size)
+        return bucket, (bucket + 0.5) * size
+
+    def lookup(self, ts=None, latitude=None, longitude=None, elevation=0.0):
+        """(key, positions, JSON body); key changes whenever any position was recomputed."""
+        ts = time.time() if ts is None else ts
+        pb, pt = self._bucket_time(ts, self.planet_bucket)
+        mb, mt = self._bucket_time(ts, self.moon_bucket)
+        site = (latitude, longitude, elevation)
+        key = (pb, mb, site)
+        with self._lock:
+            if self._combined[0] == key:
+                return self._combined
+        # Compute outside the lock; a duplicate computation is harmless
+        planets = self._planets[1] if self._planets[0] == pb else None
+        if planets is None:
+            jd = julian_day(pt)
+            planets = {name: dict(zip(('ra', 'dec'), planet_radec(name, jd)))
+                       for name in BODY_ORDER if name != 'moon'}
+        moon = self._moon[1] if self._moon[0] == (mb, site) else None
+        if moon is None:
+            moon = dict(zip(('ra', 'dec'), moon_radec(julian_day(mt), latitude, longitude, elevation)))
+        positions = dict(planets, moon=moon)
+        body = json.dumps(positions, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        with self._lock:
+            self._planets = (pb, planets)
+            self._moon = ((mb, site), moon)
+            self._combined = (key, positions, body)
+        return key, positions, body
@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+SiTechExe TCP Gateway
+Owns the TCP connections to SiTechExe and runs every command through a single
+I/O thread with a priority queue
+"""
+
+import errno
+import heapq
+import itertools
+import selectors
+import socket
+import threading
+import time
+from concurrent.futures import Future
+
+from metrics import registry
+
+# --- SiTechExe reply framing ---
+# Every SiTechExe reply is a run of ';'-separated values, then '_' and a
+# message, closed by a newline (see SiTechTCPProtocol.txt).  The standard
+# return string carries 11 values; a few queries carry their own count.
+SITECH_STANDARD_FIELDS = 11
+SITECH_REPLY_FIELDS = {
+    'SiteLocations': 3,
+    'ScopeInfo': 4,
+}
+# Queries whose reply does not follow the "values;_Message" layout.  These
+# are complete as soon as their line ends.
+SITECH_LINE_REPLIES = (
+    'SearchDatabase', 'GetSunMoonPlanets', 'GetPointXPStatus', 'GetSiTechVersion'
+)
+# Some SiTechExe builds omit the trailing newline; once the '_' message has
+# started, this much silence on the socket ends the reply instead.
+SITECH_REPLY_IDLE = 0.05
+
+# --- Command priorities (lower runs first) ---
+PRIORITY_ABORT  = 0   # Abort and axis stops: ahead of any queued move
+PRIORITY_URGENT = 1   # Manual moves, park, ...: served on their own connection
+PRIORITY_STATUS = 2   # ReadScopeStatus polling: also on its own connection
+PRIORITY_NORMAL = 3   # GoTo, Sync, model commands, ...
+PRIORITY_BULK   = 4   # Slow lookups that must never hold up anything else
+
+URGENT_VERBS = ('Park', 'UnPark', 'MotorsToBlinky', 'MotorsToAuto', 'SetTrackMode')
+BULK_VERBS = ('SearchDatabase', 'GetSunMoonPlanets')
+
+CONNECT_TIMEOUT = 2
+CONNECT_RETRY = 0.5     # seconds between connection attempts while SiTechExe is down
+# connect_ex() results meaning "in progress" (10035 is WSAEWOULDBLOCK)
+CONNECT_PENDING = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, 10035)
+DEFAULT_QUEUE_TIMEOUT = 15
+MOVE_QUEUE_TIMEOUT = 0.5    # a joystick move not sent by then is dropped, not sent late
+
+# --- Metrics (served at /metrics) ---
+# Verb labels come from this fixed set so that caller-built commands
+# cannot add label series without bound; anything else counts as 'other'.
+METRIC_VERBS = frozenset((
+    'ReadScopeStatus', 'SiteLocations', 'ScopeInfo', 'GetSiTechVersion',
+    'GoTo', 'GoToAltAz', 'Sync', 'Abort', 'Park', 'UnPark', 'SetPark', 'SetTrackMode',
+    'MoveAxisSPGPri', 'MoveAxisSPGSec', 'MotorsToBlinky', 'MotorsToAuto',
+    'SearchDatabase', 'GetSunMoonPlanets', 'GetPointXPStatus', 'ClearAllCalPoints',
+    'RemoveLastCalPoint', 'EnablePoint', 'DisablePoint', 'SaveModel',
+))
+COMMAND_SECONDS = registry.histogram(
+    'sipi_sitech_command_seconds', 'Time from sending a SiTechExe command to its complete reply', ('verb',))
+QUEUE_WAIT_SECONDS = registry.histogram(
+    'sipi_sitech_queue_wait_seconds', 'Time a command waited for its connection before being sent', ('lane',))
+COMMANDS_TOTAL = registry.counter(
+    'sipi_sitech_commands_total', 'SiTechExe commands by outcome (ok, sent, timeout, error, expired)', ('verb', 'result'))
+RETRIES_TOTAL = registry.counter(
+    'sipi_sitech_retries_total', 'Commands re-queued after a failed send or a dropped connection', ('verb',))
+CONNECTS_TOTAL = registry.counter(
+    'sipi_sitech_connects_total', 'Connection attempts to SiTechExe', ('lane', 'result'))
+DISCONNECTS_TOTAL = registry.counter(
+    'sipi_sitech_disconnects_total', 'Connections closed, by reason', ('lane', 'reason'))
+
+
+def command_verb(command):
+    """First word of a SiTechExe command string."""
+    return command.strip().split(' ', 1)[0]
+
+def is_axis_stop(command):
+    """MoveAxis with no rate argument stops that axis."""
+    parts = command.split()
+    return len(parts) == 1 and parts[0].startswith('MoveAxis')
+
+def metric_verb(verb):
+    """The verb's metrics label: itself if known, else 'other'."""
+    return verb if verb in METRIC_VERBS else 'other'
+
+def command_priority(command):
+    """Default queue priority for a SiTechExe command."""
+    verb = command_verb(command)
+    if verb == 'Abort' or is_axis_stop(command):
+        return PRIORITY_ABORT
+    if verb in URGENT_VERBS or verb.startswith('MoveAxis'):
+        return PRIORITY_URGENT
+    if verb == 'ReadScopeStatus':
+        return PRIORITY_STATUS
+    if verb.startswith(BULK_VERBS):
+        return PRIORITY_BULK
+    return PRIORITY_NORMAL
+
+def command_queue_timeout(command):
+    """Default time a command may wait for its connection."""
+    if command_verb(command).startswith('MoveAxis') and not is_axis_stop(command):
+        return MOVE_QUEUE_TIMEOUT
+    return DEFAULT_QUEUE_TIMEOUT
+
+def lane_for(priority):
+    """Name of the connection a priority is served on."""
+    if priority <= PRIORITY_URGENT:
+        return 'urgent'
+    if priority == PRIORITY_STATUS:
+        return 'status'
+    return 'command'
+
+def sitech_reply_fields(command):
+    """Number of ';' values expected before the '_' message, or None for line replies."""
+    verb = command_verb(command)
+    if verb.startswith(SITECH_LINE_REPLIES):
+        return None
+    return SITECH_REPLY_FIELDS.get(verb, SITECH_STANDARD_FIELDS)
+
+def sitech_reply_state(response, fields):
+    """Classify a partial reply: 'complete', 'message' (inside the '_' message) or 'partial'."""
+    if fields is None:
+        # An empty line is a valid reply (e.g. SearchDatabase with no match)
+        return 'complete' if '\n' in response else 'partial'
+    body = response.lstrip("\r\n ")
+    if '\n' in body:
+        return 'complete'
+    marker = body.find('_')
+    if marker >= 0 and body.count(';', 0, marker) >= fields:
+        return 'message'
+    return 'partial'
+
+
+class GatewayRequest:
+    """One queued command and the Future its caller is waiting on."""
+
+    __slots__ = ('command', 'verb', 'label', 'priority', 'timeout', 'deadline', 'terminator',
+                 'retries', 'future', 'seq', 'queued_at', 'sent_at')
+
+    def __init__(self, command, priority, timeout, deadline, terminator, retries, seq):
+        self.command = command
+        self.verb = command_verb(command)
+        self.label = metric_verb(self.verb)
+        self.priority = priority
+        self.timeout = timeout
+        self.deadline = deadline        # latest time the command may still be sent
+        self.terminator = terminator
+        self.retries = retries
+        self.future = Future()
+        self.future.deadline = deadline + timeout
+        self.seq = seq
+        self.queued_at = time.monotonic()
+        self.sent_at = None
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class GatewayBatch(GatewayRequest):
+    """
+    Several commands sent back-to-back on one connection as a single queue
+    entry.  The Future resolves to one result dict per step:
+    {'command', 'response', 'error', 'seconds'}, or {'command', 'skipped'}
+    for steps not run because stop_when() asked to stop.
+    """
+
+    __slots__ = ('steps', 'index', 'results', 'stop_when', 'step_started')
+
+    def __init__(self, steps, priority, deadline, stop_when, seq):
+        command, timeout, terminator = steps[0]
+        super().__init__(command, priority, sum(step[1] for step in steps), deadline,
+                         terminator, 0, seq)
+        self.timeout = timeout      # Per step; the Future deadline covers all of them
+        self.steps = steps
+        self.index = 0
+        self.results = []
+        self.stop_when = stop_when
+
+    def record(self, response, error):
+        """Store the current step's outcome; returns True if there is a next step to send."""
+        started = self.sent_at if self.sent_at is not None else time.monotonic()
+        result = {
+            'command': self.command.strip(),
+            'response': response,
+            'error': None if error is None else (str(error) or type(error).__name__),
+            'seconds': round(time.monotonic() - started, 6),
+        }
+        self.results.append(result)
+        self.index += 1
+        if self.index < len(self.steps) and not (self.stop_when and self.stop_when(result)):
+            self.command, self.timeout, self.terminator = self.steps[self.index]
+            self.verb = command_verb(self.command)
+            self.label = metric_verb(self.verb)
+            self.sent_at = None
+            return True
+        for command, _, _ in self.steps[self.index:]:
+            self.results.append({'command': command.strip(), 'skipped': True})
+        return False
+
+
+class GatewayLane:
+    """
+    A connection to SiTechExe with at most one command in flight.  A lane
+    without `replies` never reads an answer: its commands are done once
+    written and anything SiTechExe sends back is discarded.
+    """
+
+    def __init__(self, name, replies=True):
+        self.name = name
+        self.replies = replies
+        self.sock = None
+        self.queue = []             # heap of GatewayRequest
+        self.inflight = None
+        self.buffer = ""
+        self.fields = None
+        self.reply_deadline = 0.0
+        self.reply_limit = 0.0      # sent_at + timeout; the idle rule never extends past it
+        self.connecting = False     # non-blocking connect in progress on sock
+        self.connect_deadline = 0.0
+        self.retry_at = 0.0
+        self.connect_failures = 0
+
+    @property
+    def connected(self):
+        return self.sock is not None and not self.connecting
+
+
+class SiTechGateway:
+    """
+    Single I/O thread multiplexing the SiTechExe connections.
+
+    Callers submit commands and get a Future back.  Commands are queued by
+    priority; a command still queued when its deadline passes fails with
+    TimeoutError instead of being sent late.  A single TCP stream cannot
+    interrupt a reply that is already in flight, so urgent commands (Abort,
+    MoveAxis*, Park, ...) and status polling each use their own connection,
+    served by the same thread, and are never stuck behind a slow
+    SearchDatabase.  The urgent connection is write-only, like a hand
+    paddle: SiTechExe does not reliably answer MoveAxis, so waiting for a
+    reply there could hold an Abort behind a move for a whole timeout.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.lanes = {
+            'urgent': GatewayLane('urgent', replies=False),
+            'status': GatewayLane('status'),
+            'command': GatewayLane('command'),
+        }
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread = None
+
+    # --- Public API ---
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='sitech-gateway', daemon=True)
+                self._thread.start()
+                print(f"[SiPi GATEWAY] I/O thread started for {self.host}:{self.port}")
+
+    def submit(self, command, priority=None, timeout=5, queue_timeout=None,
+               terminator=None, retries=1):
+        """Queue a command and return a Future resolving to its raw reply string.
+
+        timeout bounds the wait for the reply once sent; queue_timeout bounds
+        the wait for a free connection.  On the urgent lane the Future
+        resolves to "" as soon as the command is written.
+        """
+        if priority is None:
+            priority = command_priority(command)
+        if queue_timeout is None:
+            queue_timeout = command_queue_timeout(command)
+        req = GatewayRequest(command, priority, timeout, time.monotonic() + queue_timeout,
+                             terminator, retries, next(self._seq))
+        lane = self.lanes[lane_for(priority)]
+        with self._lock:
+            heapq.heappush(lane.queue, req)
+        self.start()
+        self._wake()
+        return req.future
+
+    def call(self, command, priority=None, timeout=5, queue_timeout=None,
+             terminator=None, retries=1):
+        """Submit a command and block until its reply arrives or its deadline passes."""
+        future = self.submit(command, priority, timeout, queue_timeout, terminator, retries)
+        return future.result(timeout=max(0.0, future.deadline - time.monotonic()) + 0.5)
+
+    def submit_batch(self, steps, priority=PRIORITY_NORMAL, queue_timeout=None, stop_when=None):
+        """
+        Queue (command, timeout, terminator) steps to run back-to-back with no
+        other command interleaved; returns a Future resolving to the step
+        results (see GatewayBatch).  Steps are never retried.
+        """
+        if queue_timeout is None:
+            queue_timeout = DEFAULT_QUEUE_TIMEOUT
+        req = GatewayBatch(list(steps), priority, time.monotonic() + queue_timeout,
+                           stop_when, next(self._seq))
+        lane = self.lanes[lane_for(priority)]
+        with self._lock:
+            heapq.heappush(lane.queue, req)
+        self.start()
+        self._wake()
+        return req.future
+
+    def lane_status(self):
+        """Connection state and queue depth per lane, for diagnostics."""
+        with self._lock:
+            return {
+                name: {
+                    'connected': lane.connected,
+                    'queued': len(lane.queue),
+                    'busy': lane.inflight is not None,
+                }
+                for name, lane in self.lanes.items()
+            }
+
+    # --- I/O thread ---
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
+    def _run(self):
+        while True:
+            now = time.monotonic()
+            for lane in self.lanes.values():
+                if lane.connecting:
+                    if now >= lane.connect_deadline:
+                        self._connect_failed(lane, TimeoutError("timed out"))
+                elif lane.inflight is None:
+                    self._dispatch(lane, now)
+                elif now >= lane.reply_deadline:
+                    self._reply_timeout(lane)
+            events = self._selector.select(self._select_timeout())
+            for key, mask in events:
+                if key.data is None:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except (BlockingIOError, InterruptedError):
+                        pass
+                elif key.data.connecting:
+                    self._on_connected(key.data)
+                else:
+                    self._on_readable(key.data)
+
+    def _select_timeout(self):
+        now = time.monotonic()
+        waits = [1.0]
+        with self._lock:
+            for lane in self.lanes.values():
+                if lane.connecting:
+                    waits.append(lane.connect_deadline - now)
+                elif lane.inflight is not None:
+                    waits.append(lane.reply_deadline - now)
+                elif lane.queue:
+                    waits.append(0.0 if lane.sock is not None else lane.retry_at - now)
+        return max(0.0, min(waits))
+
+    def _next_request(self, lane, now):
+        """Pop the first queued request that is still wanted, expiring stale ones."""
+        with self._lock:
+            while lane.queue:
+                candidate = heapq.heappop(lane.queue)
+                if candidate.future.done():
+                    continue
+                if now > candidate.deadline:
+                    print(f"[SiPi GATEWAY] Dropped {candidate.command.strip()} after waiting in queue")
+                    candidate.future.set_exception(TimeoutError("Command expired in queue"))
+                    COMMANDS_TOTAL.inc(candidate.label, 'expired')
+                    continue
+                if not candidate.future.running() and not candidate.future.set_running_or_notify_cancel():
+                    continue  # Cancelled by the caller
+                return candidate
+        return None
+
+    def _dispatch(self, lane, now):
+        if lane.sock is None:
+            # Connect first; queued requests wait for it (or fail if it cannot be made)
+            if lane.queue and now >= lane.retry_at:
+                self._connect(lane)
+            return
+        # A write-only lane sends everything queued; others stop at one in flight
+        while lane.inflight is None and lane.sock is not None:
+            req = self._next_request(lane, now)
+            if req is None:
+                return
+            QUEUE_WAIT_SECONDS.observe(time.monotonic() - req.queued_at, lane.name)
+            self._send(lane, req)
+
+    def _send(self, lane, req):
+        if lane.sock is None:
+            # The connection dropped between batch steps: wait for a new one
+            with self._lock:
+                heapq.heappush(lane.queue, req)
+            return
+        try:
+            lane.sock.sendall(req.command.encode('ascii'))
+        except OSError as e:
+            print(f"[SiPi GATEWAY] Send failed on {lane.name} lane: {e}")
+            self._close(lane, 'send_error')
+            self._fail(lane, req, e)
+            return
+        req.sent_at = time.monotonic()
+        if not lane.replies:
+            COMMANDS_TOTAL.inc(req.label, 'sent')
+            if isinstance(req, GatewayBatch):
+                self._batch_step(lane, req, "", None)
+            elif not req.future.done():
+                req.future.set_result("")
+            return
+        lane.inflight = req
+        lane.buffer = ""
+        lane.fields = sitech_reply_fields(req.command)
+        lane.reply_deadline = lane.reply_limit = req.sent_at + req.timeout
+
+    def _connect(self, lane):
+        """
+        Start a non-blocking connect; _on_connected() finishes it when the
+        socket turns writable.  The I/O thread never waits on an unreachable
+        host, so the other lanes keep running meanwhile.
+        """
+        try:
+            family, socktype, proto, _, address = socket.getaddrinfo(
+                self.host, self.port, type=socket.SOCK_STREAM)[0]
+            s = socket.socket(family, socktype, proto)
+        except OSError as e:
+            self._connect_failed(lane, e)
+            return
+        s.setblocking(False)
+        err = s.connect_ex(address)
+        lane.sock = s
+        if err not in (0,) + CONNECT_PENDING:
+            self._connect_failed(lane, OSError(err, errno.errorcode.get(err, 'connect failed')))
+            return
+        lane.connecting = True
+        lane.connect_deadline = time.monotonic() + CONNECT_TIMEOUT
+        self._selector.register(s, selectors.EVENT_WRITE, lane)
+
+    def _on_connected(self, lane):
+        err = lane.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err:
+            self._connect_failed(lane, OSError(err, errno.errorcode.get(err, 'connect failed')))
+            return
+        lane.connecting = False
+        lane.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._selector.modify(lane.sock, selectors.EVENT_READ, lane)
+        CONNECTS_TOTAL.inc(lane.name, 'ok')
+        lane.connect_failures = 0
+        print(f"[SiPi GATEWAY] {lane.name} lane connected to {self.host}:{self.port}")
+
+    def _connect_failed(self, lane, exc):
+        """Drop the attempt, back off, and fail (or retry) the request waiting for it."""
+        self._close(lane, None)
+        CONNECTS_TOTAL.inc(lane.name, 'failed')
+        lane.connect_failures += 1
+        lane.retry_at = time.monotonic() + CONNECT_RETRY
+        if lane.connect_failures <= 3:
+            print(f"[SiPi GATEWAY] Failed to connect {lane.name} lane: {exc}")
+        req = self._next_request(lane, time.monotonic())
+        if req is not None:
+            self._fail(lane, req, ConnectionError("Cannot connect to SiTechExe"))
+
+    def _close(self, lane, reason):
+        """Close the lane's socket; `reason` is None for a connect that never completed."""
+        if lane.sock is not None:
+            if reason is not None:
+                DISCONNECTS_TOTAL.inc(lane.name, reason)
+            try: self._selector.unregister(lane.sock)
+            except Exception: pass
+            try: lane.sock.close()
+            except Exception: pass
+            lane.sock = None
+            lane.connecting = False
+
+    def _fail(self, lane, req, exc):
+        """Retry a request that never got a reply, or fail its Future."""
+        if isinstance(req, GatewayBatch):
+            COMMANDS_TOTAL.inc(req.label, 'error')
+            self._batch_step(lane, req, None, exc)
+        elif req.retries > 0 and time.monotonic() <= req.deadline:
+            req.retries -= 1
+            RETRIES_TOTAL.inc(req.label)
+            with self._lock:
+                heapq.heappush(lane.queue, req)
+        else:
+            COMMANDS_TOTAL.inc(req.label, 'error')
+            req.future.set_exception(exc)
+
+    def _finish(self, lane, response, result='ok'):
+        req, lane.inflight = lane.inflight, None
+        COMMANDS_TOTAL.inc(req.label, result)
+        if result == 'ok':
+            COMMAND_SECONDS.observe(time.monotonic() - req.sent_at, req.label)
+        if isinstance(req, GatewayBatch):
+            self._batch_step(lane, req, response,
+                             None if result == 'ok' else TimeoutError("No reply from SiTechExe"))
+        elif not req.future.done():
+            req.future.set_result(response)
+
+    def _batch_step(self, lane, req, response, exc):
+        if req.record(response, exc):
+            self._send(lane, req)   # Keep the lane: nothing else runs between steps
+        elif not req.future.done():
+            req.future.set_result(req.results)
+
+    def _on_readable(self, lane):
+        try:
+            data = lane.sock.recv(4096)
+        except OSError as e:
+            data = b''
+            print(f"[SiPi GATEWAY] Receive failed on {lane.name} lane: {e}")
+        if not data:
+            req, lane.inflight = lane.inflight, None
+            self._close(lane, 'closed')
+            if req is not None:
+                self._fail(lane, req, ConnectionError("SiTechExe closed the connection"))
+            return
+        if lane.inflight is None:
+            if lane.replies:
+                print(f"[SiPi GATEWAY] Discarded {len(data)} unsolicited bytes on {lane.name} lane")
+            return
+        lane.buffer += data.decode('ascii', errors='replace')
+        req = lane.inflight
+        state = sitech_reply_state(lane.buffer, lane.fields)
+        if state == 'complete' or (req.terminator and req.terminator in lane.buffer):
+            self._finish(lane, lane.buffer)
+        elif state == 'message':
+            # Each chunk restarts the idle window; the reply timeout still caps it
+            lane.reply_deadline = min(lane.reply_limit, time.monotonic() + SITECH_REPLY_IDLE)
+
+    def _reply_timeout(self, lane):
+        if sitech_reply_state(lane.buffer, lane.fields) == 'message':
+            self._finish(lane, lane.buffer)  # Message ended without a newline
+            return
+        print(f"[SiPi GATEWAY] Timeout waiting for reply to {lane.inflight.command.strip()}")
+        # A late reply would be mistaken for the next command's, so start afresh
+        self._close(lane, 'timeout')
+        self._finish(lane, lane.buffer, 'timeout')
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+SiTechExe TCP Simulator
+Stand-in for SiTechExe on port 8078 for running, load-testing and
+benchmarking SiPi without a mount.  Speaks the subset of
+SiTechTCPProtocol.txt that SiPi.py uses, with simple alt/az slew
+kinematics, sidereal tracking and configurable reply latency.
+
+Usage:
+    python3 sitech_simulator.py [--port 8078] [--latency 0.002] [--jitter 0.001]
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import random
+import socketserver
+import threading
+import time
+
+from ephemeris import BODY_ORDER, solar_system_positions
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Axis rates in degrees/second for the MoveAxisSPG speed codes
+MOVE_RATES = {'S': 3.0, 'P': 0.5, 'G': 0.0042}
+SLEW_RATE = 4.0         # GoTo rate per axis, degrees/second
+SETTLE_TIME = 2.0       # Seconds bit 17 ("not settled") stays set after a slew
+PARK_POSITION = (180.0, 0.0)   # az, alt
+
+BIT_INITIALIZED = 1
+BIT_TRACKING    = 2
+BIT_SLEWING     = 4
+BIT_PARKING     = 8
+BIT_PARKED      = 16
+BIT_BLINKY      = 64
+BIT_UNSETTLED   = 1 << 17
+
+
+def julian_day(ts):
+    return ts / 86400.0 + 2440587.5
+
+def local_sidereal_time(ts, longitude):
+    """Local mean sidereal time in hours (same formula as SiPi's /current_lst fallback)."""
+    d = julian_day(ts) - 2451545.0
+    return (18.697374558 + 24.06570982441908 * d + longitude / 15.0) % 24
+
+def eq_to_altaz(ra, dec, lst, lat):
+    ha = math.radians((lst - ra) * 15)
+    dec, lat = math.radians(dec), math.radians(lat)
+    sin_alt = math.sin(dec) * math.sin(lat) + math.cos(dec) * math.cos(lat) * math.cos(ha)
+    alt = math.asin(max(-1.0, min(1.0, sin_alt)))
+    az = math.atan2(-math.sin(ha) * math.cos(dec),
+                    math.sin(dec) * math.cos(lat) - math.cos(dec) * math.sin(lat) * math.cos(ha))
+    return math.degrees(alt), math.degrees(az) % 360
+
+def altaz_to_eq(alt, az, lst, lat):
+    alt, az, lat = math.radians(alt), math.radians(az), math.radians(lat)
+    sin_dec = math.sin(alt) * math.sin(lat) + math.cos(alt) * math.cos(lat) * math.cos(az)
+    dec = math.asin(max(-1.0, min(1.0, sin_dec)))
+    ha = math.atan2(-math.sin(az) * math.cos(alt),
+                    math.sin(alt) * math.cos(lat) - math.cos(alt) * math.sin(lat) * math.cos(az))
+    return (lst - math.degrees(ha) / 15) % 24, math.degrees(dec)
+
+def airmass(alt):
+    if alt <= 0:
+        return 99.0
+    return 1.0 / math.sin(math.radians(alt + 244.0 / (165.0 + 47.0 * alt ** 1.1)))
+
+
+class SimulatedMount:
+    """Alt/az mount model advanced lazily on every command."""
+
+    def __init__(self, latitude=40.0, longitude=-105.0, elevation=1600.0):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.elevation = elevation
+        self.lock = threading.Lock()
+        self.az, self.alt = PARK_POSITION
+        self.park_position = PARK_POSITION
+        self.track_radec = None     # (ra, dec) held while tracking
+        self.tracking = False
+        self.parked = False
+        self.parking = False
+        self.blinky = False
+        self.target = None          # ('eq', ra, dec) or ('altaz', az, alt)
+        self.rates = {'Pri': 0.0, 'Sec': 0.0}
+        self.settle_until = 0.0
+        self.cal_points = []
+        self.last = time.time()
+
+    # --- Kinematics ---
+
+    def lst(self, ts=None):
+        return local_sidereal_time(time.time() if ts is None else ts, self.longitude)
+
+    def _target_altaz(self, now):
+        kind, a, b = self.target
+        if kind == 'eq':
+            alt, az = eq_to_altaz(a, b, self.lst(now), self.latitude)
+            return az, alt
+        return a, b
+
+    def advance(self):
+        now = time.time()
+        dt, self.last = now - self.last, now
+        if self.blinky:
+            return
+        if self.target is not None:
+            taz, talt = self._target_altaz(now)
+            step = SLEW_RATE * dt
+            daz = (taz - self.az + 540) % 360 - 180
+            dalt = talt - self.alt
+            self.az = (self.az + max(-step, min(step, daz))) % 360
+            self.alt += max(-step, min(step, dalt))
+            if abs(daz) <= step and abs(dalt) <= step:
+                self._arrive(now)
+        elif self.rates['Pri'] or self.rates['Sec']:
+            self.az = (self.az + self.rates['Pri'] * dt) % 360
+            self.alt = max(-5.0, min(90.0, self.alt + self.rates['Sec'] * dt))
+            if self.tracking:
+                self.track_radec = altaz_to_eq(self.alt, self.az, self.lst(now), self.latitude)
+        elif self.tracking and self.track_radec:
+            self.alt, self.az = eq_to_altaz(*self.track_radec, self.lst(now), self.latitude)
+
+    def _arrive(self, now):
+        kind, a, b = self.target
+        self.target = None
+        self.settle_until = now + SETTLE_TIME
+        if self.parking:
+            self.parking, self.parked, self.tracking = False, True, False
+            self.track_radec = None
+        elif self.tracking:
+            self.track_radec = (a, b) if kind == 'eq' else altaz_to_eq(self.alt, self.az, self.lst(now), self.latitude)
+
+    def bits(self):
+        bits = BIT_INITIALIZED
+        if self.tracking:
+            bits |= BIT_TRACKING
+        if self.target is not None:
+            bits |= BIT_SLEWING
+        if self.parking:
+            bits |= BIT_PARKING
+        if self.parked:
+            bits |= BIT_PARKED
+        if self.blinky:
+            bits |= BIT_BLINKY
+        if time.time() < self.settle_until:
+            bits |= BIT_UNSETTLED
+        return bits
+
+    def status(self, message=""):
+        """The SiTechExe standard return string."""
+        now = time.time()
+        lst = self.lst(now)
+        ra, dec = altaz_to_eq(self.alt, self.az, lst, self.latitude)
+        hours = datetime.datetime.now()
+        values = [
+            str(self.bits()), f"{ra:.7f}", f"{dec:.6f}", f"{self.alt:.6f}", f"{self.az:.6f}",
+            f"{self.alt:.5f}", f"{self.az:.5f}", f"{lst:.5f}", f"{julian_day(now):.8f}",
+            f"{hours.hour + hours.minute / 60 + hours.second / 3600:.8f}", f"{airmass(self.alt):.2f}",
+        ]
+        return ";".join(values) + ";_" + message
+
+    # --- Commands ---
+
+    def refuse_motion(self):
+        if self.parked:
+            return "Error, scope is parked"
+        if self.blinky:
+            return "Error, scope is in blinky mode"
+        return None
+
+    def goto(self, target):
+        error = self.refuse_motion()
+        if error:
+            return error
+        self.rates = {'Pri': 0.0, 'Sec': 0.0}
+        self.target = target
+        self.tracking = True
+        return "GoTo Accepted"
+
+
+class SiTechSimulator:
+    """Command dispatcher: turns one command line into one reply string."""
+
+    def __init__(self, mount, catalog_dir=None, newline=True, silent=()):
+        self.mount = mount
+        self.newline = newline
+        self.silent = tuple(silent)     # verb prefixes carried out without a reply
+        self.catalog = self._load_catalog(catalog_dir or os.path.join(BASE_DIR, 'static'))
+
+    @staticmethod
+    def _load_catalog(static_dir):
+        """(lowercase name, ra, dec, name, mag) rows from the static catalogs, for SearchDatabase."""
+        rows = []
+        for fname in ('messier.json', 'galaxies.json', 'globular_clusters.json', 'nebula.json',
+                      'open_clusters.json', 'planetary_nebula.json'):
+            try:
+                with open(os.path.join(static_dir, fname)) as f:
+                    for obj in json.load(f):
+                        name = obj.get('Name') or obj.get('name')
+                        ra = obj.get('RtAsc', obj.get('ra'))
+                        dec = obj.get('Declin', obj.get('dec'))
+                        if name and ra is not None and dec is not None:
+                            rows.append((name.lower(), float(ra), float(dec), name, obj.get('Mag', obj.get('mag', ''))))
+            except (OSError, ValueError):
+                continue
+        return rows
+
+    def handle(self, line):
+        parts = line.strip().split()
+        if not parts:
+            return None
+        reply = self._reply(parts[0], parts[1:])
+        return None if parts[0].startswith(self.silent) else reply
+
+    def _reply(self, verb, args):
+        m = self.mount
+        with m.lock:
+            m.advance()
+            if verb == 'ReadScopeStatus':
+                return m.status()
+            if verb == 'SiteLocations':
+                return f"{m.latitude};{m.longitude};{m.elevation};_SiteLocations"
+            if verb == 'ScopeInfo':
+                return "254;506.7;1200;SiPi Simulator;_ScopeInfo"
+            if verb == 'GetSiTechVersion':
+                return "_GetSiTechVersion=Simulator 1.0"
+            if verb == 'GoTo':
+                return m.status(m.goto(('eq', float(args[0]), float(args[1]))))
+            if verb == 'GoToAltAz':
+                return m.status(m.goto(('altaz', float(args[0]), float(args[1]))))
+            if verb == 'Sync':
+                return m.status(self._sync(float(args[0]), float(args[1]), args[2] if len(args) > 2 else '0'))
+            if verb.startswith('MoveAxisSPG'):
+                return m.status(self._move(verb[len('MoveAxisSPG'):], args[0] if args else ''))
+            if verb == 'Abort':
+                m.target, m.parking, m.tracking = None, False, False
+                m.rates = {'Pri': 0.0, 'Sec': 0.0}
+                return m.status("Abort Accepted")
+            if verb == 'Park':
+                if m.blinky:
+                    return m.status("Error, scope is in blinky mode")
+                m.parked, m.parking = False, True
+                m.target = ('altaz',) + m.park_position
+                return m.status("Park Accepted")
+            if verb == 'UnPark':
+                m.parked = False
+                return m.status("UnPark Accepted")
+            if verb == 'SetPark':
+                m.park_position = (m.az, m.alt)
+                return m.status("SetPark Accepted")
+            if verb == 'SetTrackMode':
+                m.tracking = bool(args) and args[0] == '1' and not m.parked
+                m.track_radec = altaz_to_eq(m.alt, m.az, m.lst(), m.latitude) if m.tracking else None
+                return m.status("SetTrackMode Accepted")
+            if verb == 'MotorsToBlinky':
+                m.blinky, m.target = True, None
+                return m.status("MotorsToBlinky Accepted")
+            if verb == 'MotorsToAuto':
+                m.blinky = False
+                return m.status("MotorsToAuto Accepted")
+            if verb == 'SearchDatabase':
+                return self._search(" ".join(args))
+            if verb == 'GetSunMoonPlanets':
+                return self._sun_moon_planets()
+            if verb == 'GetPointXPStatus':
+                rms = 30.0 / math.sqrt(len(m.cal_points)) if m.cal_points else 0.0
+                return f"{len(m.cal_points)};RMS={rms:.1f}"
+            if verb == 'ClearAllCalPoints':
+                m.cal_points.clear()
+                return m.status("ClearAllCalPoints Accepted")
+            if verb == 'RemoveLastCalPoint':
+                if m.cal_points:
+                    m.cal_points.pop()
+                return m.status("RemoveLastCalPoint Accepted")
+            return m.status(f"{verb} Accepted")
+
+    def _sync(self, ra, dec, kind):
+        m = self.mount
+        error = m.refuse_motion()
+        if error:
+            return error
+        if kind == '2':
+            m.cal_points.append((ra, dec))
+        m.alt, m.az = eq_to_altaz(ra, dec, m.lst(), m.latitude)
+        if m.tracking:
+            m.track_radec = (ra, dec)
+        return "Sync Accepted"
+
+    def _move(self, axis, code):
+        m = self.mount
+        if axis not in m.rates:
+            return f"Error, unknown axis {axis}"
+        if not code:
+            m.rates[axis] = 0.0
+            if m.tracking:
+                m.track_radec = altaz_to_eq(m.alt, m.az, m.lst(), m.latitude)
+            return "MoveAxis Stopped"
+        error = m.refuse_motion()
+        if error:
+            return error
+        rate = MOVE_RATES.get(code.upper(), 0.0)
+        m.target = None
+        m.rates[axis] = rate if code.isupper() else -rate
+        return "MoveAxis Accepted"
+
+    def _search(self, query):
+        q = query.strip().lower()
+        hits = [row for row in self.catalog if row[0] == q]
+        hits += [row for row in self.catalog if row[0].startswith(q) and row[0] != q]
+        lines = [f"{ra:.6f},{dec:.6f},{name},{mag}" for _, ra, dec, name, mag in hits[:10]]
+        return "~".join(lines)
+
+    def _sun_moon_planets(self):
+        """Mercury..Pluto, Sun, Moon as 20 ';'-separated RA/Dec values from ephemeris.py."""
+        m = self.mount
+        positions = solar_system_positions(time.time(), m.latitude, m.longitude, m.elevation)
+        return ";".join(f"{positions[name]['ra']:.6f};{positions[name]['dec']:.6f}" for name in BODY_ORDER)
+
+
+class SimulatorLatency:
+    """Reply delay: a fixed latency plus uniform jitter, with optional per-verb overrides."""
+
+    def __init__(self, latency=0.002, jitter=0.001, per_verb=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.per_verb = per_verb or {}
+
+    def delay(self, verb):
+        base = self.per_verb.get(verb, self.latency)
+        return base + random.uniform(0, self.jitter) if self.jitter else base
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        sim, latency = self.server.simulator, self.server.latency
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            line = line.decode('ascii', errors='replace')
+            if line.strip() == 'CloseMe':
+                return
+            try:
+                reply = sim.handle(line)
+            except (ValueError, IndexError) as e:
+                reply = sim.mount.status(f"Error, {e}")
+            if reply is None:
+                continue
+            delay = latency.delay(line.split()[0])
+            if delay > 0:
+                time.sleep(delay)
+            self.wfile.write((reply + ("\n" if sim.newline else "")).encode('ascii'))
+
+
+class SimulatorServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, simulator, latency):
+        self.simulator = simulator
+        self.latency = latency
+        super().__init__(address, _Handler)
+
+
+def start_simulator(host='127.0.0.1', port=8078, latency=0.002, jitter=0.001,
+                    per_verb=None, newline=True, latitude=40.0, longitude=-105.0, silent=()):
+    """Start a simulator in a background thread; returns the server (port 0 picks a free one)."""
+    mount = SimulatedMount(latitude, longitude)
+    server = SimulatorServer((host, port), SiTechSimulator(mount, newline=newline, silent=silent),
+                             SimulatorLatency(latency, jitter, per_verb))
+    threading.Thread(target=server.serve_forever, name='sitech-simulator', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SiTechExe TCP simulator for SiPi")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8078)
+    parser.add_argument('--latency', type=float, default=0.002, help="reply latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.001, help="extra uniform random latency in seconds")
+    parser.add_argument('--search-latency', type=float, default=None,
+                        help="latency for SearchDatabase/GetSunMoonPlanets (default: --latency)")
+    parser.add_argument('--lat', type=float, default=40.0, help="site latitude in degrees")
+    parser.add_argument('--lon', type=float, default=-105.0, help="site longitude in degrees (east positive)")
+    parser.add_argument('--no-newline', action='store_true',
+                        help="omit the trailing newline like some SiTechExe builds")
+    parser.add_argument('--silent-moves', action='store_true',
+                        help="carry out MoveAxis commands without replying")
+    args = parser.parse_args()
+
+    per_verb = {}
+    if args.search_latency is not None:
+        per_verb = {'SearchDatabase': args.search_latency, 'GetSunMoonPlanets': args.search_latency}
+    server = start_simulator(args.host, args.port, args.latency, args.jitter, per_verb,
+                             not args.no_newline, args.lat, args.lon,
+                             ('MoveAxis',) if args.silent_moves else ())
+    print(f"[SIMULATOR] SiTechExe simulator listening on {args.host}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -865,6 +865,199 @@ document.addEventListener('DOMContentLoaded', async () => {
     return true;
   }
 
+  // Galaxy magnitude limits for the current zoom and slider (drawing and tile loading)
+  function galaxyMagLimits() {
+    // Adaptive magnitude limit based on device performance (preserves zoom progression)
+    const deviceGalLimit = deviceProfiler.getMagnitudeLimit('galaxies', canvasScale);
+
+    // Override with user slider selection
+    const galMagSlider = document.getElementById('galMagSlider');
+    const galSliderValue = galMagSlider ? parseInt(galMagSlider.value) : 18;
+
+    // Custom galaxy magnitude scale based on actual data distribution
+    // Most galaxies are 11-17, so give more resolution in that range
+    let userGalMagLimit;
+    if (galSliderValue <= 6) {
+      // Positions 1-6: 2.2, 8, 10, 11, 12, 13
+      const earlyMags = [2.2, 8, 10, 11, 12, 13];
+      userGalMagLimit = earlyMags[galSliderValue - 1];
+    } else {
+      // Positions 7-18: 13.5, 14, 14.5, 15, 15.5, 16, 16.5, 17, 17.5, 18, 19, 20
+      userGalMagLimit = 13 + (galSliderValue - 6) * 0.5;
+    }
+
+    // ZOOM-BASED MAGNITUDE LIMITING (independent of slider)
+    // At default zoom, only show brightest galaxies. As we zoom in, show more.
+    let zoomBasedMagLimit;
+    if (canvasScale < 1.2) {
+      zoomBasedMagLimit = 11.0; // Only show very bright galaxies when zoomed out
+    } else if (canvasScale < 2.0) {
+      zoomBasedMagLimit = 12.5; // Show more galaxies at medium zoom
+    } else if (canvasScale < 3.0) {
+      zoomBasedMagLimit = 14.0; // Show even more galaxies when zoomed in
+    } else if (canvasScale < 5.0) {
+      zoomBasedMagLimit = 15.5; // Show most galaxies at high zoom
+    } else {
+      zoomBasedMagLimit = 17.0; // Show all galaxies at very high zoom
+    }
+
+    // Final limit is the most restrictive of: device limit, user slider, and zoom-based limit
+    const galLimit = Math.min(deviceGalLimit, userGalMagLimit, zoomBasedMagLimit);
+    return { deviceGalLimit, userGalMagLimit, zoomBasedMagLimit, galLimit };
+  }
+
+  // --- Progressive galaxy loading (/catalog/tiles) ---
+  // Galaxies down to GALAXY_BASE_MAG are loaded for the whole sky at start;
+  // fainter ones only for the tiles in view, down to the magnitude the zoom
+  // needs.  Each tile remembers how deep it was loaded, so zooming further
+  // only fetches the next magnitude slice.  Without the tile API the whole
+  // catalog is loaded instead.
+  const GALAXY_BASE_MAG = 12.5;
+  let galaxyTileGrid = null;
+  const galaxyTileDepth = new Map();    // "level/tile" -> magnitude loaded down to
+  const galaxyTilePending = new Set();
+  const galaxyNames = new Set();
+  let galaxyTileTimer = null;
+  let galaxyTileView = '';
+
+  function galaxyFromRow(g) {
+    return {
+      ...g,
+      RtAsc:  parseFloat(g.RtAsc), // always in hours
+      Declin: parseFloat(g.Declin),
+      mag:    parseFloat(g.mag ?? g.Mag ?? 20), // 20 = unknown, as in the catalogs
+      Size:   parseFloat(g.Size),
+      Name:   g.Name
+    };
+  }
+
+  function addGalaxies(rows) {
+    for (const row of rows) {
+      if (galaxyNames.has(row.Name)) continue;
+      galaxyNames.add(row.Name);
+      galaxies.push(galaxyFromRow(row));
+    }
+  }
+
+  async function fetchGalaxyTile(level, tile, minmag, maglim) {
+    const key = `${level}/${tile}`;
+    if (galaxyTilePending.has(key)) return;
+    galaxyTilePending.add(key);
+    try {
+      let url = `/catalog/tiles/${key}?types=galaxies&maglim=${maglim}`;
+      if (minmag !== null) url += `&minmag=${minmag}`;
+      const resp = await fetch(url);
+      if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+      addGalaxies((await resp.json()).objects);
+      galaxyTileDepth.set(key, maglim);
+    } finally {
+      galaxyTilePending.delete(key);
+    }
+  }
+
+  // Load the whole-sky base layer; false if the tile API is unavailable
+  async function loadGalaxyBaseTiles() {
+    try {
+      const resp = await fetch('/catalog/tiles');
+      if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+      galaxyTileGrid = await resp.json();
+      const level0 = galaxyTileGrid.levels[0];
+      const tiles = [];
+      for (let t = 0; t < level0.tiles; t++) tiles.push(t);
+      await Promise.all(tiles.map(t => fetchGalaxyTile(0, t, null, GALAXY_BASE_MAG)));
+      return true;
+    } catch (e) {
+      console.warn('[SkyView] Galaxy tiles unavailable, loading the full catalog:', e.message);
+      galaxyTileGrid = null;
+      return false;
+    }
+  }
+
+  function tileLevelForScale(scale) {
+    const levels = galaxyTileGrid.levels.length;
+    return Math.min(levels - 1, scale < 2 ? 0 : scale < 4 ? 1 : scale < 8 ? 2 : 3);
+  }
+
+  // RA (hours) / Dec of a canvas pixel: project() undone; null below the horizon
+  function skyAtCanvas(x, y, k) {
+    let px = (x - translateX) / k;
+    const py = (y - translateY) / k;
+    if (isFlipped) px = 2 * cx - px;
+    const alt = 90 - Math.hypot(px - cx, py - cy) / baseRadius * 90;
+    if (alt <= 0) return null;
+    // Azimuth in eqToAltAz's convention (project() draws it at az + 180)
+    const azR = Math.atan2(px - cx, cy - py) - Math.PI;
+    const altR = alt * Math.PI / 180, latR = lat * Math.PI / 180;
+    const decR = Math.asin(Math.sin(latR) * Math.sin(altR) - Math.cos(latR) * Math.cos(altR) * Math.cos(azR));
+    const haR = Math.atan2(Math.sin(azR), Math.cos(azR) * Math.sin(latR) + Math.tan(altR) * Math.cos(latR));
+    const raH = ((computeLST(getServerTime(), lon) - haR * 12 / Math.PI) % 24 + 24) % 24;
+    return { raH, dec: decR * 180 / Math.PI };
+  }
+
+  // Tiles of a level with the center or a corner above the horizon and on
+  // screen, or containing part of the screen (zoomed in past the tile size)
+  function galaxyTilesInView(level) {
+    const grid = galaxyTileGrid.levels[level];
+    const k = dpr * currentVpScale * canvasScale;
+    const onScreen = (raH, dec) => {
+      const p = project(raH, dec, baseRadius);
+      if (p.alt <= 0) return false;
+      const x = translateX + k * (isFlipped ? 2 * cx - p.x : p.x);
+      const y = translateY + k * p.y;
+      return x >= 0 && x <= canvas.width && y >= 0 && y <= canvas.height;
+    };
+    // The screen's center, corners and edge midpoints on the sky
+    const screenPoints = [];
+    for (const fx of [0, 0.5, 1]) {
+      for (const fy of [0, 0.5, 1]) {
+        const sky = skyAtCanvas(fx * canvas.width, fy * canvas.height, k);
+        if (sky) screenPoints.push(sky);
+      }
+    }
+    const inView = [];
+    for (const [decLo, cells, first] of grid.bands) {
+      const decHi = decLo + grid.band_height;
+      for (let c = 0; c < cells; c++) {
+        const raLo = 24 * c / cells, raHi = 24 * (c + 1) / cells;
+        if (onScreen((raLo + raHi) / 2, (decLo + decHi) / 2) ||
+            onScreen(raLo, decLo) || onScreen(raHi, decLo) ||
+            onScreen(raLo, decHi) || onScreen(raHi, decHi) ||
+            screenPoints.some(p => p.dec >= decLo && p.dec <= decHi && p.raH >= raLo && p.raH <= raHi)) {
+          inView.push(first + c);
+        }
+      }
+    }
+    return inView;
+  }
+
+  function updateGalaxyTiles() {
+    galaxyTileTimer = null;
+    if (!galaxyTileGrid || !toggleGal.checked) return;
+    const need = galaxyMagLimits().galLimit;
+    if (need <= GALAXY_BASE_MAG) return;
+    const view = [canvasScale.toFixed(2), Math.round(translateX), Math.round(translateY),
+                  isFlipped, need, Math.floor(Date.now() / 60000)].join(',');
+    if (view === galaxyTileView) return;
+    galaxyTileView = view;
+    const level = tileLevelForScale(canvasScale);
+    const fetches = [];
+    for (const tile of galaxyTilesInView(level)) {
+      const depth = galaxyTileDepth.get(`${level}/${tile}`) ?? GALAXY_BASE_MAG;
+      if (depth < need) fetches.push(fetchGalaxyTile(level, tile, depth, need));
+    }
+    if (fetches.length) {
+      debugLog(`[SkyView] Fetching ${fetches.length} galaxy tiles at level ${level} to mag ${need}`);
+      Promise.allSettled(fetches).then(() => draw());
+    }
+  }
+
+  // Called from draw(); at most one tile update per half second
+  function scheduleGalaxyTiles() {
+    if (galaxyTileGrid && galaxyTileTimer === null) {
+      galaxyTileTimer = setTimeout(updateGalaxyTiles, 500);
+    }
+  }
+
   // Current mount pointing
   let mountPos     = { alt: null, az: null };
 
@@ -934,9 +1127,15 @@ document.addEventListener('DOMContentLoaded', async () => {
     
     fetchingMount = true;
     try {
-      const resp = await fetch('/status');
-      if (!resp.ok) throw new Error('Failed to fetch mount position');
-      const data = await resp.json();
+      let data;
+      if (window.sipiStatusStream && window.sipiStatusStream.readyState === EventSource.OPEN && window.sipiLatestStatus) {
+        // Pushed over /status/stream by index.html - no request needed
+        data = window.sipiLatestStatus;
+      } else {
+        const resp = await fetch('/status');
+        if (!resp.ok) throw new Error('Failed to fetch mount position');
+        data = await resp.json();
+      }
       
       // Parse DMS formatted strings to decimal degrees
       const alt = parseDMS(data.alt);
@@ -2645,6 +2844,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     // --- galaxies ---
     galaxyHits=[]; if(toggleGal.checked){
+      scheduleGalaxyTiles();
       debugLog('[SkyView] Drawing galaxies:', galaxies.length);
       if (galaxies.length > 0) {
         let g = galaxies[0];
@@ -2652,42 +2852,7 @@ document.addEventListener('DOMContentLoaded', async () => {
         debugLog('[SkyView] Sample projected galaxy:', p, 'Mag:', g.mag, 'RA:', g.RtAsc, 'Dec:', g.Declin);
       }
       
-      // Adaptive magnitude limit based on device performance (preserves zoom progression)
-      const deviceGalLimit = deviceProfiler.getMagnitudeLimit('galaxies', canvasScale);
-      
-      // Override with user slider selection
-      const galMagSlider = document.getElementById('galMagSlider');
-      const galSliderValue = galMagSlider ? parseInt(galMagSlider.value) : 18;
-      
-      // Custom galaxy magnitude scale based on actual data distribution
-      // Most galaxies are 11-17, so give more resolution in that range
-      let userGalMagLimit;
-      if (galSliderValue <= 6) {
-        // Positions 1-6: 2.2, 8, 10, 11, 12, 13
-        const earlyMags = [2.2, 8, 10, 11, 12, 13];
-        userGalMagLimit = earlyMags[galSliderValue - 1];
-      } else {
-        // Positions 7-18: 13.5, 14, 14.5, 15, 15.5, 16, 16.5, 17, 17.5, 18, 19, 20
-        userGalMagLimit = 13 + (galSliderValue - 6) * 0.5;
-      }
-      
-      // ZOOM-BASED MAGNITUDE LIMITING (independent of slider)
-      // At default zoom, only show brightest galaxies. As we zoom in, show more.
-      let zoomBasedMagLimit;
-      if (canvasScale < 1.2) {
-        zoomBasedMagLimit = 11.0; // Only show very bright galaxies when zoomed out
-      } else if (canvasScale < 2.0) {
-        zoomBasedMagLimit = 12.5; // Show more galaxies at medium zoom
-      } else if (canvasScale < 3.0) {
-        zoomBasedMagLimit = 14.0; // Show even more galaxies when zoomed in
-      } else if (canvasScale < 5.0) {
-        zoomBasedMagLimit = 15.5; // Show most galaxies at high zoom
-      } else {
-        zoomBasedMagLimit = 17.0; // Show all galaxies at very high zoom
-      }
-      
-      // Final limit is the most restrictive of: device limit, user slider, and zoom-based limit
-      const galLimit = Math.min(deviceGalLimit, userGalMagLimit, zoomBasedMagLimit);
+      const { deviceGalLimit, userGalMagLimit, zoomBasedMagLimit, galLimit } = galaxyMagLimits();
       
       debugLog(`[PERF] Galaxy rendering - deviceLimit: ${deviceGalLimit}, sliderPos: ${galSliderValue}, userLimit: ${userGalMagLimit}, zoomLimit: ${zoomBasedMagLimit}, final: ${galLimit}, canvasScale: ${canvasScale}`);
       
@@ -3435,7 +3600,7 @@ document.addEventListener('DOMContentLoaded', async () => {
           // Handle different coordinate formats
           let ra, dec;
           if (obj.ra_corrected_hours !== undefined && obj.dec_corrected_degrees !== undefined) {
-            // Use corrected coordinates (legacy format)
+            // JNow coordinates from /corrected_messier.json
             ra = obj.ra_corrected_hours;
             dec = obj.dec_corrected_degrees;
           } else if (typeof obj.ra === 'number' && typeof obj.dec === 'number') {
@@ -3504,38 +3669,89 @@ document.addEventListener('DOMContentLoaded', async () => {
     }
   }
 
+  // Read a newline-delimited JSON response as it arrives, passing each
+  // batch of parsed rows to onRows; resolves to the number of rows
+  async function streamCatalog(url, onRows) {
+    const resp = await fetch(url);
+    if (!resp.ok || !resp.body) throw new Error(`HTTP ${resp.status}`);
+    const reader = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let pending = '';
+    let count = 0;
+    for (;;) {
+      const { done, value } = await reader.read();
+      pending += decoder.decode(value || new Uint8Array(), { stream: !done });
+      const lines = pending.split('\n');
+      pending = done ? '' : lines.pop();
+      const rows = lines.filter(line => line.trim()).map(line => JSON.parse(line));
+      if (rows.length) {
+        count += rows.length;
+        onRows(rows);
+      }
+      if (done) return count;
+    }
+  }
+
   // === Data loading ===
   debugLog('[SkyView] Starting catalog data loading...');
+
+  // Catalogs load from the content-hashed, precompressed URLs in the
+  // manifest (cached by the browser until they change), else the plain routes
+  const catalogManifest = await fetch('/catalog/manifest.json')
+    .then(r => r.ok ? r.json() : null)
+    .catch(() => null);
+  const catalogUrl = (name, fallback = `/corrected_${name}.json`) =>
+    (catalogManifest && catalogManifest.assets && catalogManifest.assets[name]) || fallback;
   
-  // Load stars first
+  // Load stars first: streamed brightest first, so bright stars are drawn
+  // while the faint ones arrive; the whole-file fetch is the fallback
   try {
-    debugLog('[SkyView] Fetching stars data...');
-    const starsResponse = await fetch('/static/stars.json');
-    debugLog('[SkyView] Stars response status:', starsResponse.status, starsResponse.statusText);
-    
-    if (!starsResponse.ok) {
-      throw new Error(`HTTP ${starsResponse.status}: ${starsResponse.statusText}`);
-    }
-    
-    stars = await starsResponse.json();
-    debugLog('[SkyView] Loaded stars:', stars.length);
-  } catch(e) {
-    debugLog('[SkyView] Stars load error:', e.message);
-    console.error('[SkyView] Error details:', {
-      name: e.name,
-      message: e.message,
-      stack: e.stack
+    debugLog('[SkyView] Streaming stars data...');
+    stars = [];
+    let lastStarDraw = 0;
+    const streamed = await streamCatalog('/stars-data?format=ndjson', rows => {
+      for (const s of rows) stars.push({ ...s, Mag: s.Mag ?? 20 });
+      if (performance.now() - lastStarDraw > 250) {
+        lastStarDraw = performance.now();
+        draw();
+      }
     });
-    // Try fallback to original stars.json
+    debugLog('[SkyView] Streamed stars:', streamed);
+  } catch(e) {
+    debugLog('[SkyView] Star stream unavailable:', e.message);
+    stars = [];
+  }
+  if (!stars.length) {
     try {
-      console.log('[SkyView] Attempting fallback to original stars.json...');
-      const fallbackResponse = await fetch('/static/stars.json');
-      if (fallbackResponse.ok) {
-        stars = await fallbackResponse.json();
-        console.log('[SkyView] Loaded fallback stars:', stars.length);
+      debugLog('[SkyView] Fetching stars data...');
+      // /corrected_*.json: catalog positions carried to JNow by the server
+      const starsResponse = await fetch(catalogUrl('stars'));
+      debugLog('[SkyView] Stars response status:', starsResponse.status, starsResponse.statusText);
+    
+      if (!starsResponse.ok) {
+        throw new Error(`HTTP ${starsResponse.status}: ${starsResponse.statusText}`);
+      }
+    
+      stars = await starsResponse.json();
+      debugLog('[SkyView] Loaded stars:', stars.length);
+    } catch(e) {
+      debugLog('[SkyView] Stars load error:', e.message);
+      console.error('[SkyView] Error details:', {
+        name: e.name,
+        message: e.message,
+        stack: e.stack
+      });
+      // Try fallback to original stars.json
+      try {
+        console.log('[SkyView] Attempting fallback to original stars.json...');
+        const fallbackResponse = await fetch('/static/stars.json');
+        if (fallbackResponse.ok) {
+          stars = await fallbackResponse.json();
+          console.log('[SkyView] Loaded fallback stars:', stars.length);
+        }
+      } catch(fallbackError) {
+        console.error('[SkyView] Fallback stars load failed:', fallbackError);
       }
-    } catch(fallbackError) {
-      console.error('[SkyView] Fallback stars load failed:', fallbackError);
     }
   }
 
@@ -3544,7 +3760,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
   try {
     console.log('[SkyView] Fetching constellations data...');
-    const constResponse = await fetch('/static/constellations.json');
+    const constResponse = await fetch(catalogUrl('constellations'));
     console.log('[SkyView] Constellations response status:', constResponse.status, constResponse.statusText);
     
     if (!constResponse.ok) {
@@ -3591,7 +3807,7 @@ document.addEventListener('DOMContentLoaded', async () => {
   // Load constellation centers for constellation names
   try {
     console.log('[SkyView] Fetching constellation centers data...');
-    const centersResponse = await fetch('/static/constellation_centers.json');
+    const centersResponse = await fetch(catalogUrl('constellation_centers', '/static/constellation_centers.json'));
     console.log('[SkyView] Constellation centers response status:', centersResponse.status, centersResponse.statusText);
     
     if (!centersResponse.ok) {
@@ -3623,30 +3839,25 @@ document.addEventListener('DOMContentLoaded', async () => {
   eclipticLine = generateEclipticLine();
   console.log('[SkyView] Generated ecliptic points:', eclipticLine.length);
 
-  try {
-    const resp = await fetch('/static/galaxies.json');
-    if(!resp.ok) throw resp;
-    const raw = await resp.json();
-    galaxies = raw.map(g=>{
-      return {
-        ...g,
-        RtAsc:  parseFloat(g.RtAsc), // always in hours
-        Declin: parseFloat(g.Declin),
-        mag:    parseFloat(g.mag ?? g.Mag ?? 0),
-        Size:   parseFloat(g.Size),
-        Name:   g.Name
-      };
-    });
-    galaxyMags = galaxies.map(g=>g.mag).sort((a,b)=>a-b);
-    const mid = Math.floor(galaxyMags.length/2);
-    galThreshold = galaxyMags[mid];
-    console.log('[SkyView] Loaded galaxies:', galaxies.length);
-  } catch(e) {
-    console.error('galaxies load', e);
+  if (await loadGalaxyBaseTiles()) {
+    console.log('[SkyView] Loaded galaxy base tiles:', galaxies.length);
+  } else {
+    try {
+      const resp = await fetch(catalogUrl('galaxies'));
+      if(!resp.ok) throw resp;
+      const raw = await resp.json();
+      galaxies = raw.map(galaxyFromRow);
+      galaxyMags = galaxies.map(g=>g.mag).sort((a,b)=>a-b);
+      const mid = Math.floor(galaxyMags.length/2);
+      galThreshold = galaxyMags[mid];
+      console.log('[SkyView] Loaded galaxies:', galaxies.length);
+    } catch(e) {
+      console.error('galaxies load', e);
+    }
   }
 
   try {
-    openClusters = await (await fetch('/static/open_clusters.json')).json();
+    openClusters = await (await fetch(catalogUrl('open_clusters'))).json();
     // ensure RtAsc is float (in hours)
     openClusters = openClusters.map(o => ({
       ...o,
@@ -3663,17 +3874,17 @@ document.addEventListener('DOMContentLoaded', async () => {
   // Load new object data
   try {
     const [globularData, nebulaData, planetaryData] = await Promise.all([
-      fetch('/static/globular_clusters.json').then(async r => {
+      fetch(catalogUrl('globular_clusters')).then(async r => {
         if (!r.ok) throw new Error(`HTTP ${r.status}`);
         const text = await r.text();
         try { return JSON.parse(text); } catch(e) { console.error('Invalid JSON in globular_clusters:', text.substring(0, 200)); throw e; }
       }),
-      fetch('/static/nebula.json').then(async r => {
+      fetch(catalogUrl('nebula')).then(async r => {
         if (!r.ok) throw new Error(`HTTP ${r.status}`);
         const text = await r.text();
         try { return JSON.parse(text); } catch(e) { console.error('Invalid JSON in nebula:', text.substring(0, 200)); throw e; }
       }),
-      fetch('/static/planetary_nebula.json').then(async r => {
+      fetch(catalogUrl('planetary_nebula')).then(async r => {
         if (!r.ok) throw new Error(`HTTP ${r.status}`);
         const text = await r.text();
         try { return JSON.parse(text); } catch(e) { console.error('Invalid JSON in planetary_nebula:', text.substring(0, 200)); throw e; }
@@ -3692,7 +3903,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
   // Load Messier objects separately with error handling
   try {
-    messierObjects = await (await fetch('/static/messier.json')).json();
+    messierObjects = await (await fetch(catalogUrl('messier'))).json();
     console.log('[SkyView] Loaded Messier objects:', messierObjects.length);
   } catch(e) {
     console.error('Failed to load messier.json:', e);
@@ -3702,6 +3913,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
   // --- Calibration Points ---
   let calPoints = [];
+  let calPointsVersion = null; // Version of calPoints, for /cal_points?since=
   let calPointHits = [];
 
   let fetchingCalPoints = false; // Guard to prevent overlapping fetches
@@ -3722,15 +3934,28 @@ document.addEventListener('DOMContentLoaded', async () => {
     fetchingCalPoints = true;
     try {
       console.log('[SkyView] Fetching calibration points...');
-      const resp = await fetch('/cal_points');
+      // Ask only for what changed since the version we already hold
+      const url = calPointsVersion !== null ? `/cal_points?since=${calPointsVersion}` : '/cal_points';
+      const resp = await fetch(url);
       console.log('[SkyView] Cal points response status:', resp.status, resp.statusText);
       
+      if (resp.status === 304) {
+        return; // Unchanged
+      }
       if (!resp.ok) {
         throw new Error(`HTTP ${resp.status}: ${resp.statusText}`);
       }
       
       const data = await resp.json();
-      calPoints = data.points || [];
+      if (data.delta) {
+        const byIndex = new Map(calPoints.map(pt => [pt.index, pt]));
+        (data.removed || []).forEach(idx => byIndex.delete(idx));
+        (data.changed || []).concat(data.added || []).forEach(pt => byIndex.set(pt.index, pt));
+        calPoints = Array.from(byIndex.values()).sort((a, b) => a.index - b.index);
+      } else {
+        calPoints = data.points || [];
+      }
+      calPointsVersion = data.version !== undefined ? data.version : null;
       console.log('[SkyView] Loaded calibration points:', calPoints.length);
       // Don't call draw() automatically - let the main update loop handle it
     } catch (e) {
@@ -3741,6 +3966,7 @@ document.addEventListener('DOMContentLoaded', async () => {
         stack: e.stack
       });
       calPoints = [];
+      calPointsVersion = null;
     } finally {
       fetchingCalPoints = false;
     }
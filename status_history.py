@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Mount Status History
+Fixed-size ring buffer of parsed ReadScopeStatus samples with downsampled
+range queries for plotting
+"""
+
+import math
+import threading
+from array import array
+
+# Columns stored per sample, in ScopeStatus attribute names ('t' is the
+# receive time as a Unix timestamp)
+HISTORY_COLUMNS = ('t', 'bits', 'ra', 'dec', 'alt', 'az', 'sec_axis', 'pri_axis', 'airmass')
+
+# ~14 hours at the normal 0.5 s poll rate; 9 columns x 8 bytes x 100k = 7.2 MB
+DEFAULT_CAPACITY = 100000
+
+
+class StatusHistory:
+    """Preallocated array('d') columns written as a ring; oldest samples are overwritten."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._cols = {name: array('d', bytes(8 * capacity)) for name in HISTORY_COLUMNS}
+        self._head = 0      # Next slot to write
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, st):
+        """
+        Record one ScopeStatus snapshot (missing values are stored as NaN).
+        Range queries bisect on time, so if the wall clock has stepped back
+        (e.g. /set_time) the older samples are dropped first.
+        """
+        with self._lock:
+            newest = self._cols['t'][(self._head - 1) % self.capacity]
+            if self._count and st.received < newest:
+                print(f"[SiPi HISTORY] Clock stepped back {newest - st.received:.1f}s; "
+                      f"dropped {self._count} samples")
+                self._count = 0
+            i = self._head
+            for name in HISTORY_COLUMNS:
+                value = st.received if name == 't' else getattr(st, name)
+                self._cols[name][i] = math.nan if value is None else value
+            self._head = (i + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+
+    def _slot(self, n):
+        """Physical slot of the n-th oldest sample."""
+        return (self._head - self._count + n) % self.capacity
+
+    def _bisect(self, t):
+        """Index (oldest = 0) of the first sample at or after time t."""
+        ts = self._cols['t']
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ts[self._slot(mid)] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def range(self, t_from, t_to):
+        """Copy the samples with t_from <= t <= t_to as a dict of column lists."""
+        with self._lock:
+            start = self._bisect(t_from)
+            stop = self._bisect(math.nextafter(t_to, math.inf))
+            out = {}
+            for name, col in self._cols.items():
+                a, b = self._slot(start), self._slot(stop)
+                if stop - start <= 0:
+                    out[name] = []
+                elif a < b:
+                    out[name] = col[a:b].tolist()
+                else:
+                    out[name] = col[a:].tolist() + col[:b].tolist()
+            return out
+
+    def query(self, t_from, t_to, points=500, method='minmax', y='alt'):
+        """
+        Samples in [t_from, t_to] reduced to about `points` entries.
+
+        'minmax' returns per-bucket min and max of every column; 'lttb'
+        keeps the raw samples chosen by Largest-Triangle-Three-Buckets on
+        column `y`.
+        """
+        data = self.range(t_from, t_to)
+        n = len(data['t'])
+        if n <= points:
+            result = {'method': 'raw', 'count': n, 'series': data}
+        elif method == 'lttb':
+            keep = lttb_indices(data['t'], data[y], points)
+            result = {'method': 'lttb', 'count': n, 'y': y,
+                      'series': {name: [col[i] for i in keep] for name, col in data.items()}}
+        else:
+            result = {'method': 'minmax', 'count': n, 'series': minmax_buckets(data, max(1, points // 2))}
+        result['series'] = {name: _json_safe(col) for name, col in result['series'].items()}
+        return result
+
+
+def _json_safe(values):
+    return [None if isinstance(v, float) and math.isnan(v) else v for v in values]
+
+def minmax_buckets(data, buckets):
+    """Split the samples into equal-count buckets; report bucket start time and min/max per column."""
+    n = len(data['t'])
+    edges = [n * b // buckets for b in range(buckets + 1)]
+    out = {'t': []}
+    for name in HISTORY_COLUMNS[1:]:
+        out[name + '_min'] = []
+        out[name + '_max'] = []
+    for b in range(buckets):
+        lo, hi = edges[b], edges[b + 1]
+        if lo == hi:
+            continue
+        out['t'].append(data['t'][lo])
+        for name in HISTORY_COLUMNS[1:]:
+            chunk = [v for v in data[name][lo:hi] if not math.isnan(v)]
+            out[name + '_min'].append(min(chunk) if chunk else None)
+            out[name + '_max'].append(max(chunk) if chunk else None)
+    return out
+
+def lttb_indices(xs, ys, threshold):
+    """Largest-Triangle-Three-Buckets: indices of `threshold` samples that preserve the shape of ys."""
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    ys = [0.0 if math.isnan(v) else v for v in ys]
+    keep = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        nxt_lo = int((i + 1) * every) + 1
+        nxt_hi = min(int((i + 2) * every) + 1, n)
+        span = nxt_hi - nxt_lo
+        avg_x = sum(xs[nxt_lo:nxt_hi]) / span
+        avg_y = sum(ys[nxt_lo:nxt_hi]) / span
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return keep
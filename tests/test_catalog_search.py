@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_search import NameIndex
+
+OBJECTS = [
+    {'Name': 'North America nebula NGC7000 C20', 'Mag': 4.0},
+    {'Name': 'NGC7001', 'Mag': 13.0},
+    {'Name': 'Pleiades M45', 'Mag': 1.6},
+]
+
+
+def _index():
+    index = NameIndex()
+    for obj in OBJECTS:
+        index.add(obj)
+    return index.build()
+
+
+def test_designation_prefix_typo_keeps_number():
+    index = _index()
+    for query in ('NCG 7000', 'ncg7000'):
+        assert [o['Name'] for o in index.search(query)] == [OBJECTS[0]['Name']]
+    assert index.search('ncg 7002') == []
+
+
+def test_transposed_letters():
+    assert [o['Name'] for o in _index().search('plaeides')] == ['Pleiades M45']
@@ -0,0 +1,46 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import SiPi
+from catalog_binary import build_catalog, open_catalog
+from catalog_jnow import ApparentCatalogCache
+
+STARS = [
+    {'Name': 'Vega', 'RtAsc': 18.6156, 'Declin': 38.7837, 'Mag': 0.03,
+     'SpecType': 'A0V', 'ColorIDX': 0.0, 'Distance': 7.68},
+    {'Name': 'Sirius', 'RtAsc': 6.7525, 'Declin': -16.7161, 'Mag': -1.46,
+     'SpecType': 'A1V', 'ColorIDX': 0.01, 'Distance': 2.64},
+]
+
+
+def _catalog_paths(tmp_path):
+    path = tmp_path / 'stars.json'
+    path.write_text(json.dumps(STARS))
+    return {'stars': str(path)}
+
+
+def test_streamed_star_keeps_source_fields(tmp_path, monkeypatch):
+    monkeypatch.setattr(SiPi, 'catalog_paths', _catalog_paths(tmp_path))
+    monkeypatch.setattr(SiPi, 'CATALOG_BIN_PATH', str(tmp_path / 'catalog.bin'))
+    monkeypatch.setattr(SiPi, 'CATALOG_INDEX', None)
+    monkeypatch.setattr(SiPi, 'jnow_cache', ApparentCatalogCache(str(tmp_path / 'cache')))
+
+    resp = SiPi.app.test_client().get('/stars-data?format=ndjson')
+    assert resp.status_code == 200
+    rows = [json.loads(line) for line in resp.data.decode().splitlines()]
+    assert [r['Name'] for r in rows] == ['Sirius', 'Vega']     # brightest first
+    assert rows[0]['SpecType'] == 'A1V'
+    assert rows[1]['ColorIDX'] == 0.0
+    assert rows[1]['Distance'] == 7.68
+
+
+def test_compiled_catalog_keeps_star_fields(tmp_path):
+    output = str(tmp_path / 'catalog.bin')
+    build_catalog(_catalog_paths(tmp_path), output)
+    store, _ = open_catalog(output)
+    rows = {store.name(i): store.row(i) for i in range(len(store))}
+    assert rows['Vega']['SpecType'] == 'A0V'
+    assert rows['Vega']['Mag'] == 0.03
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sitech_gateway import (MOVE_QUEUE_TIMEOUT, PRIORITY_ABORT, PRIORITY_URGENT,
+                            SiTechGateway, command_priority, command_queue_timeout, metric_verb)
+from sitech_simulator import start_simulator
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_abort_not_held_behind_unanswered_move():
+    server = start_simulator('127.0.0.1', 0, 0.0, 0.0, silent=('MoveAxis',))
+    mount = server.simulator.mount
+    gateway = SiTechGateway('127.0.0.1', server.server_address[1])
+    try:
+        # No reply ever comes for the move; its Future resolves once written
+        assert gateway.submit("MoveAxisSPGPri S\n").result(timeout=1) == ""
+        assert _wait_for(lambda: mount.rates['Pri'] != 0.0)
+        time.sleep(0.05)
+        started = time.monotonic()
+        gateway.submit("Abort\n").result(timeout=1)
+        assert _wait_for(lambda: mount.rates['Pri'] == 0.0, timeout=1.0)
+        assert time.monotonic() - started < 0.5
+        # Replies still work on the other lanes
+        assert ';' in gateway.call("ReadScopeStatus\n", timeout=2)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_stops_outrank_moves():
+    assert command_priority("Abort\n") == PRIORITY_ABORT
+    assert command_priority("MoveAxisSPGSec\n") == PRIORITY_ABORT
+    assert command_priority("MoveAxisSPGSec s\n") == PRIORITY_URGENT
+    assert command_queue_timeout("MoveAxisSPGPri S\n") == MOVE_QUEUE_TIMEOUT
+    assert command_queue_timeout("MoveAxisSPGPri\n") > MOVE_QUEUE_TIMEOUT
+
+
+def test_metric_verbs_are_bounded():
+    assert metric_verb('MoveAxisSPGPri') == 'MoveAxisSPGPri'
+    assert metric_verb('MoveAxisSPGx1') == 'other'
+    assert metric_verb('ReadScopeStatus') == 'ReadScopeStatus'
@@ -0,0 +1,25 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from status_history import HISTORY_COLUMNS, StatusHistory
+
+
+def _sample(t):
+    st = SimpleNamespace(**{name: 1.0 for name in HISTORY_COLUMNS})
+    st.received = t
+    return st
+
+
+def test_clock_step_back_keeps_ranges_ordered():
+    history = StatusHistory(capacity=8)
+    for t in (1000.0, 1001.0, 1002.0):
+        history.append(_sample(t))
+    # /set_time moved the clock back an hour
+    for t in (-2600.0, -2599.0):
+        history.append(_sample(t))
+    assert len(history) == 2
+    assert history.range(-3000.0, 5000.0)['t'] == [-2600.0, -2599.0]
+    assert history.range(1000.0, 1002.0)['t'] == []